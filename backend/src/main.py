@@ -1,6 +1,20 @@
+import threading
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from person_detection.camera_hub import shutdown_camera_hubs
+from person_detection.config import PROFILER_ENABLED
+from person_detection.detection import warm_up_model
+from person_detection.export_jobs import export_store
+from person_detection.image_batcher import image_batcher
+from person_detection.jobs import video_job_store
+from person_detection.metrics import render_metrics
+from person_detection.model_registry import model_registry
+from person_detection.profiler import sampling_profiler
 from person_detection.routes import router
+from person_detection.scheduler import inference_scheduler  # noqa: F401  (registers its metrics)
+from person_detection.video_workers import shutdown_video_workers
 from person_detection.webrtc import webrtc_manager
 
 app = FastAPI()
@@ -16,13 +30,46 @@ app.include_router(router)
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health():
+    """Liveness: the process is serving requests, even while the model loads."""
     return {
         "status": "ok",
         "detector": "ultralytics-yolo (openvino if available)",
     }
 
 
+@app.get("/health/ready")
+def health_ready():
+    """Readiness: 503 until the model is loaded and warmed up."""
+    model = model_registry.status()
+    if not model["ready"]:
+        status = "failed" if model["error"] else "starting"
+        return JSONResponse(status_code=503, content={"status": status, "model": model})
+    return {"status": "ready", "model": model}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+def startup():
+    if PROFILER_ENABLED:
+        sampling_profiler.start()
+    export_store.start()
+    video_job_store.start()
+    # In the background so liveness answers while the model compiles.
+    threading.Thread(target=warm_up_model, name="model-warmup", daemon=True).start()
+
+
 @app.on_event("shutdown")
 async def shutdown():
+    sampling_profiler.stop()
     await webrtc_manager.shutdown()
+    shutdown_camera_hubs()
+    video_job_store.shutdown()
+    image_batcher.shutdown()
+    export_store.shutdown()
+    shutdown_video_workers()
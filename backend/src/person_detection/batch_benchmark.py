@@ -0,0 +1,137 @@
+"""Image detection throughput with and without micro-batching under load.
+
+Usage (from backend/src)::
+
+    python -m person_detection.batch_benchmark photo.jpg --clients 16 --requests 20
+
+Each client thread submits images one at a time, like concurrent upload
+requests. The same load runs once with one predict call per image and once
+through an ``ImageBatcher`` with the given batch size and wait.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+from .config import FRAME_SIZE, IMAGE_BATCH_MAX_WAIT_MS, IMAGE_BATCH_SIZE
+from .detection import decode_uploaded_image_file
+from .image_batcher import ImageBatcher
+
+
+def _synthetic_frames(count: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    width, height = FRAME_SIZE
+    return [
+        cv2.resize(
+            rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8),
+            FRAME_SIZE,
+            interpolation=cv2.INTER_CUBIC,
+        )
+        for _ in range(count)
+    ]
+
+
+def run_load(
+    batcher: ImageBatcher,
+    frames: list[np.ndarray],
+    clients: int,
+    requests: int,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(index: int) -> None:
+        local = []
+        start.wait()
+        for i in range(requests):
+            frame = frames[(index + i) % len(frames)]
+            began = time.perf_counter()
+            batcher.detect(frame)
+            local.append((time.perf_counter() - began) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    batcher.shutdown()
+
+    values = np.array(latencies)
+    return {
+        **batcher.stats,
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "mean": round(float(values.mean()), 3),
+            "p50": round(float(np.percentile(values, 50)), 3),
+            "p95": round(float(np.percentile(values, 95)), 3),
+        },
+    }
+
+
+def compare_batching(
+    frames: list[np.ndarray],
+    clients: int,
+    requests: int,
+    batch_size: int,
+    max_wait_ms: float,
+) -> dict[str, Any]:
+    # Warm the model so neither mode pays for the first compile.
+    ImageBatcher(max_batch=1, max_wait=0.0).detect(frames[0])
+
+    single = run_load(ImageBatcher(max_batch=1, max_wait=0.0), frames, clients, requests)
+    batched = run_load(
+        ImageBatcher(max_batch=batch_size, max_wait=max_wait_ms / 1000.0),
+        frames,
+        clients,
+        requests,
+    )
+    speedup = None
+    if single["images_per_second"] and batched["images_per_second"]:
+        speedup = round(batched["images_per_second"] / single["images_per_second"], 2)
+
+    return {
+        "clients": clients,
+        "requests_per_client": requests,
+        "single": single,
+        "batched": batched,
+        "throughput_speedup": speedup,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", type=Path, nargs="*")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=IMAGE_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=IMAGE_BATCH_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    frames = [decode_uploaded_image_file(path, reduced=True)[0] for path in args.images]
+    report = compare_batching(
+        frames or _synthetic_frames(8),
+        max(1, args.clients),
+        max(1, args.requests),
+        args.batch_size,
+        args.max_wait_ms,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+"""Offline benchmark of every detection path on synthetic inputs.
+
+Usage (from backend/src)::
+
+    python -m person_detection.benchmark --output bench.json
+    python -m person_detection.benchmark --output new.json --compare bench.json
+
+Videos and JPEGs are generated locally from a fixed seed at each requested
+resolution and crowd density, so runs are reproducible and need no camera
+or network. Every scenario reports per-stage latency percentiles (decode,
+resize, infer, track, annotate, encode, serialize), end-to-end fps and the
+process' peak RSS so far.
+
+The moving figures are not guaranteed to look like people to the model.
+``--boxes synthetic`` feeds their ground-truth boxes to the tracking and
+drawing stages, so those stages see the intended crowd density whatever
+the model detects. It skips inference (and the model-bound analyze_video
+path) altogether, so it also runs where no model or OpenVINO is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import cv2
+import numpy as np
+
+from .config import BASE_DIR, FRAME_SIZE, JPEG_QUALITY
+from .detection import (
+    _make_payload,
+    analyze_video_file,
+    detect_frame_boxes,
+    predict_image_boxes,
+)
+from .jpeg_codec import get_codec
+from .payloads import payload_to_json
+from .renderer import FrameRenderer
+from .streaming import StreamOptions, encode_jpeg, multipart_jpeg, multipart_json
+from .tracking import TrackerSession
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_RESOLUTIONS = "640x360,1280x720,1920x1080"
+DEFAULT_DENSITIES = "sparse=2,medium=12,crowd=48"
+PERCENTILES = (50, 90, 95, 99)
+
+
+# ==============================
+# SYNTHETIC INPUTS
+# ==============================
+
+class SyntheticScene:
+    """Textured background with walking figures (head, torso, legs) that
+    bounce off the frame edges. ``step`` returns the frame and the
+    figures' ``(N, 4)`` xyxy boxes."""
+
+    def __init__(self, size: tuple[int, int], people: int, seed: int = 0) -> None:
+        width, height = size
+        rng = np.random.default_rng(seed)
+        noise = rng.integers(60, 200, (height // 16 + 1, width // 16 + 1, 3), dtype=np.uint8)
+        self.background = cv2.resize(noise, size, interpolation=cv2.INTER_CUBIC)
+        self.size = size
+
+        heights = rng.uniform(0.18, 0.45, people) * height
+        self.dims = np.column_stack([heights * 0.38, heights]).astype(np.float32)
+        self.positions = np.column_stack(
+            [rng.uniform(0, width - self.dims[:, 0]), rng.uniform(0, height - self.dims[:, 1])]
+        ).astype(np.float32)
+        self.velocities = rng.uniform(-0.006, 0.006, (people, 2)).astype(np.float32) * width
+        self.colors = rng.integers(0, 256, (people, 2, 3)).tolist()
+
+    def step(self) -> tuple[np.ndarray, np.ndarray]:
+        width, height = self.size
+        limits = np.array([width, height], dtype=np.float32) - self.dims
+        self.positions += self.velocities
+        bounced = (self.positions < 0) | (self.positions > limits)
+        self.velocities[bounced] *= -1
+        np.clip(self.positions, 0, limits, out=self.positions)
+
+        frame = self.background.copy()
+        boxes = np.column_stack([self.positions, self.positions + self.dims]).astype(np.int32)
+        for (x1, y1, x2, y2), (shirt, trousers) in zip(boxes.tolist(), self.colors):
+            w, h = x2 - x1, y2 - y1
+            cx = x1 + w // 2
+            cv2.circle(frame, (cx, y1 + h // 9), max(1, h // 9), (150, 180, 220), -1)
+            cv2.ellipse(frame, (cx, y1 + h * 2 // 5), (max(1, w // 2), max(1, h // 5)), 0, 0, 360, shirt, -1)
+            cv2.rectangle(frame, (x1 + w // 5, y1 + h * 3 // 5), (x2 - w // 5, y2), trousers, -1)
+        return frame, boxes
+
+
+def write_synthetic_video(
+    path: Path,
+    size: tuple[int, int],
+    people: int,
+    frames: int,
+    fps: int = 25,
+    seed: int = 0,
+) -> list[np.ndarray]:
+    """Write an mp4 and return each frame's ground-truth boxes."""
+    scene = SyntheticScene(size, people, seed)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError("Failed to open video writer for synthetic video")
+    truth = []
+    try:
+        for _ in range(frames):
+            frame, boxes = scene.step()
+            writer.write(frame)
+            truth.append(boxes)
+    finally:
+        writer.release()
+    return truth
+
+
+def synthetic_jpeg(size: tuple[int, int], people: int, seed: int = 0) -> tuple[bytes, np.ndarray]:
+    frame, boxes = SyntheticScene(size, people, seed).step()
+    return get_codec().encode(frame, 90), boxes
+
+
+# ==============================
+# MEASUREMENT
+# ==============================
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append((time.perf_counter() - started) * 1000.0)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        report = {}
+        for name, samples in self.samples.items():
+            values = np.array(samples)
+            stats = {"count": len(values), "mean": round(float(values.mean()), 3)}
+            for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                stats[f"p{q}"] = round(float(value), 3)
+            stats["max"] = round(float(values.max()), 3)
+            report[name] = stats
+        return report
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _scale_boxes(boxes: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    scale = np.array([FRAME_SIZE[0] / size[0], FRAME_SIZE[1] / size[1]] * 2, dtype=np.float32)
+    return (boxes * scale).astype(np.int32)
+
+
+def _as_detections(boxes: np.ndarray) -> np.ndarray:
+    detections = np.zeros((len(boxes), 6), dtype=np.float32)
+    detections[:, :4] = boxes
+    detections[:, 4] = 0.9
+    return detections
+
+
+# ==============================
+# PATHS
+# ==============================
+
+def bench_video_stream(
+    video_path: Path,
+    truth: list[np.ndarray],
+    size: tuple[int, int],
+    synthetic_boxes: bool,
+    options: StreamOptions,
+) -> dict[str, Any]:
+    """The uploaded-video MJPEG path: every frame decoded, resized,
+    inferred, tracked, drawn and encoded."""
+    timer = StageTimer()
+    capture = cv2.VideoCapture(str(video_path))
+    tracker = TrackerSession()
+    renderer = FrameRenderer()
+    frames = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            with timer.stage("decode"):
+                ok, frame = capture.read()
+            if not ok:
+                break
+            with timer.stage("resize"):
+                frame = cv2.resize(frame, FRAME_SIZE)
+            if synthetic_boxes:
+                with timer.stage("track"):
+                    detections = _as_detections(_scale_boxes(truth[frames], size))
+                    boxes, track_ids = tracker.update_detections(detections, frame)
+            else:
+                with timer.stage("infer"):
+                    result = detect_frame_boxes(frame)
+                with timer.stage("track"):
+                    boxes, track_ids = tracker.update(result)
+            payload = _make_payload(boxes, track_ids)
+            with timer.stage("annotate"):
+                annotated = renderer.render(frame, boxes, track_ids)
+            with timer.stage("encode"):
+                multipart_jpeg(encode_jpeg(annotated, options))
+            with timer.stage("serialize"):
+                multipart_json(payload)
+            frames += 1
+    finally:
+        capture.release()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "frames": frames,
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+        "stages_ms": timer.summary(),
+    }
+
+
+def bench_image(
+    jpeg: bytes,
+    truth: np.ndarray,
+    synthetic_boxes: bool,
+    repeat: int,
+    quality: int,
+) -> dict[str, Any]:
+    """The image upload path: decode, infer, annotate, encode."""
+    timer = StageTimer()
+    codec = get_codec()
+    renderer = FrameRenderer()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        with timer.stage("decode"):
+            frame = codec.decode(jpeg)
+        if synthetic_boxes:
+            boxes = truth
+        else:
+            with timer.stage("infer"):
+                boxes = predict_image_boxes([frame])[0]
+        payload = _make_payload(boxes, None)
+        with timer.stage("annotate"):
+            annotated = renderer.render(frame, boxes, None)
+        with timer.stage("encode"):
+            codec.encode(annotated, quality)
+        with timer.stage("serialize"):
+            json.dumps(payload_to_json(payload))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "images": repeat,
+        "fps": round(repeat / elapsed, 2) if elapsed > 0 else None,
+        "stages_ms": timer.summary(),
+    }
+
+
+def bench_analyze_video(video_path: Path, workdir: Path) -> dict[str, Any]:
+    """``analyze_video_file`` end to end (the upload summary path)."""
+    output_path = workdir / f"processed_{video_path.name}"
+    started = time.perf_counter()
+    result = analyze_video_file(video_path, output_path)
+    elapsed = time.perf_counter() - started
+    output_path.unlink(missing_ok=True)
+    frames = result["frames_processed"]
+    return {
+        "frames": frames,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+# ==============================
+# SUITE
+# ==============================
+
+def _parse_resolutions(value: str) -> list[tuple[int, int]]:
+    sizes = []
+    for item in value.split(","):
+        width, height = item.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def _parse_densities(value: str) -> dict[str, int]:
+    densities = {}
+    for item in value.split(","):
+        name, people = item.split("=")
+        densities[name.strip()] = int(people)
+    return densities
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _environment(synthetic_boxes: bool = False) -> dict[str, Any]:
+    from .model_registry import model_registry
+
+    backend = None
+    if not synthetic_boxes:
+        model = model_registry.get()
+        info = getattr(model, "info", None)
+        backend = info if isinstance(info, dict) else type(model).__name__
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "jpeg_codec": get_codec().name,
+        "model_backend": backend,
+        "frame_size": list(FRAME_SIZE),
+    }
+
+
+def run_suite(
+    resolutions: list[tuple[int, int]],
+    densities: dict[str, int],
+    frames: int,
+    image_repeat: int,
+    synthetic_boxes: bool,
+    quality: int = JPEG_QUALITY,
+    seed: int = 0,
+) -> dict[str, Any]:
+    if not synthetic_boxes:
+        # One warm-up predict so the first scenario does not pay for compilation.
+        detect_frame_boxes(np.zeros((FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8))
+
+    options = StreamOptions(quality=quality)
+    scenarios = []
+    with tempfile.TemporaryDirectory(prefix="person_detection_bench_") as tmp:
+        workdir = Path(tmp)
+        for size in resolutions:
+            for density, people in densities.items():
+                name = f"{size[0]}x{size[1]}-{density}"
+                video_path = workdir / f"{name}.mp4"
+                truth = write_synthetic_video(video_path, size, people, frames, seed=seed)
+                jpeg, image_truth = synthetic_jpeg(size, people, seed)
+
+                scenarios.append(
+                    {
+                        "scenario": name,
+                        "resolution": list(size),
+                        "density": density,
+                        "people": people,
+                        "video_stream": bench_video_stream(
+                            video_path, truth, size, synthetic_boxes, options
+                        ),
+                        "image": bench_image(jpeg, image_truth, synthetic_boxes, image_repeat, quality),
+                        "analyze_video": (
+                            None if synthetic_boxes else bench_analyze_video(video_path, workdir)
+                        ),
+                        "peak_rss_mb": peak_rss_mb(),
+                    }
+                )
+                video_path.unlink(missing_ok=True)
+
+    return {
+        "environment": _environment(synthetic_boxes),
+        "settings": {
+            "frames": frames,
+            "image_repeat": image_repeat,
+            "boxes": "synthetic" if synthetic_boxes else "model",
+            "quality": quality,
+            "seed": seed,
+        },
+        "scenarios": scenarios,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_runs(current: dict[str, Any], baseline: dict[str, Any]) -> dict[str, Any]:
+    """Per-scenario fps and per-stage p50 ratios (current / baseline)."""
+    previous = {item["scenario"]: item for item in baseline.get("scenarios", [])}
+    report = {"baseline_commit": baseline.get("environment", {}).get("commit"), "scenarios": {}}
+    for item in current["scenarios"]:
+        before = previous.get(item["scenario"])
+        if before is None:
+            continue
+        entry: dict[str, Any] = {}
+        for path in ("video_stream", "image", "analyze_video"):
+            now, then = item.get(path) or {}, before.get(path) or {}
+            if now.get("fps") and then.get("fps"):
+                entry[f"{path}_fps_ratio"] = round(now["fps"] / then["fps"], 3)
+            stages = {}
+            for stage, stats in now.get("stages_ms", {}).items():
+                old = then.get("stages_ms", {}).get(stage)
+                if old and old["p50"] > 0:
+                    stages[stage] = round(stats["p50"] / old["p50"], 3)
+            if stages:
+                entry[f"{path}_p50_ratio"] = stages
+        report["scenarios"][item["scenario"]] = entry
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--densities", default=DEFAULT_DENSITIES)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--image-repeat", type=int, default=30)
+    parser.add_argument("--boxes", choices=["model", "synthetic"], default="model")
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    report = run_suite(
+        _parse_resolutions(args.resolutions),
+        _parse_densities(args.densities),
+        max(1, args.frames),
+        max(1, args.image_repeat),
+        args.boxes == "synthetic",
+        args.quality,
+        args.seed,
+    )
+    if args.compare is not None:
+        report["comparison"] = compare_runs(report, json.loads(args.compare.read_text()))
+
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+import cv2
+import numpy as np
+
+from .cameras import CameraConfig, camera_registry
+from .detection import (
+    Payload,
+    _empty_payload,
+    _make_payload,
+    _unavailable_frame,
+)
+from .frame_grabber import FrameGrabber, GrabbedFrame
+from .metrics import Counter, Gauge, stage_timer
+from .motion import MotionGate
+from .regions import RegionPlanner
+from .renderer import FrameRenderer
+from .shared_state import detection_state
+from .streaming import StreamOptions, encode_jpeg
+from .tracking import TrackerSession
+
+HubFrame = tuple[int, Payload, np.ndarray]
+
+# Published-frame rate smoothing; ~10 frames of memory.
+FPS_SMOOTHING = 0.1
+# Report 0 fps once nothing has been published for this long.
+FPS_STALE_SECONDS = 2.0
+
+
+class CameraHub:
+    """Owns the single capture and tracker state for one camera and fans each
+    annotated frame out to every MJPEG/WebRTC subscriber.
+
+    Inference itself runs in the shared ``InferenceScheduler``, which batches
+    the newest frame of every active hub into one model call.
+    """
+
+    def __init__(self, camera: CameraConfig) -> None:
+        self.camera = camera
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._running = False
+        self._subscribers = 0
+        self._render_subscribers = 0
+        self._available = False
+        self._grabber: FrameGrabber | None = None
+        self._placeholder = _unavailable_frame()
+        self._last_publish = 0.0
+        self._fps = 0.0
+        self.tracker: TrackerSession | None = None
+        self.motion_gate = MotionGate()
+        self.regions = RegionPlanner.from_camera(camera)
+        self.renderer = FrameRenderer()
+        self.frames_rendered = 0
+        self._encoded: dict[tuple[Any, ...], tuple[int, bytes]] = {}
+        self._encode_locks: dict[tuple[Any, ...], threading.Lock] = {}
+        self.frames_encoded = 0
+        self.encodes_shared = 0
+        self._last_boxes = np.zeros((0, 4), dtype=np.int32)
+        self._last_track_ids: np.ndarray | None = None
+        self._last_payload: Payload = _empty_payload()
+        self.frames_processed = 0
+        self._seq = 0
+        self._payload: Payload = _empty_payload()
+        self._annotated: np.ndarray | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def camera_id(self) -> str:
+        return self.camera.camera_id
+
+    @property
+    def available(self) -> bool:
+        return self._available
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return self._subscribers
+
+    @property
+    def fps(self) -> float:
+        """Smoothed rate of frames published to subscribers."""
+        if time.monotonic() - self._last_publish > FPS_STALE_SECONDS:
+            return 0.0
+        return self._fps
+
+    def stats(self) -> dict[str, Any]:
+        grabber = self._grabber
+        return {
+            "camera_id": self.camera_id,
+            "subscribers": self.subscriber_count,
+            "render_subscribers": self._render_subscribers,
+            "connected": bool(grabber and grabber.connected),
+            "frames_grabbed": grabber.frames_grabbed if grabber else 0,
+            "frames_dropped": grabber.frames_dropped if grabber else 0,
+            "reconnects": grabber.reconnects if grabber else 0,
+            "fps": round(self.fps, 2),
+            "frames_processed": self.frames_processed,
+            "frames_gated": self.motion_gate.frames_gated,
+            "frames_rendered": self.frames_rendered,
+            "frames_encoded": self.frames_encoded,
+            "encodes_shared": self.encodes_shared,
+        }
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    @property
+    def renders(self) -> bool:
+        """False when every subscriber only wants metadata, so drawing is skipped."""
+        return self._render_subscribers > 0
+
+    def subscribe(self, render: bool = True) -> None:
+        from .scheduler import inference_scheduler
+
+        with self._start_lock:
+            with self._lock:
+                self._subscribers += 1
+                self._render_subscribers += int(render)
+                if self._running:
+                    return
+
+            # Built before the grabber starts so a failure leaves nothing running.
+            try:
+                tracker = TrackerSession()
+            except Exception:
+                with self._lock:
+                    self._subscribers = max(0, self._subscribers - 1)
+                    self._render_subscribers = max(0, self._render_subscribers - int(render))
+                raise
+
+            grabber = FrameGrabber(self.camera, on_grab=inference_scheduler.notify)
+            self._available = grabber.start()
+            with self._lock:
+                self._grabber = grabber
+                self.tracker = tracker
+                self.motion_gate = MotionGate()
+                self._last_boxes = np.zeros((0, 4), dtype=np.int32)
+                self._last_track_ids = None
+                self._last_payload = _empty_payload()
+                self._stop = threading.Event()
+                self._annotated = None
+                self._running = True
+            inference_scheduler.attach(self)
+
+    def unsubscribe(self, render: bool = True) -> None:
+        with self._start_lock:
+            with self._lock:
+                self._subscribers = max(0, self._subscribers - 1)
+                self._render_subscribers = max(0, self._render_subscribers - int(render))
+                if self._subscribers > 0:
+                    return
+            self._shutdown()
+
+    def stop(self) -> None:
+        with self._start_lock:
+            with self._lock:
+                self._subscribers = 0
+                self._render_subscribers = 0
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        from .scheduler import inference_scheduler
+
+        with self._lock:
+            if not self._running:
+                return
+            grabber = self._grabber
+            self._grabber = None
+            self._running = False
+            self._encoded.clear()
+            self._stop.set()
+            self._frame_ready.notify_all()
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener()
+        inference_scheduler.detach(self)
+        if grabber is not None:
+            grabber.stop()
+
+    def wait_for_frame(self, last_seq: int, timeout: float = 1.0) -> HubFrame | None:
+        """Block until a frame newer than ``last_seq`` is published."""
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._seq > last_seq or self._stop.is_set(),
+                timeout=timeout,
+            )
+            if self._seq <= last_seq or self._annotated is None:
+                return None
+            return self._seq, self._payload, self._annotated
+
+    def latest_frame(self, last_seq: int) -> HubFrame | None:
+        """The published frame if it is newer than ``last_seq``, without waiting."""
+        with self._lock:
+            if self._seq <= last_seq or self._annotated is None:
+                return None
+            return self._seq, self._payload, self._annotated
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` from the publishing thread after every new frame
+        and on stop. It must not block; async consumers pass something like
+        ``loop.call_soon_threadsafe(event.set)``."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def frames(self, render: bool = True) -> Iterator[HubFrame]:
+        """Yield ``(seq, payload, frame)``; with ``render=False`` the frame may
+        be unannotated if no other subscriber needs drawing."""
+        self.subscribe(render)
+        try:
+            seq = 0
+            while True:
+                hub_frame = self.wait_for_frame(seq)
+                if hub_frame is None:
+                    # A stopped hub returns at once; end the stream rather than spin.
+                    if self._stop.is_set():
+                        return
+                    continue
+                seq = hub_frame[0]
+                yield hub_frame
+        finally:
+            self.unsubscribe(render)
+
+    def encoded_frame(self, seq: int, frame: np.ndarray, options: StreamOptions) -> bytes:
+        """JPEG for frame ``seq``, encoded once per distinct ``encode_key`` and
+        shared by every subscriber asking for the same settings."""
+        key = options.encode_key
+        with self._lock:
+            cached = self._encoded.get(key)
+            if cached is not None and cached[0] == seq:
+                self.encodes_shared += 1
+                return cached[1]
+            lock = self._encode_locks.setdefault(key, threading.Lock())
+
+        with lock:
+            cached = self._encoded.get(key)
+            if cached is not None and cached[0] == seq:
+                self.encodes_shared += 1
+                return cached[1]
+            jpeg = encode_jpeg(frame, options)
+            with self._lock:
+                self._encoded[key] = (seq, jpeg)
+                self.frames_encoded += 1
+            return jpeg
+
+    # Scheduler side ------------------------------------------------------
+
+    def poll_frame(self) -> GrabbedFrame | None:
+        grabber = self._grabber
+        if grabber is None:
+            return None
+
+        grabbed = grabber.read_latest(timeout=0)
+        if grabbed is None and not grabber.connected:
+            if time.monotonic() - self._last_publish >= 0.25:
+                self._publish(_empty_payload(), self._placeholder)
+        return grabbed
+
+    def display_frame(self, frame: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+        """Resize a grabbed frame into a new array the hub owns. It is drawn
+        on in place and then published, and subscribers may still be
+        encoding it on other threads, so it is never reused."""
+        with stage_timer("resize"):
+            return cv2.resize(frame, size)
+
+    def publish_tracked(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        track_ids: np.ndarray | None,
+    ) -> None:
+        self.frames_processed += 1
+        self._last_boxes = boxes
+        self._last_track_ids = track_ids
+        self._last_payload = _make_payload(boxes, track_ids)
+        self._publish(self._last_payload, self._render(frame, boxes, track_ids))
+
+    def publish_gated(self, frame: np.ndarray) -> None:
+        """Static scene: reuse the last payload and redraw its boxes on the new frame."""
+        annotated = self._render(frame, self._last_boxes, self._last_track_ids)
+        self._publish(self._last_payload, annotated)
+
+    def _render(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        track_ids: np.ndarray | None,
+    ) -> np.ndarray:
+        if not self.renders:
+            return frame
+        self.frames_rendered += 1
+        with stage_timer("annotate"):
+            return self.renderer.render(frame, boxes, track_ids)
+
+    def _publish(self, payload: Payload, annotated: np.ndarray) -> None:
+        now = time.monotonic()
+        with self._frame_ready:
+            interval = now - self._last_publish
+            if 0 < interval < FPS_STALE_SECONDS:
+                self._fps += FPS_SMOOTHING * (1.0 / interval - self._fps)
+            else:
+                self._fps = 0.0
+            self._seq += 1
+            self._payload = payload
+            self._annotated = annotated
+            self._last_publish = now
+            self._frame_ready.notify_all()
+            listeners = list(self._listeners)
+        # Recorded once per published frame, however many viewers there are.
+        detection_state.update(payload, self.camera_id)
+        for listener in listeners:
+            listener()
+
+
+_hubs: dict[str, CameraHub] = {}
+_hubs_lock = threading.Lock()
+
+
+def get_camera_hub(camera_id: str) -> CameraHub:
+    """Return the hub for ``camera_id``; raises ``KeyError`` for unknown cameras."""
+    camera = camera_registry.get(camera_id)
+    with _hubs_lock:
+        hub = _hubs.get(camera_id)
+        if hub is None:
+            hub = CameraHub(camera)
+            _hubs[camera_id] = hub
+        return hub
+
+
+def camera_hub_stats() -> list[dict[str, Any]]:
+    with _hubs_lock:
+        hubs = list(_hubs.values())
+    return [hub.stats() for hub in hubs]
+
+
+def _hub_samples(key: str) -> dict[tuple[str, ...], float]:
+    return {(entry["camera_id"],): float(entry[key]) for entry in camera_hub_stats()}
+
+
+def _hub_metric(metric_type: type, name: str, key: str, documentation: str) -> None:
+    metric_type(
+        f"person_detection_camera_{name}",
+        documentation,
+        labels=("camera",),
+        collect=lambda: _hub_samples(key),
+    )
+
+
+# Read from the hubs' own counters at scrape time; nothing is added per frame.
+_hub_metric(Counter, "frames_grabbed_total", "frames_grabbed", "Frames read from the source.")
+_hub_metric(
+    Counter,
+    "frames_dropped_total",
+    "frames_dropped",
+    "Grabbed frames overwritten before inference reached them.",
+)
+_hub_metric(Counter, "frames_processed_total", "frames_processed", "Frames run through the model.")
+_hub_metric(
+    Counter, "frames_gated_total", "frames_gated", "Frames skipped by the motion gate."
+)
+_hub_metric(Counter, "frames_encoded_total", "frames_encoded", "JPEG encodes performed.")
+_hub_metric(Counter, "reconnects_total", "reconnects", "Capture reconnects after a lost source.")
+_hub_metric(Gauge, "fps", "fps", "Smoothed rate of frames published to subscribers.")
+_hub_metric(Gauge, "subscribers", "subscribers", "Active stream subscribers.")
+_hub_metric(Gauge, "connected", "connected", "1 while the capture source is open.")
+
+
+def remove_camera_hub(camera_id: str) -> None:
+    with _hubs_lock:
+        hub = _hubs.pop(camera_id, None)
+    if hub is not None:
+        hub.stop()
+
+
+def shutdown_camera_hubs() -> None:
+    with _hubs_lock:
+        hubs = list(_hubs.values())
+    for hub in hubs:
+        hub.stop()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable
+from urllib.parse import urlsplit, urlunsplit
+
+from .config import CAMERAS_CONFIG, DEFAULT_CAMERA_ID, RTSP_URL
+
+
+@dataclass
+class CameraConfig:
+    camera_id: str
+    rtsp_url: str | None = None
+    webcam_index: int | None = None
+    name: str = ""
+    # Normalised [x, y] polygons; detections whose foot point falls outside
+    # every polygon are ignored. ``None`` watches the whole frame.
+    roi: list[list[list[float]]] | None = None
+    # [columns, rows] of overlapping tiles for small/distant people.
+    tile_grid: list[int] | None = None
+    tile_overlap: float = 0.2
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CameraConfig:
+        camera_id = str(data.get("camera_id") or data.get("id") or "").strip()
+        if not camera_id:
+            raise ValueError("Camera entry is missing 'camera_id'")
+
+        rtsp_url = data.get("rtsp_url")
+        webcam_index = data.get("webcam_index")
+        if not rtsp_url and webcam_index is None:
+            raise ValueError(f"Camera '{camera_id}' needs 'rtsp_url' or 'webcam_index'")
+
+        return cls(
+            camera_id=camera_id,
+            rtsp_url=rtsp_url or None,
+            webcam_index=None if webcam_index is None else int(webcam_index),
+            name=str(data.get("name", "")),
+            roi=_parse_roi(camera_id, data.get("roi")),
+            tile_grid=_parse_tile_grid(camera_id, data.get("tile_grid")),
+            tile_overlap=_parse_tile_overlap(camera_id, data.get("tile_overlap", 0.2)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["rtsp_url"] = _redact_credentials(self.rtsp_url)
+        return data
+
+
+def _parse_roi(camera_id: str, roi: Any) -> list[list[list[float]]] | None:
+    if not roi:
+        return None
+    try:
+        polygons = [[[float(x), float(y)] for x, y in polygon] for polygon in roi]
+    except (TypeError, ValueError):
+        raise ValueError(f"Camera '{camera_id}' has an invalid 'roi'") from None
+
+    for polygon in polygons:
+        if len(polygon) < 3:
+            raise ValueError(f"Camera '{camera_id}' ROI polygons need at least 3 points")
+        if any(not 0.0 <= value <= 1.0 for point in polygon for value in point):
+            raise ValueError(f"Camera '{camera_id}' ROI points must be normalised to 0..1")
+    return polygons
+
+
+def _parse_tile_grid(camera_id: str, grid: Any) -> list[int] | None:
+    if not grid:
+        return None
+    try:
+        cols, rows = (int(value) for value in grid)
+    except (TypeError, ValueError):
+        raise ValueError(f"Camera '{camera_id}' 'tile_grid' must be [columns, rows]") from None
+    if cols < 1 or rows < 1:
+        raise ValueError(f"Camera '{camera_id}' 'tile_grid' must be at least [1, 1]")
+    if cols == rows == 1:
+        return None
+    return [cols, rows]
+
+
+def _parse_tile_overlap(camera_id: str, overlap: Any) -> float:
+    overlap = float(overlap)
+    if not 0.0 <= overlap < 0.5:
+        raise ValueError(f"Camera '{camera_id}' 'tile_overlap' must be in [0, 0.5)")
+    return overlap
+
+
+def _redact_credentials(url: str | None) -> str | None:
+    if not url:
+        return url
+    parts = urlsplit(url)
+    if parts.password is None:
+        return url
+    netloc = f"{parts.username}:***@{parts.hostname}"
+    if parts.port:
+        netloc += f":{parts.port}"
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+class CameraRegistry:
+    def __init__(self, cameras: Iterable[CameraConfig] = ()) -> None:
+        self._lock = threading.Lock()
+        self._cameras: dict[str, CameraConfig] = {}
+        for camera in cameras:
+            self.register(camera)
+
+    @classmethod
+    def from_file(cls, path: Path) -> CameraRegistry:
+        data = json.loads(path.read_text())
+        entries = data.get("cameras", []) if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            raise ValueError(f"Invalid camera config: {path}")
+        return cls(CameraConfig.from_dict(entry) for entry in entries)
+
+    def get(self, camera_id: str) -> CameraConfig:
+        with self._lock:
+            camera = self._cameras.get(camera_id)
+        if camera is None:
+            raise KeyError(camera_id)
+        return camera
+
+    def all(self) -> list[CameraConfig]:
+        with self._lock:
+            return list(self._cameras.values())
+
+    def register(self, camera: CameraConfig) -> None:
+        with self._lock:
+            if camera.camera_id in self._cameras:
+                raise ValueError(f"Camera '{camera.camera_id}' already exists")
+            self._cameras[camera.camera_id] = camera
+
+    def remove(self, camera_id: str) -> CameraConfig:
+        with self._lock:
+            camera = self._cameras.pop(camera_id, None)
+        if camera is None:
+            raise KeyError(camera_id)
+        return camera
+
+
+def load_camera_registry(path: Path = CAMERAS_CONFIG) -> CameraRegistry:
+    if path.exists():
+        return CameraRegistry.from_file(path)
+
+    return CameraRegistry(
+        [
+            CameraConfig(
+                camera_id=DEFAULT_CAMERA_ID,
+                rtsp_url=RTSP_URL,
+                webcam_index=0,
+                name="Default camera",
+            )
+        ]
+    )
+
+
+camera_registry = load_camera_registry()
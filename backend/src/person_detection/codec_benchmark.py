@@ -0,0 +1,88 @@
+"""Per-image JPEG latency for each available codec backend.
+
+Usage (from backend/src)::
+
+    python -m person_detection.codec_benchmark photo1.jpg photo2.jpg --repeat 50
+
+Without image arguments a synthetic 1920x1080 frame is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from .config import FRAME_SIZE, JPEG_QUALITY
+from .jpeg_codec import available_codecs, get_codec
+
+
+def _synthetic_jpeg(size: tuple[int, int] = (1920, 1080)) -> bytes:
+    width, height = size
+    rng = np.random.default_rng(0)
+    frame = cv2.resize(
+        rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8),
+        size,
+        interpolation=cv2.INTER_CUBIC,
+    )
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    if not ok:
+        raise RuntimeError("Failed to encode synthetic frame")
+    return buffer.tobytes()
+
+
+def _latency_ms(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    values = np.array(samples)
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+    }
+
+
+def benchmark_codecs(images: list[bytes], repeat: int, quality: int = JPEG_QUALITY) -> dict[str, Any]:
+    report: dict[str, Any] = {"images": len(images), "repeat": repeat, "quality": quality, "codecs": {}}
+    frames = [get_codec("opencv").decode(data) for data in images]
+
+    for name in available_codecs():
+        codec = get_codec(name)
+        results = []
+        for data, frame in zip(images, frames):
+            reduced = codec.decode(data, FRAME_SIZE)
+            results.append(
+                {
+                    "size": [frame.shape[1], frame.shape[0]],
+                    "reduced_size": [reduced.shape[1], reduced.shape[0]],
+                    "decode_ms": _latency_ms(lambda: codec.decode(data), repeat),
+                    "decode_reduced_ms": _latency_ms(lambda: codec.decode(data, FRAME_SIZE), repeat),
+                    "encode_ms": _latency_ms(lambda: codec.encode(frame, quality), repeat),
+                }
+            )
+        report["codecs"][name] = results
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", type=Path, nargs="*")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY)
+    args = parser.parse_args()
+
+    images = [path.read_bytes() for path in args.images] or [_synthetic_jpeg()]
+    print(json.dumps(benchmark_codecs(images, max(1, args.repeat), args.quality), indent=2))
+
+
+if __name__ == "__main__":
+    main()
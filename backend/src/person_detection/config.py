@@ -1,11 +1,17 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent
 
 # Model paths
 MODEL_OPENVINO_DIR = BASE_DIR / "models" / "yolo26n_openvino_model"
 MODEL_PT_PATH = BASE_DIR / "models" / "yolo26n.pt"
+MODEL_OPENVINO_INT8_DIR = BASE_DIR / "models" / "yolo26n_int8_openvino_model"
+
+# "fp" loads the exported IR as is, "int8" the NNCF-quantized copy
+MODEL_PRECISION = os.getenv("MODEL_PRECISION", "fp")
+QUANTIZATION_SUBSET_SIZE = int(os.getenv("QUANTIZATION_SUBSET_SIZE", "300"))
 
 # Detection settings
 CONF_THRESHOLD = 0.4
@@ -13,9 +19,114 @@ IOU_THRESHOLD = 0.5
 FRAME_SIZE = (640, 360)
 TRACKER_CONFIG = str(BASE_DIR / "bytetrack.yaml")
 
+# Inference backend ("auto" runs the OpenVINO IR natively when the openvino
+# package is installed, "ultralytics" always goes through YOLO(), "openvino"
+# requires the native runtime)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "auto")
+OPENVINO_DEVICE = os.getenv("OPENVINO_DEVICE", "CPU")
+OPENVINO_PERFORMANCE_HINT = os.getenv("OPENVINO_PERFORMANCE_HINT", "THROUGHPUT")
+OPENVINO_NUM_STREAMS = os.getenv("OPENVINO_NUM_STREAMS", "")  # "" = device default
+OPENVINO_INFERENCE_THREADS = int(os.getenv("OPENVINO_INFERENCE_THREADS", "0"))  # 0 = device default
+OPENVINO_INFER_REQUESTS = int(os.getenv("OPENVINO_INFER_REQUESTS", "0"))  # 0 = device optimum
+# Compiled-model cache reused across restarts ("" disables)
+OPENVINO_CACHE_DIR = os.getenv(
+    "OPENVINO_CACHE_DIR", str(Path(tempfile.gettempdir()) / "person_detection_ov_cache")
+)
+
+# Startup: the model loads in the background and is warmed up with this many
+# dummy FRAME_SIZE inferences before /health/ready reports ready (0 = load only)
+MODEL_WARMUP_RUNS = int(os.getenv("MODEL_WARMUP_RUNS", "3"))
+
 # RTSP (environment safe)
 RTSP_USER = os.getenv("RTSP_USER", "admin")
 RTSP_PASS = os.getenv("RTSP_PASS", "teamev108")
 RTSP_IP = os.getenv("RTSP_IP", "172.18.10.108")
 
 RTSP_URL = f"rtsp://{RTSP_USER}:{RTSP_PASS}@{RTSP_IP}:554/stream1"
+
+# Realtime capture
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "3"))
+CAPTURE_RECONNECT_DELAY = float(os.getenv("CAPTURE_RECONNECT_DELAY", "1.0"))
+
+# Cameras
+DEFAULT_CAMERA_ID = os.getenv("DEFAULT_CAMERA_ID", "default")
+CAMERAS_CONFIG = Path(os.getenv("CAMERAS_CONFIG", str(BASE_DIR / "cameras.json")))
+MAX_INFERENCE_BATCH = int(os.getenv("MAX_INFERENCE_BATCH", "8"))
+
+# Video upload workers
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+VIDEO_WORKER_THREADS = int(os.getenv("VIDEO_WORKER_THREADS", "2"))
+VIDEO_MIN_SEGMENT_FRAMES = int(os.getenv("VIDEO_MIN_SEGMENT_FRAMES", "300"))
+SEGMENT_OVERLAP_FRAMES = int(os.getenv("SEGMENT_OVERLAP_FRAMES", "8"))
+STITCH_IOU_THRESHOLD = 0.5
+
+# Video analysis jobs
+JOBS_DIR = Path(os.getenv("JOBS_DIR", str(Path(tempfile.gettempdir()) / "person_detection_jobs")))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "32"))
+
+# OpenVINO model exports (content-hash cache)
+EXPORTS_DIR = Path(os.getenv("EXPORTS_DIR", "exports/openvino"))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
+EXPORT_MAX_QUEUED = int(os.getenv("EXPORT_MAX_QUEUED", "8"))
+EXPORT_NICE = int(os.getenv("EXPORT_NICE", "10"))
+EXPORT_WORKER_THREADS = int(os.getenv("EXPORT_WORKER_THREADS", "2"))
+EXPORT_CACHE_MAX_ENTRIES = int(os.getenv("EXPORT_CACHE_MAX_ENTRIES", "16"))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+EXPORT_CACHE_TTL_SECONDS = int(os.getenv("EXPORT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Uploads
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Video frame stride ("off", "fixed" or "adaptive")
+VIDEO_STRIDE_MODE = os.getenv("VIDEO_STRIDE_MODE", "off")
+VIDEO_FRAME_STRIDE = int(os.getenv("VIDEO_FRAME_STRIDE", "3"))
+VIDEO_MAX_STRIDE = int(os.getenv("VIDEO_MAX_STRIDE", "5"))
+STRIDE_MOTION_THRESHOLD = float(os.getenv("STRIDE_MOTION_THRESHOLD", "0.04"))
+
+# Motion gate for realtime cameras
+MOTION_GATE_ENABLED = os.getenv("MOTION_GATE_ENABLED", "1") == "1"
+MOTION_GATE_PIXEL_THRESHOLD = int(os.getenv("MOTION_GATE_PIXEL_THRESHOLD", "25"))
+MOTION_GATE_MIN_AREA = float(os.getenv("MOTION_GATE_MIN_AREA", "0.002"))
+MOTION_GATE_MAX_SKIP_SECONDS = float(os.getenv("MOTION_GATE_MAX_SKIP_SECONDS", "2.0"))
+
+# Push updates for people counts (SSE / WebSocket)
+PUSH_COALESCE_SECONDS = float(os.getenv("PUSH_COALESCE_SECONDS", "0.1"))
+PUSH_KEEPALIVE_SECONDS = float(os.getenv("PUSH_KEEPALIVE_SECONDS", "15"))
+PUSH_MAX_SUBSCRIBERS = int(os.getenv("PUSH_MAX_SUBSCRIBERS", "256"))
+
+# Per-source people-count history kept in memory
+COUNT_HISTORY_SIZE = int(os.getenv("COUNT_HISTORY_SIZE", "3600"))
+
+# Annotation renderer
+RENDER_LABEL_CACHE = int(os.getenv("RENDER_LABEL_CACHE", "1024"))
+
+# MJPEG output defaults
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "80"))
+STREAM_MAX_DIMENSION = int(os.getenv("STREAM_MAX_DIMENSION", "1920"))
+
+# JPEG codec ("auto" prefers turbojpeg when installed, else "opencv")
+JPEG_CODEC = os.getenv("JPEG_CODEC", "auto")
+TURBOJPEG_LIB_PATH = os.getenv("TURBOJPEG_LIB_PATH") or None
+
+# Annotated image results served by URL
+IMAGE_RESULT_TTL_SECONDS = int(os.getenv("IMAGE_RESULT_TTL_SECONDS", "300"))
+IMAGE_RESULT_MAX_ITEMS = int(os.getenv("IMAGE_RESULT_MAX_ITEMS", "256"))
+
+# Image upload micro-batching
+IMAGE_BATCH_SIZE = int(os.getenv("IMAGE_BATCH_SIZE", "8"))
+IMAGE_BATCH_MAX_WAIT_MS = float(os.getenv("IMAGE_BATCH_MAX_WAIT_MS", "10"))
+IMAGE_BATCH_MAX_FILES = int(os.getenv("IMAGE_BATCH_MAX_FILES", "64"))
+
+# Sampling profiler (also toggled at runtime via /api/debug/profiler)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "64"))
+
+# WebRTC video tracks: target rate, the floor adaptive pacing may drop to,
+# and threads that wait for and convert frames off the event loop
+WEBRTC_FPS = int(os.getenv("WEBRTC_FPS", "24"))
+WEBRTC_MIN_FPS = int(os.getenv("WEBRTC_MIN_FPS", "5"))
+WEBRTC_MIN_SCALE = float(os.getenv("WEBRTC_MIN_SCALE", "0.5"))
+WEBRTC_WORKERS = int(os.getenv("WEBRTC_WORKERS", "16"))
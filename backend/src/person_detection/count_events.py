@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator
+
+from .config import PUSH_COALESCE_SECONDS, PUSH_KEEPALIVE_SECONDS, PUSH_MAX_SUBSCRIBERS
+from .metrics import Gauge
+
+# Fields pushed to count subscribers; boxes stay on the video/data channel so
+# a moving crowd with a constant count does not generate traffic.
+COUNT_FIELDS = ("count", "face_count", "person_count")
+
+
+class TooManySubscribersError(RuntimeError):
+    pass
+
+
+class CountSubscription:
+    """One push client. Pending changes are merged per camera until the
+    coalescing window has passed, so a burst of frames becomes one message."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        camera_ids: set[str] | None,
+        coalesce: float,
+    ) -> None:
+        self._loop = loop
+        self.camera_ids = camera_ids
+        self.coalesce = max(0.0, coalesce)
+        self._pending: dict[str | None, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._last_sent = 0.0
+
+    def wants(self, camera_id: str | None) -> bool:
+        return self.camera_ids is None or camera_id in self.camera_ids
+
+    def offer(self, camera_id: str | None, delta: dict[str, Any]) -> None:
+        with self._lock:
+            self._pending.setdefault(camera_id, {}).update(delta)
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def next_batch(self, timeout: float) -> list[dict[str, Any]]:
+        """Wait for pending deltas; an empty list means the keep-alive expired."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+
+        wait = self._last_sent + self.coalesce - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self._ready.clear()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        self._last_sent = time.monotonic()
+        return [{"camera_id": camera_id, **delta} for camera_id, delta in pending.items()]
+
+
+class CountBroadcaster:
+    """Fans people-count changes out to SSE/WebSocket clients.
+
+    ``publish`` is called from the ``on_frame`` callbacks (stream threads and
+    the WebRTC event loop alike) and only forwards fields that changed since
+    the last published state of that camera.
+    """
+
+    def __init__(
+        self,
+        coalesce: float = PUSH_COALESCE_SECONDS,
+        max_subscribers: int = PUSH_MAX_SUBSCRIBERS,
+    ) -> None:
+        self.coalesce = coalesce
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._states: dict[str | None, dict[str, Any]] = {}
+        self._subscribers: list[CountSubscription] = []
+        self.events_published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def snapshot(self, camera_ids: set[str] | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {"camera_id": camera_id, **state}
+                for camera_id, state in self._states.items()
+                if camera_ids is None or camera_id in camera_ids
+            ]
+
+    def publish(self, camera_id: str | None, payload: dict[str, Any]) -> None:
+        state = {field: int(payload.get(field, 0)) for field in COUNT_FIELDS}
+        state["count"] = state["person_count"]
+
+        with self._lock:
+            previous = self._states.get(camera_id, {})
+            delta = {key: value for key, value in state.items() if previous.get(key) != value}
+            if not delta:
+                return
+            self._states[camera_id] = state
+            subscribers = [sub for sub in self._subscribers if sub.wants(camera_id)]
+            self.events_published += 1
+
+        for subscription in subscribers:
+            subscription.offer(camera_id, delta)
+
+    def forget(self, camera_id: str) -> None:
+        with self._lock:
+            self._states.pop(camera_id, None)
+
+    def subscribe(
+        self,
+        camera_ids: set[str] | None = None,
+        coalesce: float | None = None,
+    ) -> CountSubscription:
+        subscription = CountSubscription(
+            asyncio.get_running_loop(),
+            camera_ids,
+            self.coalesce if coalesce is None else coalesce,
+        )
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribersError("Too many count subscribers")
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: CountSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    async def updates(
+        self,
+        subscription: CountSubscription,
+        keepalive: float = PUSH_KEEPALIVE_SECONDS,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield the current snapshot, then coalesced deltas. An empty batch is
+        yielded every ``keepalive`` seconds without changes."""
+        try:
+            yield self.snapshot(subscription.camera_ids)
+            while True:
+                yield await subscription.next_batch(keepalive)
+        finally:
+            self.unsubscribe(subscription)
+
+
+count_broadcaster = CountBroadcaster()
+
+Gauge(
+    "person_detection_count_subscribers",
+    "Clients subscribed to pushed people counts (SSE / WebSocket).",
+    collect=lambda: {(): float(count_broadcaster.subscriber_count)},
+)
@@ -1,25 +1,55 @@
 from __future__ import annotations
 
+import threading
 import cv2
 import numpy as np
-import time
 from typing import Any, Callable, Iterator
-from tempfile import NamedTemporaryFile
 from pathlib import Path
 
 from .config import (
     CONF_THRESHOLD,
+    DEFAULT_CAMERA_ID,
     FRAME_SIZE,
     IOU_THRESHOLD,
+    JPEG_QUALITY,
+    MODEL_WARMUP_RUNS,
     RTSP_URL,
-    TRACKER_CONFIG,
 )
-from .model import model
+from .jpeg_codec import get_codec, jpeg_size
+from .metrics import Counter, stage_timer
+from .model_registry import model_registry
+from .payloads import payload_to_json
+from .renderer import FrameRenderer
+from .streaming import (
+    FrameRateLimiter,
+    StreamOptions,
+    encode_jpeg,
+    multipart_jpeg,
+    multipart_json,
+)
+from .stride import StridedTracker, StrideOptions
+from .tracking import TrackerSession, Tracks
 
 CLASS_FILTER: list[int] | None = [0]
-BBox = tuple[int, int, int, int]
 Payload = dict[str, Any]
 
+CAPTURE_OPENS = Counter(
+    "person_detection_capture_opens_total",
+    "Realtime capture open attempts by source and result.",
+    labels=("source", "result"),
+)
+
+# One renderer per thread for the single-frame helpers, so request threads
+# never share one; streams and videos own their renderer.
+_renderers = threading.local()
+
+
+def _thread_renderer() -> FrameRenderer:
+    renderer = getattr(_renderers, "renderer", None)
+    if renderer is None:
+        renderer = _renderers.renderer = FrameRenderer()
+    return renderer
+
 
 class FaceTracker:
     """Compatibility placeholder for legacy call signatures."""
@@ -32,91 +62,32 @@ class FaceTracker:
 # BOX/PAYLOAD HELPERS
 # ==============================
 
-def _extract_boxes_and_ids(
-    result: Any,
-) -> tuple[list[BBox], list[int] | None]:
+def _extract_boxes_and_ids(result: Any) -> Tracks:
     if result.boxes is None:
-        return [], None
+        return np.zeros((0, 4), dtype=np.int32), None
 
-    boxes_raw = result.boxes.xyxy.cpu().numpy()
-    boxes = [tuple(map(int, box)) for box in boxes_raw]
+    boxes = result.boxes.xyxy.cpu().numpy().astype(np.int32)
 
     if result.boxes.id is None:
         return boxes, None
 
-    ids = result.boxes.id.cpu().numpy().astype(int).tolist()
-    return boxes, ids
-
-
-def _as_detection_payload(
-    boxes: list[BBox],
-    track_ids: list[int] | None = None,
-) -> list[dict[str, Any]]:
-    detections: list[dict[str, Any]] = []
-
-    if track_ids is None:
-        for idx, (x1, y1, x2, y2) in enumerate(boxes, start=1):
-            detections.append({"id": idx, "bbox": [x1, y1, x2, y2]})
-        return detections
+    return boxes, result.boxes.id.cpu().numpy().astype(np.int32)
 
-    for (x1, y1, x2, y2), track_id in zip(boxes, track_ids):
-        detections.append({"id": int(track_id), "bbox": [x1, y1, x2, y2]})
-    return detections
 
-
-def _annotate(
-    frame: np.ndarray,
-    boxes: list[BBox],
-    track_ids: list[int] | None = None,
-) -> np.ndarray:
-    output = frame.copy()
-
-    if track_ids is None:
-        for idx, (x1, y1, x2, y2) in enumerate(boxes, start=1):
-            cv2.rectangle(output, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(
-                output,
-                f"ID {idx}",
-                (x1, max(20, y1 - 10)),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 255, 0),
-                2,
-            )
-    else:
-        for (x1, y1, x2, y2), track_id in zip(boxes, track_ids):
-            cv2.rectangle(output, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(
-                output,
-                f"ID {track_id}",
-                (x1, max(20, y1 - 10)),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 255, 0),
-                2,
-            )
-    return output
-
-
-def _count_detections(boxes: list[BBox], track_ids: list[int] | None) -> int:
-    return len(set(track_ids)) if track_ids is not None else len(boxes)
+def _count_detections(boxes: np.ndarray, track_ids: np.ndarray | None) -> int:
+    return len(np.unique(track_ids)) if track_ids is not None else len(boxes)
 
 
 def _empty_payload() -> Payload:
-    return {
-        "face_count": 0,
-        "person_count": 0,
-        "count": 0,
-        "detections": [],
-        "person_detections": [],
-    }
+    return _make_payload(np.zeros((0, 4), dtype=np.int32), None)
 
 
 def _make_payload(
-    boxes: list[BBox],
-    track_ids: list[int] | None,
+    boxes: np.ndarray,
+    track_ids: np.ndarray | None,
 ) -> Payload:
-    detections = _as_detection_payload(boxes, track_ids)
+    """Boxes and ids stay as arrays; ``payloads.payload_to_json`` or
+    ``payloads.encode_binary`` turn them into a wire format on demand."""
     count = _count_detections(boxes, track_ids)
 
     # Keep person fields for existing frontend/routes contract.
@@ -124,8 +95,8 @@ def _make_payload(
         "face_count": count,
         "person_count": count,
         "count": count,
-        "detections": detections,
-        "person_detections": detections,
+        "boxes": boxes,
+        "ids": track_ids,
     }
 
 
@@ -133,39 +104,72 @@ def _make_payload(
 # INFERENCE MODES
 # ==============================
 
+def predict_image_boxes(frames: list[np.ndarray]) -> list[np.ndarray]:
+    """Untracked boxes for each frame from one (batched) predict call."""
+    if not frames:
+        return []
+    with stage_timer("infer"), model_registry.lease() as model:
+        results = model.predict(
+            frames,
+            conf=CONF_THRESHOLD,
+            classes=CLASS_FILTER,
+            verbose=False,
+        )
+    return [_extract_boxes_and_ids(result)[0] for result in results]
+
+
 def detect_frame_predict(
     frame: np.ndarray,
 ) -> tuple[dict[str, Any], np.ndarray]:
-    result = model.predict(
-        frame,
-        conf=CONF_THRESHOLD,
-        classes=CLASS_FILTER,
-        verbose=False,
-    )[0]
-    boxes, _ = _extract_boxes_and_ids(result)
+    boxes = predict_image_boxes([frame])[0]
     payload = _make_payload(boxes, None)
-    annotated = _annotate(frame, boxes, None)
+    annotated = _thread_renderer().render(frame.copy(), boxes, None)
     return payload, annotated
 
 
+def detect_frame_boxes(frame: np.ndarray) -> Any:
+    """Detection only; association is done by a per-stream ``TrackerSession``."""
+    with stage_timer("infer"), model_registry.lease() as model:
+        return model.predict(
+            frame,
+            conf=CONF_THRESHOLD,
+            iou=IOU_THRESHOLD,
+            classes=CLASS_FILTER,
+            verbose=False,
+        )[0]
+
+
 def detect_frame_track(
     frame: np.ndarray,
+    tracker: TrackerSession,
 ) -> tuple[dict[str, Any], np.ndarray]:
-    result = model.track(
-        frame,
-        conf=CONF_THRESHOLD,
-        iou=IOU_THRESHOLD,
-        persist=True,
-        tracker=TRACKER_CONFIG,
-        classes=CLASS_FILTER,
-        verbose=False,
-    )[0]
-    boxes, track_ids = _extract_boxes_and_ids(result)
+    result = detect_frame_boxes(frame)
+    boxes, track_ids = tracker.update(result)
     payload = _make_payload(boxes, track_ids)
-    annotated = _annotate(frame, boxes, track_ids)
+    annotated = _thread_renderer().render(frame.copy(), boxes, track_ids)
     return payload, annotated
 
 
+def predict_batch(frames: list[np.ndarray], camera_id: str | None = None) -> list[Any]:
+    """Run one batched predict call with the model serving ``camera_id``;
+    tracking is left to the caller."""
+    if not frames:
+        return []
+    with stage_timer("infer"), model_registry.lease(camera_id) as model:
+        return model.predict(
+            frames,
+            conf=CONF_THRESHOLD,
+            iou=IOU_THRESHOLD,
+            classes=CLASS_FILTER,
+            verbose=False,
+        )
+
+
+def warm_up_model(runs: int = MODEL_WARMUP_RUNS) -> dict[str, Any]:
+    """Load the active model and push dummy ``FRAME_SIZE`` frames through it."""
+    return model_registry.warm_up(runs)
+
+
 def detect_frame(
     frame: np.ndarray,
     face_tracker: FaceTracker | None = None,
@@ -180,135 +184,151 @@ def detect_frame(
 # RTSP CAMERA
 # ==============================
 
-def open_realtime_capture(camera_index: int = 0):
-    print("Trying RTSP:", RTSP_URL)
-    rtsp_capture = cv2.VideoCapture(RTSP_URL, cv2.CAP_FFMPEG)
-    rtsp_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+def open_realtime_capture(
+    camera_index: int | None = 0,
+    rtsp_url: str | None = RTSP_URL,
+):
+    if rtsp_url:
+        print("Trying RTSP:", rtsp_url)
+        rtsp_capture = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
+        rtsp_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
-    if rtsp_capture.isOpened():
-        return rtsp_capture
+        if rtsp_capture.isOpened():
+            CAPTURE_OPENS.inc("rtsp", "opened")
+            return rtsp_capture
+
+        CAPTURE_OPENS.inc("rtsp", "failed")
+        rtsp_capture.release()
+
+    if camera_index is None:
+        return None
 
-    rtsp_capture.release()
     webcam_capture = cv2.VideoCapture(camera_index)
     if webcam_capture.isOpened():
+        CAPTURE_OPENS.inc("webcam", "opened")
         print(f"RTSP unavailable, using local webcam (index {camera_index}).")
         return webcam_capture
 
+    CAPTURE_OPENS.inc("webcam", "failed")
     webcam_capture.release()
     return None
 
 
 # ==============================
-# MJPEG HELPER
+# REALTIME STREAM (TRACK)
 # ==============================
 
-def _multipart_frame(frame: np.ndarray) -> bytes:
-    ok, buffer = cv2.imencode(".jpg", frame)
-    if not ok:
-        raise RuntimeError("Failed to encode frame")
-    return (
-        b"--frame\r\n"
-        b"Content-Type: image/jpeg\r\n\r\n"
-        + buffer.tobytes()
-        + b"\r\n"
+def _unavailable_frame() -> np.ndarray:
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(
+        frame,
+        "Camera unavailable",
+        (50, 240),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        (255, 255, 255),
+        2,
     )
+    return frame
 
 
-# ==============================
-# REALTIME STREAM (TRACK)
-# ==============================
-
 def generate_realtime_detection_stream(
-    camera_index: int = 0,
-    on_frame: Callable[[dict[str, Any]], None] | None = None,
+    camera_id: str = DEFAULT_CAMERA_ID,
+    options: StreamOptions | None = None,
 ) -> Iterator[bytes]:
-    capture = open_realtime_capture(camera_index)
-
-    if capture is None:
-        payload = _empty_payload()
-        if on_frame:
-            on_frame(payload)
-
-        while True:
-            frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(
-                frame,
-                "Camera unavailable",
-                (50, 240),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (255, 255, 255),
-                2,
-            )
-            yield _multipart_frame(frame)
-            time.sleep(0.25)
-
-    try:
-        while True:
-            ok, frame = capture.read()
-            if not ok:
-                capture.release()
-                time.sleep(0.2)
-                capture = open_realtime_capture(camera_index)
-                if capture is None:
-                    continue
-                continue
+    # One shared capture + tracker per camera; every viewer reuses its frames
+    # and every viewer with the same settings reuses its JPEG. The hub
+    # records each frame's counts itself, so viewers only encode and yield.
+    from .camera_hub import get_camera_hub
 
-            frame = cv2.resize(frame, FRAME_SIZE)
-            payload, annotated = detect_frame_track(frame)
+    options = options or StreamOptions()
+    limiter = FrameRateLimiter(options.max_fps)
+    hub = get_camera_hub(camera_id)
 
-            if on_frame:
-                on_frame(payload)
+    for seq, payload, annotated in hub.frames(render=not options.metadata_only):
+        if not limiter.allow():
+            continue
 
-            yield _multipart_frame(annotated)
-    finally:
-        if capture is not None:
-            capture.release()
+        if options.metadata_only:
+            yield multipart_json(payload)
+        else:
+            yield multipart_jpeg(hub.encoded_frame(seq, annotated, options))
 
 
 # ==============================
 # IMAGE UPLOAD (PREDICT)
 # ==============================
 
-def decode_uploaded_image(file_bytes: bytes) -> np.ndarray:
-    data = np.frombuffer(file_bytes, dtype=np.uint8)
-    frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
-    if frame is None:
-        raise ValueError("Invalid image upload")
-    return frame
-
+def decode_uploaded_image(
+    file_bytes: bytes,
+    reduced: bool = False,
+) -> tuple[np.ndarray, tuple[int, int]]:
+    """The decoded frame and the upload's own ``(width, height)``. With
+    ``reduced``, JPEGs are DCT-scaled while decoding to the smallest size
+    that still covers ``FRAME_SIZE``, so the frame may be smaller."""
+    with stage_timer("decode"):
+        frame = get_codec().decode(file_bytes, FRAME_SIZE if reduced else None)
+
+    height, width = frame.shape[:2]
+    size = jpeg_size(file_bytes) if reduced else None
+    if size is None:
+        return frame, (width, height)
+    # The decoder applies EXIF rotation, which the SOF header knows nothing about.
+    if (size[0] > size[1]) != (width > height):
+        size = (size[1], size[0])
+    return frame, size
+
+
+def decode_uploaded_image_file(
+    image_path: Path,
+    reduced: bool = False,
+) -> tuple[np.ndarray, tuple[int, int]]:
+    return decode_uploaded_image(image_path.read_bytes(), reduced)
+
+
+def annotate_uploaded_image(
+    frame: np.ndarray,
+    boxes: np.ndarray,
+    quality: int = JPEG_QUALITY,
+    source_size: tuple[int, int] | None = None,
+) -> Payload:
+    """JSON result plus ``annotated_jpeg`` bytes; draws onto ``frame``.
+    ``boxes`` are in ``frame`` pixels and are reported in ``source_size``
+    pixels when the frame was decoded reduced."""
+    height, width = frame.shape[:2]
+    source_size = source_size or (width, height)
+    draw_scale = None
+    if source_size != (width, height):
+        to_source = np.array([source_size[0] / width, source_size[1] / height] * 2)
+        boxes = np.round(boxes * to_source).astype(np.int32)
+        draw_scale = (width / source_size[0], height / source_size[1])
 
-def detect_faces_from_uploaded_image(file_bytes: bytes) -> Payload:
-    frame = decode_uploaded_image(file_bytes)
-    payload, annotated = detect_frame_predict(frame)
+    payload = _make_payload(boxes, None)
+    with stage_timer("annotate"):
+        annotated = _thread_renderer().render(frame, boxes, None, draw_scale)
 
-    ok, buffer = cv2.imencode(".jpg", annotated)
-    if not ok:
-        raise RuntimeError("Failed to encode frame")
-    payload["annotated_jpeg"] = buffer.tobytes()
+    result = payload_to_json(payload)
+    result["image_size"] = list(source_size)
+    with stage_timer("encode"):
+        result["annotated_jpeg"] = get_codec().encode(annotated, quality)
 
-    return payload
+    return result
 
 
 # ==============================
 # VIDEO UPLOAD SUMMARY (TRACK)
 # ==============================
 
-def analyze_uploaded_video(
-    file_bytes: bytes,
-    suffix: str = ".mp4",
+def analyze_video_file(
+    input_path: Path,
+    output_path: Path,
+    progress: Callable[[int], None] | None = None,
+    stride: StrideOptions | None = None,
 ) -> Payload:
-    with NamedTemporaryFile(delete=False, suffix=suffix) as temp:
-        temp.write(file_bytes)
-        input_path = Path(temp.name)
-
     capture = cv2.VideoCapture(str(input_path))
     if not capture.isOpened():
-        input_path.unlink(missing_ok=True)
         raise ValueError("Invalid video upload")
 
-    output_path = input_path.with_name("processed_" + input_path.name)
-
     fourcc = cv2.VideoWriter_fourcc(*"mp4v")
     fps = capture.get(cv2.CAP_PROP_FPS) or 25
     width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -320,6 +340,16 @@ def analyze_uploaded_video(
         fps,
         (width, height),
     )
+    stride = stride or StrideOptions()
+    strided = StridedTracker(
+        detect_frame_boxes,
+        TrackerSession(frame_rate=stride.tracker_frame_rate(fps)),
+        stride,
+    )
+    # Draw straight onto the source-resolution frame instead of resizing
+    # the annotated FRAME_SIZE copy back up.
+    box_scale = (width / FRAME_SIZE[0], height / FRAME_SIZE[1])
+    renderer = FrameRenderer.for_scale(min(box_scale))
 
     unique_ids: set[int] = set()
     frames_processed = 0
@@ -333,8 +363,9 @@ def analyze_uploaded_video(
 
             frames_processed += 1
 
-            frame = cv2.resize(frame, FRAME_SIZE)
-            payload, annotated = detect_frame_track(frame)
+            boxes, track_ids = strided.process(cv2.resize(frame, FRAME_SIZE))
+            payload = _make_payload(boxes, track_ids)
+            writer.write(renderer.render(frame, boxes, track_ids, box_scale))
 
             count = payload["count"]
             frame_counts.append(
@@ -344,18 +375,18 @@ def analyze_uploaded_video(
                 }
             )
 
-            for detection in payload["detections"]:
-                unique_ids.add(int(detection["id"]))
+            if track_ids is not None:
+                unique_ids.update(track_ids.tolist())
 
-            annotated = cv2.resize(annotated, (width, height))
-            writer.write(annotated)
+            if progress:
+                progress(1)
     finally:
         capture.release()
         writer.release()
-        input_path.unlink(missing_ok=True)
 
     return {
         "frames_processed": frames_processed,
+        "frames_inferred": strided.frames_inferred,
         "unique_persons": len(unique_ids),
         "frame_wise_counts": frame_counts,
         "output_video_path": str(output_path),
@@ -367,32 +398,52 @@ def analyze_uploaded_video(
 # ==============================
 
 def generate_uploaded_video_detection_stream(
-    file_bytes: bytes,
-    suffix: str = ".mp4",
+    video_path: Path,
     on_frame: Callable[[dict[str, Any]], None] | None = None,
+    options: StreamOptions | None = None,
 ) -> Iterator[bytes]:
-    with NamedTemporaryFile(delete=False, suffix=suffix) as temp:
-        temp.write(file_bytes)
-        temp_path = Path(temp.name)
-
-    capture = cv2.VideoCapture(str(temp_path))
+    """Open ``video_path`` eagerly (raising ``ValueError`` before any bytes
+    are streamed) and return the MJPEG generator, which deletes the file
+    once it finishes."""
+    capture = cv2.VideoCapture(str(video_path))
     if not capture.isOpened():
-        temp_path.unlink(missing_ok=True)
+        video_path.unlink(missing_ok=True)
         raise ValueError("Invalid video upload")
 
-    try:
-        while True:
-            ok, frame = capture.read()
-            if not ok:
-                break
-
-            frame = cv2.resize(frame, FRAME_SIZE)
-            payload, annotated = detect_frame_track(frame)
+    tracker = TrackerSession(frame_rate=capture.get(cv2.CAP_PROP_FPS) or 25)
+    renderer = FrameRenderer()
+    options = options or StreamOptions()
+    limiter = FrameRateLimiter(options.max_fps)
+
+    def stream() -> Iterator[bytes]:
+        try:
+            while True:
+                with stage_timer("decode"):
+                    ok, frame = capture.read()
+                if not ok:
+                    break
+
+                with stage_timer("resize"):
+                    frame = cv2.resize(frame, FRAME_SIZE)
+                result = detect_frame_boxes(frame)
+                with stage_timer("track"):
+                    boxes, track_ids = tracker.update(result)
+                payload = _make_payload(boxes, track_ids)
+
+                if on_frame:
+                    on_frame(payload)
+                # Every frame is tracked; only output is throttled.
+                if not limiter.allow():
+                    continue
 
-            if on_frame:
-                on_frame(payload)
+                if options.metadata_only:
+                    yield multipart_json(payload)
+                else:
+                    with stage_timer("annotate"):
+                        annotated = renderer.render(frame, boxes, track_ids)
+                    yield multipart_jpeg(encode_jpeg(annotated, options))
+        finally:
+            capture.release()
+            video_path.unlink(missing_ok=True)
 
-            yield _multipart_frame(annotated)
-    finally:
-        capture.release()
-        temp_path.unlink(missing_ok=True)
+    return stream()
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import (
+    EXPORT_CACHE_MAX_BYTES,
+    EXPORT_CACHE_MAX_ENTRIES,
+    EXPORT_CACHE_TTL_SECONDS,
+    EXPORT_MAX_QUEUED,
+    EXPORT_NICE,
+    EXPORT_WORKER_THREADS,
+    EXPORT_WORKERS,
+    EXPORTS_DIR,
+)
+from .jobs import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    STATUSES,
+    JobQueueFullError,
+    OwnerLock,
+)
+from .metrics import Gauge
+from .openvino_export import _convert_in_worker, _init_export_worker, safe_model_name
+
+
+@dataclass
+class ExportJob:
+    export_id: str
+    export_dir: Path
+    model_name: str
+    int8: bool = False
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    last_used_at: float = field(default_factory=time.time)
+    size_bytes: int = 0
+    error: str | None = None
+    result: dict[str, Any] | None = None
+
+    @property
+    def input_path(self) -> Path:
+        return self.export_dir / "input.onnx"
+
+    @property
+    def calibration_dir(self) -> Path:
+        return self.export_dir / "calibration"
+
+    @property
+    def model_dir(self) -> Path:
+        return self.export_dir / "model"
+
+    def to_status(self) -> dict[str, Any]:
+        return {
+            "export_id": self.export_id,
+            "model_name": self.model_name,
+            "int8": self.int8,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "last_used_at": self.last_used_at,
+            "size_bytes": self.size_bytes,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class ExportStore:
+    """ONNX to OpenVINO conversions keyed by the SHA-256 of their inputs.
+
+    An identical upload returns the finished export straight away, or joins
+    the conversion already in flight. New conversions run as jobs in a
+    spawned, lower-priority process pool. Finished exports are evicted when
+    unused for ``ttl`` seconds, and least recently used first whenever the
+    cache holds more than ``max_entries`` exports or ``max_bytes`` on disk.
+    Exports the model registry is serving are never evicted.
+    """
+
+    def __init__(
+        self,
+        root: Path = EXPORTS_DIR,
+        workers: int = EXPORT_WORKERS,
+        max_queued: int = EXPORT_MAX_QUEUED,
+        max_entries: int = EXPORT_CACHE_MAX_ENTRIES,
+        max_bytes: int = EXPORT_CACHE_MAX_BYTES,
+        ttl: float = EXPORT_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.root = root
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._jobs: dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        # Threads track job state; the conversion itself runs in the pool.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="model-export",
+        )
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        self._owner = OwnerLock(root)
+
+    @property
+    def incoming(self) -> Path:
+        """Spool directory on the same filesystem, so submits are renames."""
+        return self.root / "incoming"
+
+    def submit(
+        self,
+        onnx_path: Path,
+        content_hash: str,
+        model_name: str,
+        calibration_paths: list[Path] | None = None,
+    ) -> tuple[ExportJob, bool]:
+        """Take ownership of the spooled files; returns the job and whether
+        an existing export was reused."""
+        calibration_paths = calibration_paths or []
+        with self._lock:
+            job = self._jobs.get(content_hash)
+            if job is not None and job.status != JOB_FAILED:
+                job.last_used_at = time.time()
+                reused = True
+            else:
+                pending = sum(
+                    job.status in {JOB_QUEUED, JOB_RUNNING} for job in self._jobs.values()
+                )
+                if pending >= self.max_queued:
+                    job = None
+                else:
+                    job = ExportJob(
+                        export_id=content_hash,
+                        export_dir=self.root / content_hash,
+                        model_name=safe_model_name(model_name),
+                        int8=bool(calibration_paths),
+                    )
+                    self._jobs[content_hash] = job
+                reused = False
+
+        if reused or job is None:
+            onnx_path.unlink(missing_ok=True)
+            for path in calibration_paths:
+                path.unlink(missing_ok=True)
+            if job is None:
+                raise JobQueueFullError("Too many model exports in progress, retry later")
+            self._write_meta(job)
+            return job, True
+
+        shutil.rmtree(job.export_dir, ignore_errors=True)
+        job.calibration_dir.mkdir(parents=True, exist_ok=True)
+        shutil.move(onnx_path, job.input_path)
+        for index, path in enumerate(calibration_paths):
+            shutil.move(path, job.calibration_dir / f"{index:05d}{path.suffix}")
+        self._write_meta(job)
+        self._executor.submit(self._run, job)
+        self.evict()
+        return job, False
+
+    def get(self, export_id: str) -> ExportJob:
+        with self._lock:
+            job = self._jobs.get(export_id)
+        if job is None:
+            raise KeyError(export_id)
+        return job
+
+    def exports(self) -> list[ExportJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def status_counts(self) -> dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in STATUSES}
+
+    def find(self, export_id: str) -> ExportJob:
+        """``get``, falling back to the export's metadata on disk. Video
+        worker processes never start the store and only see exports this way."""
+        try:
+            return self.get(export_id)
+        except KeyError:
+            job = self._read_meta(self.root / export_id / "export.json")
+        if job is None:
+            raise KeyError(export_id)
+        return job
+
+    def touch(self, export_id: str) -> None:
+        """Mark an export as used now, e.g. when a model is loaded from it."""
+        job = self.find(export_id)
+        job.last_used_at = time.time()
+        self._write_meta(job)
+
+    def delete(self, export_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(export_id)
+            if job is None:
+                raise KeyError(export_id)
+            if job.status in {JOB_QUEUED, JOB_RUNNING}:
+                raise ValueError(f"Export is {job.status}")
+            del self._jobs[export_id]
+        shutil.rmtree(job.export_dir, ignore_errors=True)
+
+    def evict(self) -> int:
+        # Imported lazily: the registry imports this module lazily as well.
+        from .model_registry import model_registry
+
+        with self._lock:
+            export_ids = list(self._jobs)
+        serving = {
+            export_id for export_id in export_ids if model_registry.in_use(f"export:{export_id}")
+        }
+
+        now = time.time()
+        with self._lock:
+            finished = [
+                job
+                for job in self._jobs.values()
+                if job.finished_at is not None and job.export_id not in serving
+            ]
+            victims = [job for job in finished if now - job.last_used_at > self.ttl]
+            evicted = {job.export_id for job in victims}
+
+            entries = len(self._jobs) - len(victims)
+            total = sum(
+                job.size_bytes for job in self._jobs.values() if job.export_id not in evicted
+            )
+            for job in sorted(finished, key=lambda job: job.last_used_at):
+                if entries <= self.max_entries and total <= self.max_bytes:
+                    break
+                if job.export_id in evicted:
+                    continue
+                victims.append(job)
+                entries -= 1
+                total -= job.size_bytes
+
+            for job in victims:
+                self._jobs.pop(job.export_id, None)
+
+        for job in victims:
+            shutil.rmtree(job.export_dir, ignore_errors=True)
+        return len(victims)
+
+    def start(self) -> None:
+        """Load the exports found under ``root``; called on server startup.
+
+        Only the process holding the store's lock file clears the upload
+        spool and fails jobs left queued or running, since other workers
+        sharing ``root`` may still be converting theirs.
+        """
+        owner = self._owner.acquire()
+        if owner:
+            shutil.rmtree(self.incoming, ignore_errors=True)
+        self._load_existing(fail_interrupted=owner)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._owner.release()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_export_worker,
+                    initargs=(EXPORT_NICE, EXPORT_WORKER_THREADS),
+                )
+            return self._pool
+
+    def _run(self, job: ExportJob) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        self._write_meta(job)
+
+        calibration = sorted(str(path) for path in job.calibration_dir.glob("*"))
+        pool = self._get_pool()
+        try:
+            job.result = pool.submit(
+                _convert_in_worker,
+                str(job.input_path),
+                str(job.model_dir),
+                job.model_name,
+                calibration,
+            ).result()
+            job.status = JOB_COMPLETED
+        except BrokenProcessPool as exc:
+            # A crashed worker (e.g. OOM in ovc) breaks the whole pool;
+            # start a fresh one for the next export.
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            job.status = JOB_FAILED
+            job.error = f"Export worker crashed: {exc}"
+        except Exception as exc:
+            job.status = JOB_FAILED
+            job.error = str(exc) or exc.__class__.__name__
+        finally:
+            job.input_path.unlink(missing_ok=True)
+            shutil.rmtree(job.calibration_dir, ignore_errors=True)
+            job.size_bytes = sum(
+                path.stat().st_size for path in job.export_dir.rglob("*") if path.is_file()
+            )
+            job.finished_at = time.time()
+            job.last_used_at = job.finished_at
+            self._write_meta(job)
+        self.evict()
+
+    def _write_meta(self, job: ExportJob) -> None:
+        if not job.export_dir.exists():
+            return
+        meta = asdict(job)
+        meta["export_dir"] = str(job.export_dir)
+        (job.export_dir / "export.json").write_text(json.dumps(meta))
+
+    @staticmethod
+    def _read_meta(meta_path: Path) -> ExportJob | None:
+        try:
+            meta = json.loads(meta_path.read_text())
+            meta["export_dir"] = Path(meta["export_dir"])
+            return ExportJob(**meta)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _load_existing(self, fail_interrupted: bool) -> None:
+        if not self.root.exists():
+            return
+
+        for meta_path in self.root.glob("*/export.json"):
+            job = self._read_meta(meta_path)
+            if job is None:
+                continue
+
+            if fail_interrupted and job.status in {JOB_QUEUED, JOB_RUNNING}:
+                job.status = JOB_FAILED
+                job.error = "Interrupted by server restart"
+                job.finished_at = time.time()
+                self._write_meta(job)
+            with self._lock:
+                self._jobs.setdefault(job.export_id, job)
+
+
+export_store = ExportStore()
+
+Gauge(
+    "person_detection_model_exports",
+    "OpenVINO model exports by status.",
+    labels=("status",),
+    collect=lambda: {
+        (status,): float(count) for status, count in export_store.status_counts().items()
+    },
+)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+import cv2
+import numpy as np
+
+from .cameras import CameraConfig
+from .config import CAPTURE_RECONNECT_DELAY, FRAME_RING_SLOTS
+from .detection import open_realtime_capture
+from .metrics import stage_timer
+
+GrabbedFrame = tuple[int, np.ndarray, float]
+
+
+class FrameGrabber:
+    """Decodes a realtime source on its own thread and keeps only the newest
+    frame, so inference never works through a backlog of stale frames.
+
+    Frames live in a small ring of reusable buffers. The writer never touches
+    the newest slot or the slot handed to the consumer, so a frame returned by
+    ``read_latest`` stays valid until the next call. Single consumer only.
+    """
+
+    def __init__(
+        self,
+        camera: CameraConfig,
+        slots: int = FRAME_RING_SLOTS,
+        on_grab: Callable[[], None] | None = None,
+    ) -> None:
+        self.camera = camera
+        self._on_grab = on_grab
+        self._slots: list[np.ndarray | None] = [None] * max(3, slots)
+        self._timestamps = [0.0] * len(self._slots)
+        self._latest = -1
+        self._reading = -1
+        self._seq = 0
+        self._consumed_seq = 0
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._capture: cv2.VideoCapture | None = None
+        self.connected = False
+        self.frames_grabbed = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+
+    def start(self) -> bool:
+        """Open the source and start grabbing. Returns whether the first open
+        succeeded; on failure the grabber keeps retrying in the background."""
+        self._capture = self._open()
+        self.connected = self._capture is not None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"frame-grabber-{self.camera.camera_id}",
+            daemon=True,
+        )
+        self._thread.start()
+        return self.connected
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def read_latest(self, timeout: float = 1.0) -> GrabbedFrame | None:
+        """Return ``(seq, frame, captured_at)`` for the newest unseen frame,
+        counting every frame that was overwritten before it was consumed."""
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._seq > self._consumed_seq or self._stop.is_set(),
+                timeout=timeout,
+            )
+            if self._seq <= self._consumed_seq:
+                return None
+
+            self.frames_dropped += self._seq - self._consumed_seq - 1
+            self._consumed_seq = self._seq
+            self._reading = self._latest
+            return self._seq, self._slots[self._latest], self._timestamps[self._latest]
+
+    def _open(self) -> cv2.VideoCapture | None:
+        return open_realtime_capture(self.camera.webcam_index, self.camera.rtsp_url)
+
+    def _next_slot(self) -> int:
+        with self._lock:
+            busy = {self._latest, self._reading}
+        for idx in range(len(self._slots)):
+            if idx not in busy:
+                return idx
+        raise RuntimeError("Frame ring exhausted")
+
+    def _reconnect(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+        self._capture = None
+        self.connected = False
+
+        while not self._stop.is_set():
+            self._capture = self._open()
+            if self._capture is not None:
+                self.connected = True
+                self.reconnects += 1
+                return
+            self._stop.wait(CAPTURE_RECONNECT_DELAY)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                if self._capture is None:
+                    self._reconnect()
+                    continue
+
+                idx = self._next_slot()
+                with stage_timer("capture"):
+                    ok, frame = self._capture.read(self._slots[idx])
+                if not ok or frame is None:
+                    time.sleep(0.2)
+                    self._reconnect()
+                    continue
+
+                with self._frame_ready:
+                    self._slots[idx] = frame
+                    self._timestamps[idx] = time.monotonic()
+                    self._latest = idx
+                    self._seq += 1
+                    self.frames_grabbed += 1
+                    self._frame_ready.notify_all()
+
+                if self._on_grab is not None:
+                    self._on_grab()
+        finally:
+            if self._capture is not None:
+                self._capture.release()
+            self._capture = None
+            self.connected = False
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+import numpy as np
+
+from .config import IMAGE_BATCH_MAX_WAIT_MS, IMAGE_BATCH_SIZE
+from .detection import predict_image_boxes
+from .metrics import Counter, Gauge
+
+BatchPredictor = Callable[[list[np.ndarray]], list[np.ndarray]]
+
+
+class ImageBatcher:
+    """Gathers images submitted by concurrent requests and runs them through
+    the model together.
+
+    The first image of a batch waits at most ``max_wait`` seconds for others
+    to arrive; the batch is dispatched as soon as it holds ``max_batch``
+    images. With ``max_batch=1`` every image gets its own predict call.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = IMAGE_BATCH_SIZE,
+        max_wait: float = IMAGE_BATCH_MAX_WAIT_MS / 1000.0,
+        predict: BatchPredictor = predict_image_boxes,
+    ) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._predict = predict
+        self._queue: queue.SimpleQueue[tuple[np.ndarray, Future] | None] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.batches_run = 0
+        self.images_inferred = 0
+        self.max_batch_seen = 0
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue ``frame``; the future resolves to its ``(N, 4)`` boxes."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Image batcher is shut down")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="image-batcher",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._queue.put((frame, future))
+        return future
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        return self.submit(frame).result()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000.0, 3),
+            "batches_run": self.batches_run,
+            "images_inferred": self.images_inferred,
+            "mean_batch_size": (
+                round(self.images_inferred / self.batches_run, 2) if self.batches_run else 0.0
+            ),
+            "max_batch_seen": self.max_batch_seen,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def _collect(self, first: tuple[np.ndarray, Future]) -> list[tuple[np.ndarray, Future]]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            # Requests whose client went away cancel their future; skip them.
+            batch = [
+                (frame, future)
+                for frame, future in self._collect(first)
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+
+            try:
+                results = self._predict([frame for frame, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            self.batches_run += 1
+            self.images_inferred += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            for (_, future), boxes in zip(batch, results):
+                future.set_result(boxes)
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Image batcher is shut down"))
+
+
+image_batcher = ImageBatcher()
+
+Gauge(
+    "person_detection_image_batch_queue_depth",
+    "Uploaded images waiting for the image batcher.",
+    collect=lambda: {(): float(image_batcher._queue.qsize())},
+)
+Counter(
+    "person_detection_image_batches_total",
+    "Batched predict calls run for uploaded images.",
+    collect=lambda: {(): float(image_batcher.batches_run)},
+)
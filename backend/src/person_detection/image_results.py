@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from .config import IMAGE_RESULT_MAX_ITEMS, IMAGE_RESULT_TTL_SECONDS
+
+
+class ImageResultStore:
+    """Short-lived in-memory store for annotated JPEGs returned by URL."""
+
+    def __init__(
+        self,
+        ttl: float = IMAGE_RESULT_TTL_SECONDS,
+        max_items: int = IMAGE_RESULT_MAX_ITEMS,
+    ) -> None:
+        self.ttl = ttl
+        self.max_items = max(1, max_items)
+        self._items: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, jpeg: bytes) -> str:
+        result_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict(time.monotonic())
+            self._items[result_id] = (time.monotonic() + self.ttl, jpeg)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> bytes:
+        with self._lock:
+            self._evict(time.monotonic())
+            item = self._items.get(result_id)
+        if item is None:
+            raise KeyError(result_id)
+        return item[1]
+
+    def _evict(self, now: float) -> None:
+        while self._items:
+            result_id, (expires, _) = next(iter(self._items.items()))
+            if expires > now:
+                return
+            del self._items[result_id]
+
+
+image_result_store = ImageResultStore()
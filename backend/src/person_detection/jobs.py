@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import cv2
+
+from .config import JOB_TTL_SECONDS, JOBS_DIR, MAX_CONCURRENT_JOBS, MAX_QUEUED_JOBS
+from .metrics import Gauge
+from .stride import STRIDE_OFF, StrideOptions
+from .video_workers import analyze_video_file_parallel
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED)
+
+
+class JobQueueFullError(RuntimeError):
+    pass
+
+
+class OwnerLock:
+    """Exclusive lock on ``root/.owner`` held for the process' lifetime.
+
+    Several server processes may share a job directory; only the holder
+    cleans up after jobs a previous server left unfinished.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._file: Any = None
+
+    def acquire(self) -> bool:
+        """``False`` if another live process holds the lock."""
+        if self._file is not None or fcntl is None:
+            return True
+        self.root.mkdir(parents=True, exist_ok=True)
+        owner_file = open(self.root / ".owner", "a")
+        try:
+            fcntl.flock(owner_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            owner_file.close()
+            return False
+        self._file = owner_file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@dataclass
+class VideoJob:
+    job_id: str
+    job_dir: Path
+    suffix: str = ".mp4"
+    stride_mode: str = STRIDE_OFF
+    stride: int = 1
+    status: str = JOB_QUEUED
+    frames_total: int = 0
+    frames_processed: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+
+    @property
+    def input_path(self) -> Path:
+        return self.job_dir / f"input{self.suffix}"
+
+    @property
+    def output_path(self) -> Path:
+        return self.job_dir / "processed.mp4"
+
+    @property
+    def result_path(self) -> Path:
+        return self.job_dir / "result.json"
+
+    @property
+    def fps(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.frames_processed / elapsed if elapsed > 0 else 0.0
+
+    def to_status(self) -> dict[str, Any]:
+        progress = 0.0
+        if self.status == JOB_COMPLETED:
+            progress = 1.0
+        elif self.frames_total > 0:
+            progress = min(1.0, self.frames_processed / self.frames_total)
+
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "frames_processed": self.frames_processed,
+            "frames_total": self.frames_total,
+            "progress": round(progress, 4),
+            "fps": round(self.fps, 2),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class VideoJobStore:
+    """Queues video analysis jobs, throttles how many run at once and keeps
+    their results on disk until ``ttl`` seconds after they finish."""
+
+    def __init__(
+        self,
+        root: Path = JOBS_DIR,
+        ttl: float = JOB_TTL_SECONDS,
+        max_concurrent: int = MAX_CONCURRENT_JOBS,
+        max_queued: int = MAX_QUEUED_JOBS,
+    ) -> None:
+        self.root = root
+        self.ttl = ttl
+        self.max_queued = max_queued
+        self._jobs: dict[str, VideoJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrent),
+            thread_name_prefix="video-job",
+        )
+        self._owner = OwnerLock(root)
+
+    def submit(
+        self,
+        upload_path: Path,
+        suffix: str = ".mp4",
+        stride: StrideOptions | None = None,
+    ) -> VideoJob:
+        """Take ownership of an already spooled upload and queue it."""
+        self.cleanup_expired()
+        with self._lock:
+            pending = sum(
+                job.status in {JOB_QUEUED, JOB_RUNNING} for job in self._jobs.values()
+            )
+        if pending >= self.max_queued:
+            upload_path.unlink(missing_ok=True)
+            raise JobQueueFullError("Too many video jobs in progress, retry later")
+
+        job_id = uuid.uuid4().hex
+        stride = stride or StrideOptions()
+        job = VideoJob(
+            job_id=job_id,
+            job_dir=self.root / job_id,
+            suffix=suffix,
+            stride_mode=stride.mode,
+            stride=stride.stride,
+        )
+        job.job_dir.mkdir(parents=True, exist_ok=True)
+        shutil.move(upload_path, job.input_path)
+
+        capture = cv2.VideoCapture(str(job.input_path))
+        opened = capture.isOpened()
+        job.frames_total = max(0, int(capture.get(cv2.CAP_PROP_FRAME_COUNT))) if opened else 0
+        capture.release()
+        if not opened:
+            shutil.rmtree(job.job_dir, ignore_errors=True)
+            raise ValueError("Invalid video upload")
+
+        with self._lock:
+            self._jobs[job_id] = job
+        self._write_meta(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> VideoJob:
+        self.cleanup_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def result(self, job: VideoJob) -> dict[str, Any]:
+        return json.loads(job.result_path.read_text())
+
+    def status_counts(self) -> dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in STATUSES}
+
+    def cleanup_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [
+                job
+                for job in self._jobs.values()
+                if job.finished_at is not None and now - job.finished_at > self.ttl
+            ]
+            for job in expired:
+                self._jobs.pop(job.job_id, None)
+
+        for job in expired:
+            shutil.rmtree(job.job_dir, ignore_errors=True)
+        return len(expired)
+
+    def start(self) -> None:
+        """Load the jobs found under ``root``; called on server startup.
+        Only the lock owner fails jobs left queued or running, since other
+        workers sharing ``root`` may still be processing theirs."""
+        self._load_existing(fail_interrupted=self._owner.acquire())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._owner.release()
+
+    def _run(self, job: VideoJob) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        self._write_meta(job)
+
+        def on_progress(frames: int) -> None:
+            with self._lock:
+                job.frames_processed += frames
+
+        try:
+            result = analyze_video_file_parallel(
+                job.input_path,
+                job.output_path,
+                progress=on_progress,
+                stride=StrideOptions.from_query(job.stride_mode, job.stride),
+            )
+            job.frames_processed = result["frames_processed"]
+            job.result_path.write_text(
+                json.dumps(
+                    {
+                        "frames_processed": result["frames_processed"],
+                        "frames_inferred": result["frames_inferred"],
+                        "unique_person_count": result["unique_persons"],
+                        "frame_detections": result["frame_wise_counts"],
+                    }
+                )
+            )
+            job.status = JOB_COMPLETED
+        except Exception as exc:
+            job.status = JOB_FAILED
+            job.error = str(exc) or exc.__class__.__name__
+        finally:
+            job.finished_at = time.time()
+            job.input_path.unlink(missing_ok=True)
+            self._write_meta(job)
+
+    def _write_meta(self, job: VideoJob) -> None:
+        meta = asdict(job)
+        meta["job_dir"] = str(job.job_dir)
+        (job.job_dir / "job.json").write_text(json.dumps(meta))
+
+    def _load_existing(self, fail_interrupted: bool) -> None:
+        if not self.root.exists():
+            return
+
+        for meta_path in self.root.glob("*/job.json"):
+            try:
+                meta = json.loads(meta_path.read_text())
+                meta["job_dir"] = Path(meta["job_dir"])
+                job = VideoJob(**meta)
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+
+            if fail_interrupted and job.status in {JOB_QUEUED, JOB_RUNNING}:
+                job.status = JOB_FAILED
+                job.error = "Interrupted by server restart"
+                job.finished_at = time.time()
+                self._write_meta(job)
+            self._jobs[job.job_id] = job
+
+
+video_job_store = VideoJobStore()
+
+Gauge(
+    "person_detection_video_jobs",
+    "Video analysis jobs by status.",
+    labels=("status",),
+    collect=lambda: {
+        (status,): float(count) for status, count in video_job_store.status_counts().items()
+    },
+)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import threading
+
+import cv2
+import numpy as np
+
+from .config import JPEG_CODEC, JPEG_QUALITY, TURBOJPEG_LIB_PATH
+
+try:
+    from turbojpeg import TJPF_BGR, TurboJPEG
+
+    TURBOJPEG_AVAILABLE = True
+except Exception:
+    TurboJPEG = None
+    TJPF_BGR = 0
+    TURBOJPEG_AVAILABLE = False
+
+Size = tuple[int, int]
+
+_APP1 = 0xE1
+_SOS = 0xDA
+_EXIF_HEADER = b"Exif\x00\x00"
+_ORIENTATION_TAG = 0x0112
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_OPENCV_REDUCED = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def jpeg_size(data: bytes) -> Size | None:
+    """``(width, height)`` from a JPEG's SOF header, or ``None`` if ``data``
+    is not a JPEG."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        length = int.from_bytes(data[offset + 2 : offset + 4], "big")
+        if marker in _SOF_MARKERS:
+            height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+            width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+            return width, height
+        offset += 2 + length
+    return None
+
+
+def jpeg_orientation(data: bytes) -> int:
+    """EXIF orientation (1-8) of a JPEG; 1 when it has none."""
+    if data[:2] != b"\xff\xd8":
+        return 1
+    offset = 2
+    while offset + 4 <= len(data) and data[offset] == 0xFF:
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        # EXIF sits in the header segments, before any frame or scan.
+        if marker == _SOS or marker in _SOF_MARKERS:
+            break
+        length = int.from_bytes(data[offset + 2 : offset + 4], "big")
+        segment = data[offset + 4 : offset + 2 + length]
+        if marker == _APP1 and segment.startswith(_EXIF_HEADER):
+            return _exif_orientation(segment[len(_EXIF_HEADER) :])
+        offset += 2 + length
+    return 1
+
+
+def _exif_orientation(tiff: bytes) -> int:
+    byteorder = {b"II": "little", b"MM": "big"}.get(tiff[:2])
+    if byteorder is None:
+        return 1
+
+    def read(offset: int, size: int) -> int:
+        return int.from_bytes(tiff[offset : offset + size], byteorder)
+
+    ifd = read(4, 4)
+    if ifd + 2 > len(tiff):
+        return 1
+    for index in range(read(ifd, 2)):
+        entry = ifd + 2 + 12 * index
+        if entry + 12 > len(tiff):
+            break
+        if read(entry, 2) == _ORIENTATION_TAG:
+            orientation = read(entry + 8, 2)
+            return orientation if 1 <= orientation <= 8 else 1
+    return 1
+
+
+def reduction_for(size: Size, min_size: Size, factors: list[int]) -> int:
+    """Largest DCT reduction that keeps the image at least ``min_size``."""
+    width, height = size
+    best = 1
+    for factor in sorted(factors):
+        if width // factor >= min_size[0] and height // factor >= min_size[1]:
+            best = factor
+    return best
+
+
+class OpenCVCodec:
+    name = "opencv"
+
+    def decode(self, data: bytes, min_size: Size | None = None) -> np.ndarray:
+        flag = cv2.IMREAD_COLOR
+        if min_size is not None:
+            size = jpeg_size(data)
+            if size is not None:
+                flag = _OPENCV_REDUCED[reduction_for(size, min_size, list(_OPENCV_REDUCED))]
+
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+        if frame is None:
+            raise ValueError("Invalid image upload")
+        return frame
+
+    def encode(self, frame: np.ndarray, quality: int = JPEG_QUALITY) -> bytes:
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError("Failed to encode frame")
+        return buffer.tobytes()
+
+
+class TurboJPEGCodec:
+    """libjpeg-turbo via PyTurboJPEG. Non-JPEG input, and JPEGs with an EXIF
+    orientation (which libjpeg-turbo does not apply), fall back to OpenCV."""
+
+    name = "turbojpeg"
+
+    def __init__(self, lib_path: str | None = TURBOJPEG_LIB_PATH) -> None:
+        if not TURBOJPEG_AVAILABLE:
+            raise RuntimeError("PyTurboJPEG is not installed")
+        self._jpeg = TurboJPEG(lib_path)
+        self._fallback = OpenCVCodec()
+        # Exact 1/n factors only, so boxes map back with a simple scale.
+        self._factors = {
+            den // num: (num, den)
+            for num, den in self._jpeg.scaling_factors
+            if num == 1 and den in (1, 2, 4, 8)
+        }
+
+    def decode(self, data: bytes, min_size: Size | None = None) -> np.ndarray:
+        size = jpeg_size(data)
+        if size is None or jpeg_orientation(data) != 1:
+            return self._fallback.decode(data, min_size)
+
+        scaling = None
+        if min_size is not None:
+            factor = reduction_for(size, min_size, list(self._factors))
+            scaling = self._factors[factor] if factor > 1 else None
+        try:
+            return self._jpeg.decode(data, pixel_format=TJPF_BGR, scaling_factor=scaling)
+        except OSError as exc:
+            raise ValueError("Invalid image upload") from exc
+
+    def encode(self, frame: np.ndarray, quality: int = JPEG_QUALITY) -> bytes:
+        return self._jpeg.encode(np.ascontiguousarray(frame), quality=quality, pixel_format=TJPF_BGR)
+
+
+JpegCodec = OpenCVCodec | TurboJPEGCodec
+
+_codecs: dict[str, JpegCodec] = {}
+_codecs_lock = threading.Lock()
+
+
+def available_codecs() -> list[str]:
+    names = [OpenCVCodec.name]
+    try:
+        get_codec(TurboJPEGCodec.name)
+        names.append(TurboJPEGCodec.name)
+    except RuntimeError:
+        pass
+    return names
+
+
+def get_codec(name: str = JPEG_CODEC) -> JpegCodec:
+    """``"auto"`` picks turbojpeg when its Python package and native library
+    load, otherwise OpenCV. Asking for an unavailable codec raises
+    ``RuntimeError``."""
+    with _codecs_lock:
+        codec = _codecs.get(name)
+        if codec is not None:
+            return codec
+
+        if name in ("auto", TurboJPEGCodec.name):
+            try:
+                codec = TurboJPEGCodec()
+            except Exception as exc:
+                if name != "auto":
+                    raise RuntimeError(f"turbojpeg codec unavailable: {exc}") from exc
+        if codec is None and name in ("auto", OpenCVCodec.name):
+            codec = OpenCVCodec()
+        if codec is None:
+            raise RuntimeError(f"Unknown JPEG codec '{name}'")
+
+        _codecs[name] = codec
+        return codec
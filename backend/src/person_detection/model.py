@@ -1,23 +1,83 @@
-from ultralytics import YOLO
-from .config import MODEL_OPENVINO_DIR, MODEL_PT_PATH
+from __future__ import annotations
 
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .config import (
+    INFERENCE_BACKEND,
+    MODEL_OPENVINO_DIR,
+    MODEL_OPENVINO_INT8_DIR,
+    MODEL_PRECISION,
+    MODEL_PT_PATH,
+)
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+    from .openvino_backend import OpenVINODetector
+
+MODEL_PRECISIONS = {"fp", "int8"}
+
+
+def load_model(precision: str = MODEL_PRECISION) -> YOLO | OpenVINODetector:
+    openvino_dir = _openvino_dir(precision)
+    if openvino_dir.exists():
+        return load_openvino_model(openvino_dir, precision)
+
+    if MODEL_PT_PATH.exists():
+        # Imported here so that importing the package does not pull in torch.
+        from ultralytics import YOLO
 
-def load_model() -> YOLO:
-    if MODEL_OPENVINO_DIR.exists():
-        print("Loading OpenVINO model...")
-        model = YOLO(str(MODEL_OPENVINO_DIR), task="detect")
-    elif MODEL_PT_PATH.exists():
         print("Loading PyTorch model...")
-        model = YOLO(str(MODEL_PT_PATH), task="detect")
-    else:
-        raise RuntimeError("No model found.")
+        return _fused(YOLO(str(MODEL_PT_PATH), task="detect"))
+    raise RuntimeError("No model found.")
+
+
+def load_openvino_model(model_dir: Path, label: str = "fp") -> YOLO | OpenVINODetector:
+    """Load an OpenVINO IR directory with the native backend when enabled,
+    otherwise through ultralytics."""
+    if _use_native_openvino():
+        from .openvino_backend import OpenVINODetector
 
+        model = OpenVINODetector(model_dir)
+        print(
+            "Loaded OpenVINO {label} model (native, {performance_hint}, "
+            "{infer_requests} infer requests)".format(label=label, **model.info)
+        )
+        return model
+
+    from ultralytics import YOLO
+
+    print(f"Loading OpenVINO {label} model...")
+    return _fused(YOLO(str(model_dir), task="detect"))
+
+
+def _fused(model: YOLO) -> YOLO:
     try:
         model.fuse()
     except Exception:
         pass
-
     return model
 
 
-model = load_model()
+def _openvino_dir(precision: str) -> Path:
+    if precision not in MODEL_PRECISIONS:
+        raise RuntimeError(f"Unknown model precision '{precision}'")
+    if precision == "fp":
+        return MODEL_OPENVINO_DIR
+    if not MODEL_OPENVINO_INT8_DIR.exists():
+        raise RuntimeError(
+            f"INT8 model not found at {MODEL_OPENVINO_INT8_DIR}; "
+            "create it with python -m person_detection.quantization"
+        )
+    return MODEL_OPENVINO_INT8_DIR
+
+
+def _use_native_openvino() -> bool:
+    from .openvino_backend import OPENVINO_AVAILABLE
+
+    if INFERENCE_BACKEND == "openvino":
+        if not OPENVINO_AVAILABLE:
+            raise RuntimeError("INFERENCE_BACKEND=openvino but OpenVINO is not installed")
+        return True
+    return INFERENCE_BACKEND == "auto" and OPENVINO_AVAILABLE
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+from .config import (
+    CONF_THRESHOLD,
+    FRAME_SIZE,
+    IOU_THRESHOLD,
+    MODEL_OPENVINO_INT8_DIR,
+    MODEL_PRECISION,
+    MODEL_WARMUP_RUNS,
+)
+from .metrics import Counter, Gauge
+from .model import MODEL_PRECISIONS, load_model, load_openvino_model
+
+# Model ids are "builtin:<precision>" for the bundled IR and
+# "export:<export_id>[:int8]" for finished /api/model/export/openvino jobs.
+DEFAULT_MODEL_ID = f"builtin:{MODEL_PRECISION}"
+
+# Baseline for the reported cold start; imported with the app, before any model work.
+_IMPORTED_AT = time.monotonic()
+
+
+class LoadedModel:
+    """One detector instance and the number of inference calls using it."""
+
+    def __init__(self, model_id: str, model: Any) -> None:
+        self.model_id = model_id
+        self.model = model
+        # ultralytics YOLO keeps per-call state on its predictor, so calls into
+        # it are serialised; backends that declare ``thread_safe`` run freely.
+        self.guard: AbstractContextManager = (
+            nullcontext() if getattr(model, "thread_safe", False) else threading.Lock()
+        )
+        self.loaded_at = time.time()
+        self.leases = 0
+        self.warmed = False
+        self.retired = False
+        self.timings: dict[str, float] = {}
+
+    def to_status(self) -> dict[str, Any]:
+        info = getattr(self.model, "info", None)
+        return {
+            "model_id": self.model_id,
+            "loaded_at": self.loaded_at,
+            "warmed": self.warmed,
+            "in_flight": self.leases,
+            "backend": info if isinstance(info, dict) else type(self.model).__name__,
+            **self.timings,
+        }
+
+
+class ModelRegistry:
+    """Loaded detectors, the active one, and per-camera pins.
+
+    Inference borrows a model through ``lease``. ``activate`` and ``pin``
+    load and warm up the new model before switching to it, under one lock,
+    so the next frame uses it and live streams never stop. A model that is
+    neither active nor pinned is retired. Its instance is freed as soon as
+    the last in-flight lease returns, so swapping repeatedly does not grow
+    memory.
+    """
+
+    def __init__(
+        self,
+        active_id: str = DEFAULT_MODEL_ID,
+        warmup_runs: int = MODEL_WARMUP_RUNS,
+        frame_size: tuple[int, int] = FRAME_SIZE,
+    ) -> None:
+        self.warmup_runs = warmup_runs
+        self.frame_size = frame_size
+        self._active_id = active_id
+        self._models: dict[str, LoadedModel] = {}
+        self._pins: dict[str, str] = {}
+        # Being loaded for activate/pin; kept out of retirement meanwhile.
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._ready = threading.Event()
+        self.error: str | None = None
+        self.timings: dict[str, float] = {}
+        self.swaps = 0
+        self.models_freed = 0
+
+    @property
+    def active_id(self) -> str:
+        return self._active_id
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def resolve(self, camera_id: str | None = None) -> str:
+        """Model id serving ``camera_id`` (the active model when unpinned)."""
+        with self._lock:
+            return self._resolve_locked(camera_id)
+
+    @contextmanager
+    def lease(self, camera_id: str | None = None) -> Iterator[Any]:
+        """Borrow the model serving ``camera_id`` for one inference call;
+        the first call loads it if nothing has yet. Models that are not
+        thread safe are lent to one caller at a time."""
+        entry = self._acquire(camera_id)
+        try:
+            with entry.guard:
+                yield entry.model
+        finally:
+            self._release(entry)
+
+    def get(self, camera_id: str | None = None) -> Any:
+        """The current model without a lease, for inspection only."""
+        with self.lease(camera_id) as model:
+            return model
+
+    def load(self, model_id: str, warmup_runs: int = 0) -> LoadedModel:
+        """Load ``model_id`` once; concurrent callers wait for the same load.
+        Raises ``KeyError`` for unknown exports and ``ValueError`` for ids
+        that cannot be served."""
+        with self._lock:
+            entry = self._models.get(model_id)
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+        if entry is None:
+            with load_lock:
+                with self._lock:
+                    entry = self._models.get(model_id)
+                if entry is None:
+                    entry = self._load(model_id)
+        if warmup_runs and not entry.warmed:
+            with load_lock:
+                if not entry.warmed:
+                    self._warm_up(entry, warmup_runs)
+        return entry
+
+    def activate(self, model_id: str, warmup_runs: int | None = None) -> dict[str, Any]:
+        self._prepare(model_id, self.warmup_runs if warmup_runs is None else warmup_runs)
+        with self._lock:
+            self._unpend_locked(model_id)
+            if self._active_id != model_id:
+                self._active_id = model_id
+                self.swaps += 1
+            freed = self._retire_unused_locked()
+        self._free(freed)
+        return self.status()
+
+    def pin(self, camera_id: str, model_id: str | None) -> dict[str, Any]:
+        """Serve ``camera_id`` from ``model_id``; ``None`` follows the active model."""
+        if model_id is not None:
+            self._prepare(model_id, self.warmup_runs)
+        with self._lock:
+            if model_id is None:
+                self._pins.pop(camera_id, None)
+            else:
+                self._unpend_locked(model_id)
+                self._pins[camera_id] = model_id
+            freed = self._retire_unused_locked()
+        self._free(freed)
+        return self.status()
+
+    def in_use(self, prefix: str) -> bool:
+        """Whether any loaded, active or pinned model id starts with ``prefix``."""
+        with self._lock:
+            ids = {self._active_id, *self._pins.values(), *self._models}
+        return any(model_id.startswith(prefix) for model_id in ids)
+
+    def warm_up(self, runs: int | None = None) -> dict[str, Any]:
+        """Startup: load and warm the active model, then report ready.
+        Failures are recorded in ``error`` rather than raised."""
+        try:
+            self.activate(self._active_id, runs)
+        except Exception as exc:
+            self.error = str(exc) or exc.__class__.__name__
+            print("Model warm-up failed:", self.error)
+            return self.status()
+
+        self.error = None
+        self.timings["cold_start_seconds"] = round(time.monotonic() - _IMPORTED_AT, 3)
+        self._ready.set()
+        with self._lock:
+            entry = self._models.get(self._active_id)
+        timings = entry.timings if entry is not None else {}
+        print(
+            "Model ready: cold start {cold}s (load {load}s, first inference {first}ms, "
+            "warm {warm}ms)".format(
+                cold=self.timings["cold_start_seconds"],
+                load=timings.get("load_seconds"),
+                first=timings.get("first_inference_ms"),
+                warm=timings.get("warm_inference_ms"),
+            )
+        )
+        return self.status()
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            entries = list(self._models.values())
+            active_id = self._active_id
+            pins = dict(self._pins)
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "active": active_id,
+            "pins": pins,
+            "swaps": self.swaps,
+            "models_freed": self.models_freed,
+            "loaded": [entry.to_status() for entry in entries],
+            **self.timings,
+        }
+
+    def available(self) -> list[dict[str, Any]]:
+        """Model ids that ``activate`` and ``pin`` accept right now."""
+        from .export_jobs import export_store
+        from .jobs import JOB_COMPLETED
+
+        models = [{"model_id": "builtin:fp", "source": "builtin"}]
+        if MODEL_OPENVINO_INT8_DIR.exists():
+            models.append({"model_id": "builtin:int8", "source": "builtin"})
+        for job in export_store.exports():
+            if job.status != JOB_COMPLETED:
+                continue
+            models.append({"model_id": f"export:{job.export_id}", "source": "export"})
+            if job.int8:
+                models.append({"model_id": f"export:{job.export_id}:int8", "source": "export"})
+        return models
+
+    def _resolve_locked(self, camera_id: str | None) -> str:
+        if camera_id is not None:
+            return self._pins.get(camera_id, self._active_id)
+        return self._active_id
+
+    def _acquire(self, camera_id: str | None) -> LoadedModel:
+        while True:
+            with self._lock:
+                model_id = self._resolve_locked(camera_id)
+                entry = self._models.get(model_id)
+                if entry is not None:
+                    entry.leases += 1
+                    return entry
+            self.load(model_id)
+            # Re-resolve after loading; if a swap happened meanwhile, the
+            # model just loaded is not wanted any more.
+            with self._lock:
+                freed = (
+                    self._retire_unused_locked()
+                    if self._resolve_locked(camera_id) != model_id
+                    else []
+                )
+            self._free(freed)
+
+    def _release(self, entry: LoadedModel) -> None:
+        with self._lock:
+            entry.leases -= 1
+            freed = [entry] if entry.retired and entry.leases == 0 else []
+        self._free(freed)
+
+    def _retire_unused_locked(self) -> list[LoadedModel]:
+        """Drop models nothing points to; returns those already idle."""
+        wanted = {self._active_id, *self._pins.values(), *self._pending}
+        freed = []
+        for model_id in [model_id for model_id in self._models if model_id not in wanted]:
+            entry = self._models.pop(model_id)
+            entry.retired = True
+            if entry.leases == 0:
+                freed.append(entry)
+        return freed
+
+    def _prepare(self, model_id: str, warmup_runs: int) -> None:
+        """Load and warm ``model_id`` ahead of a switch. The caller switches
+        to it and calls ``_unpend_locked`` under the same lock."""
+        with self._lock:
+            self._pending[model_id] = self._pending.get(model_id, 0) + 1
+        try:
+            self.load(model_id, warmup_runs)
+        except Exception:
+            with self._lock:
+                self._unpend_locked(model_id)
+                freed = self._retire_unused_locked()
+            self._free(freed)
+            raise
+
+    def _unpend_locked(self, model_id: str) -> None:
+        count = self._pending.pop(model_id, 0) - 1
+        if count > 0:
+            self._pending[model_id] = count
+
+    def _free(self, entries: list[LoadedModel]) -> None:
+        if not entries:
+            return
+        for entry in entries:
+            close = getattr(entry.model, "close", None)
+            if callable(close):
+                close()
+            entry.model = None
+            print(f"Freed model {entry.model_id}")
+        with self._lock:
+            self.models_freed += len(entries)
+        gc.collect()
+
+    def _load(self, model_id: str) -> LoadedModel:
+        loader = self._loader_for(model_id)
+        started = time.perf_counter()
+        try:
+            entry = LoadedModel(model_id, loader())
+        except Exception as exc:
+            self.error = f"{model_id}: {exc}"
+            raise
+        entry.timings["load_seconds"] = round(time.perf_counter() - started, 3)
+        with self._lock:
+            self._models[model_id] = entry
+        return entry
+
+    def _warm_up(self, entry: LoadedModel, runs: int) -> None:
+        width, height = self.frame_size
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        latencies: list[float] = []
+        for _ in range(max(0, runs)):
+            started = time.perf_counter()
+            with entry.guard:
+                entry.model.predict([frame], conf=CONF_THRESHOLD, iou=IOU_THRESHOLD, verbose=False)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        if latencies:
+            entry.timings["first_inference_ms"] = round(latencies[0], 3)
+            if len(latencies) > 1:
+                entry.timings["warm_inference_ms"] = round(float(np.median(latencies[1:])), 3)
+        entry.warmed = True
+
+    def _loader_for(self, model_id: str) -> Callable[[], Any]:
+        kind, _, rest = model_id.partition(":")
+        if kind == "builtin":
+            if rest not in MODEL_PRECISIONS:
+                raise ValueError(f"Unknown model precision '{rest}'")
+            return lambda: load_model(rest)
+        if kind == "export":
+            model_dir = self._export_dir(*rest.split(":", 1))
+            return lambda: load_openvino_model(model_dir, model_id)
+        raise ValueError(f"Unknown model '{model_id}'")
+
+    @staticmethod
+    def _export_dir(export_id: str, precision: str = "fp") -> Path:
+        # Imported lazily: worker processes import this module too and must
+        # not construct (and clean up after) the server's export store.
+        from .export_jobs import export_store
+        from .jobs import JOB_COMPLETED
+
+        job = export_store.find(export_id)
+        if job.status != JOB_COMPLETED:
+            raise ValueError(f"Export '{export_id}' is {job.status}")
+        if precision not in MODEL_PRECISIONS:
+            raise ValueError(f"Unknown model precision '{precision}'")
+        model_dir = job.model_dir / "int8" if precision == "int8" else job.model_dir
+        if not any(model_dir.glob("*.xml")):
+            raise ValueError(f"Export '{export_id}' has no {precision} model")
+        export_store.touch(export_id)
+        return model_dir
+
+
+model_registry = ModelRegistry()
+
+
+def _startup_samples() -> dict[tuple[str, ...], float]:
+    samples = {}
+    if "cold_start_seconds" in model_registry.timings:
+        samples[("cold_start",)] = model_registry.timings["cold_start_seconds"]
+    for entry in model_registry.status()["loaded"]:
+        if entry["model_id"] == model_registry.active_id and "load_seconds" in entry:
+            samples[("load",)] = entry["load_seconds"]
+    return samples
+
+
+Gauge(
+    "person_detection_model_ready",
+    "1 once the active model is loaded and warmed up.",
+    collect=lambda: {(): float(model_registry.ready)},
+)
+Gauge(
+    "person_detection_model_startup_seconds",
+    "Active model load time and cold start to the first warm inference.",
+    labels=("phase",),
+    collect=_startup_samples,
+)
+Gauge(
+    "person_detection_models_loaded",
+    "Detector instances currently held in memory.",
+    collect=lambda: {(): float(len(model_registry.status()["loaded"]))},
+)
+Counter(
+    "person_detection_model_swaps_total",
+    "Changes of the active model.",
+    collect=lambda: {(): float(model_registry.swaps)},
+)
+Counter(
+    "person_detection_models_freed_total",
+    "Retired detector instances released.",
+    collect=lambda: {(): float(model_registry.models_freed)},
+)
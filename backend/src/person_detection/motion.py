@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+from .config import (
+    MOTION_GATE_ENABLED,
+    MOTION_GATE_MAX_SKIP_SECONDS,
+    MOTION_GATE_MIN_AREA,
+    MOTION_GATE_PIXEL_THRESHOLD,
+)
+
+_STRIDE_THUMB_SIZE = (64, 36)
+_GATE_THUMB_SIZE = (160, 90)
+
+
+def motion_thumbnail(
+    frame: np.ndarray,
+    size: tuple[int, int] = _STRIDE_THUMB_SIZE,
+) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def motion_score(previous: np.ndarray, current: np.ndarray) -> float:
+    """Mean absolute difference, normalised to 0..1."""
+    return float(cv2.absdiff(previous, current).mean()) / 255.0
+
+
+def changed_fraction(
+    previous: np.ndarray,
+    current: np.ndarray,
+    pixel_threshold: int = MOTION_GATE_PIXEL_THRESHOLD,
+) -> float:
+    """Share of thumbnail pixels whose intensity moved by more than
+    ``pixel_threshold``."""
+    diff = cv2.absdiff(previous, current)
+    return cv2.countNonZero(cv2.threshold(diff, pixel_threshold, 255, cv2.THRESH_BINARY)[1]) / diff.size
+
+
+class MotionGate:
+    """Skips inference on a realtime camera while its downscaled grayscale
+    frame stays close to the last frame that was actually inferred.
+
+    Inference is still forced every ``max_skip_seconds`` so tracks and counts
+    never go stale for long.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = MOTION_GATE_ENABLED,
+        pixel_threshold: int = MOTION_GATE_PIXEL_THRESHOLD,
+        min_area: float = MOTION_GATE_MIN_AREA,
+        max_skip_seconds: float = MOTION_GATE_MAX_SKIP_SECONDS,
+    ) -> None:
+        self.enabled = enabled
+        self.pixel_threshold = pixel_threshold
+        self.min_area = min_area
+        self.max_skip_seconds = max_skip_seconds
+        self._reference: np.ndarray | None = None
+        self._reference_time = 0.0
+        self.frames_gated = 0
+        self.frames_passed = 0
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        if not self.enabled:
+            self.frames_passed += 1
+            return True
+
+        thumb = cv2.GaussianBlur(motion_thumbnail(frame, _GATE_THUMB_SIZE), (5, 5), 0)
+        now = time.monotonic()
+        if (
+            self._reference is None
+            or self._reference.shape != thumb.shape
+            or now - self._reference_time >= self.max_skip_seconds
+            or changed_fraction(self._reference, thumb, self.pixel_threshold) > self.min_area
+        ):
+            self._reference = thumb
+            self._reference_time = now
+            self.frames_passed += 1
+            return True
+
+        self.frames_gated += 1
+        return False
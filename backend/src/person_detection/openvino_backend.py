@@ -0,0 +1,304 @@
+"""Native OpenVINO inference for the exported YOLO IR.
+
+``OpenVINODetector.predict`` mirrors the subset of ``YOLO.predict`` that
+``detection`` and the scheduler use and returns ultralytics ``Results``, so
+callers do not care which backend loaded the model.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+import torch
+import yaml
+from ultralytics.engine.results import Results
+
+from .config import (
+    OPENVINO_CACHE_DIR,
+    OPENVINO_DEVICE,
+    OPENVINO_INFER_REQUESTS,
+    OPENVINO_INFERENCE_THREADS,
+    OPENVINO_NUM_STREAMS,
+    OPENVINO_PERFORMANCE_HINT,
+)
+
+try:
+    import openvino as ov
+    from openvino.preprocess import ColorFormat, PrePostProcessor
+
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    ov = None
+    OPENVINO_AVAILABLE = False
+
+PERFORMANCE_HINTS = {"LATENCY", "THROUGHPUT", "CUMULATIVE_THROUGHPUT"}
+LETTERBOX_FILL = 114
+MAX_DETECTIONS = 300
+
+
+class _InputBuffer:
+    """Reusable ``(1, H, W, 3)`` uint8 model input. The letterbox geometry is
+    kept per buffer, so the padding is only repainted when the source frame
+    size changes."""
+
+    def __init__(self, height: int, width: int) -> None:
+        self.array = np.full((1, height, width, 3), LETTERBOX_FILL, dtype=np.uint8)
+        self.source_shape: tuple[int, int] | None = None
+        self.gain = 1.0
+        self.pad = (0, 0)
+        self.size = (width, height)
+
+    def load(self, frame: np.ndarray) -> None:
+        _, height, width, _ = self.array.shape
+        shape = frame.shape[:2]
+        if shape != self.source_shape:
+            gain = min(height / shape[0], width / shape[1])
+            new_w, new_h = round(shape[1] * gain), round(shape[0] * gain)
+            # Same rounding as ultralytics' LetterBox/scale_boxes.
+            left = int(round((width - new_w) / 2 - 0.1))
+            top = int(round((height - new_h) / 2 - 0.1))
+            self.array.fill(LETTERBOX_FILL)
+            self.source_shape = shape
+            self.gain, self.pad, self.size = gain, (left, top), (new_w, new_h)
+
+        (left, top), (new_w, new_h) = self.pad, self.size
+        region = self.array[0, top : top + new_h, left : left + new_w]
+        if (new_w, new_h) == (shape[1], shape[0]):
+            np.copyto(region, frame)
+        else:
+            cv2.resize(frame, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+
+
+class OpenVINODetector:
+    """YOLO IR compiled with explicit performance settings and run through
+    an ``AsyncInferQueue``.
+
+    Every image in a ``predict`` call is its own infer request, so a batch
+    keeps up to ``infer_requests`` requests in flight across the device's
+    streams. Colour conversion, layout change and scaling to ``[0, 1]`` are
+    folded into the compiled model; the host only letterboxes into one of
+    ``infer_requests`` preallocated uint8 buffers.
+    """
+
+    # Concurrent predict calls share the infer queue; the registry does not
+    # serialise them.
+    thread_safe = True
+
+    def __init__(
+        self,
+        model_dir: Path,
+        device: str = OPENVINO_DEVICE,
+        performance_hint: str = OPENVINO_PERFORMANCE_HINT,
+        num_streams: str = OPENVINO_NUM_STREAMS,
+        inference_threads: int = OPENVINO_INFERENCE_THREADS,
+        infer_requests: int = OPENVINO_INFER_REQUESTS,
+        cache_dir: str = OPENVINO_CACHE_DIR,
+        core: Any = None,
+    ) -> None:
+        if not OPENVINO_AVAILABLE:
+            raise RuntimeError("OpenVINO is not installed")
+        performance_hint = performance_hint.upper()
+        if performance_hint not in PERFORMANCE_HINTS:
+            raise ValueError(f"Unknown OpenVINO performance hint '{performance_hint}'")
+
+        xml_path = next(model_dir.glob("*.xml"), None)
+        if xml_path is None:
+            raise RuntimeError(f"No OpenVINO IR in {model_dir}")
+        metadata_path = model_dir / "metadata.yaml"
+        metadata = yaml.safe_load(metadata_path.read_text()) if metadata_path.exists() else {}
+
+        self.names: dict[int, str] = metadata.get("names") or {}
+        self.end2end = bool(metadata.get("end2end", False))
+        imgsz = metadata.get("imgsz") or [640, 640]
+        self.input_size = (int(imgsz[0]), int(imgsz[1]))
+
+        core = core or ov.Core()
+        self.compiled = core.compile_model(
+            self._prepare(core.read_model(xml_path)),
+            device,
+            self._properties(performance_hint, num_streams, inference_threads, cache_dir),
+        )
+        self.device = device
+        self.cache_dir = cache_dir or None
+        self.performance_hint = performance_hint
+        self.infer_requests = infer_requests or int(
+            self.compiled.get_property("OPTIMAL_NUMBER_OF_INFER_REQUESTS")
+        )
+
+        self._queue = ov.AsyncInferQueue(self.compiled, self.infer_requests)
+        self._queue.set_callback(self._on_complete)
+        self._start_lock = threading.Lock()
+        self._buffers: queue.SimpleQueue[_InputBuffer] = queue.SimpleQueue()
+        for _ in range(self.infer_requests):
+            self._buffers.put(_InputBuffer(*self.input_size))
+
+    def _prepare(self, model: Any) -> Any:
+        height, width = self.input_size
+        if model.input().get_partial_shape().is_dynamic:
+            model.reshape([1, 3, height, width])
+
+        ppp = PrePostProcessor(model)
+        ppp.input().tensor().set_element_type(ov.Type.u8).set_layout(
+            ov.Layout("NHWC")
+        ).set_color_format(ColorFormat.BGR)
+        ppp.input().model().set_layout(ov.Layout("NCHW"))
+        ppp.input().preprocess().convert_element_type(ov.Type.f32).convert_color(
+            ColorFormat.RGB
+        ).scale(255.0)
+        return ppp.build()
+
+    @staticmethod
+    def _properties(
+        hint: str,
+        num_streams: str,
+        threads: int,
+        cache_dir: str = "",
+    ) -> dict[str, str]:
+        properties = {"PERFORMANCE_HINT": hint}
+        if cache_dir:
+            # Later starts import the compiled blob instead of recompiling.
+            properties["CACHE_DIR"] = cache_dir
+        if num_streams:
+            properties["NUM_STREAMS"] = str(num_streams)
+        if threads > 0:
+            properties["INFERENCE_NUM_THREADS"] = str(threads)
+        return properties
+
+    @property
+    def info(self) -> dict[str, Any]:
+        return {
+            "backend": "openvino",
+            "device": self.device,
+            "performance_hint": self.performance_hint,
+            "num_streams": self.compiled.get_property("NUM_STREAMS"),
+            "inference_threads": self.compiled.get_property("INFERENCE_NUM_THREADS"),
+            "infer_requests": self.infer_requests,
+            "input_size": list(self.input_size),
+            "cache_dir": self.cache_dir,
+        }
+
+    def fuse(self) -> None:
+        """Nothing to fuse; present so callers can treat both backends alike."""
+
+    def close(self) -> None:
+        """Wait for in-flight requests and drop the compiled model. The queue
+        callback refers back to this detector, so without this the pair is
+        only freed by a full garbage collection."""
+        if self._queue is None:
+            return
+        self._queue.wait_all()
+        self._queue = None
+        self.compiled = None
+        while not self._buffers.empty():
+            self._buffers.get_nowait()
+
+    def predict(
+        self,
+        source: np.ndarray | list[np.ndarray],
+        conf: float = 0.25,
+        iou: float = 0.7,
+        classes: list[int] | None = None,
+        max_det: int = MAX_DETECTIONS,
+        verbose: bool = False,
+        **_: Any,
+    ) -> list[Results]:
+        frames = source if isinstance(source, list) else [source]
+        pending = [self._submit(frame) for frame in frames]
+
+        results = []
+        for frame, (future, gain, pad) in zip(frames, pending):
+            output = future.result()
+            detections = self._postprocess(output, frame.shape[:2], gain, pad, conf, iou, classes, max_det)
+            results.append(
+                Results(frame, path="", names=self.names, boxes=torch.from_numpy(detections))
+            )
+        return results
+
+    def _submit(self, frame: np.ndarray) -> tuple[Future, float, tuple[int, int]]:
+        # Blocks while every buffer is in flight, which also bounds the
+        # number of requests waiting on the device.
+        buffer = self._buffers.get()
+        try:
+            buffer.load(frame)
+        except BaseException:
+            self._buffers.put(buffer)
+            raise
+        future: Future = Future()
+        with self._start_lock:
+            self._queue.start_async({0: buffer.array}, (future, buffer), share_inputs=True)
+        return future, buffer.gain, buffer.pad
+
+    def _on_complete(self, request: Any, userdata: tuple[Future, _InputBuffer]) -> None:
+        future, buffer = userdata
+        try:
+            output = request.get_output_tensor(0).data.copy()
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(output)
+        finally:
+            self._buffers.put(buffer)
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        shape: tuple[int, int],
+        gain: float,
+        pad: tuple[int, int],
+        conf: float,
+        iou: float,
+        classes: list[int] | None,
+        max_det: int,
+    ) -> np.ndarray:
+        """``(N, 6)`` float32 x1, y1, x2, y2, score, class in frame pixels."""
+        if self.end2end or output.shape[-1] == 6:
+            detections = output.reshape(-1, 6)
+            detections = detections[detections[:, 4] > conf]
+            if classes is not None:
+                detections = detections[np.isin(detections[:, 5], classes)]
+            detections = detections[:max_det]
+        else:
+            detections = self._nms(output[0].T, conf, iou, classes, max_det)
+
+        detections = detections.astype(np.float32, copy=True)
+        detections[:, [0, 2]] -= pad[0]
+        detections[:, [1, 3]] -= pad[1]
+        detections[:, :4] /= gain
+        height, width = shape
+        detections[:, [0, 2]] = np.clip(detections[:, [0, 2]], 0, width)
+        detections[:, [1, 3]] = np.clip(detections[:, [1, 3]], 0, height)
+        return detections
+
+    @staticmethod
+    def _nms(
+        predictions: np.ndarray,
+        conf: float,
+        iou: float,
+        classes: list[int] | None,
+        max_det: int,
+    ) -> np.ndarray:
+        """Class-aware NMS over raw ``(anchors, 4 + nc)`` cx, cy, w, h rows."""
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        best = scores[np.arange(len(scores)), class_ids]
+        keep = best > conf
+        if classes is not None:
+            keep &= np.isin(class_ids, classes)
+        boxes, best, class_ids = predictions[keep, :4], best[keep], class_ids[keep]
+        if len(boxes) == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        xywh = boxes.copy()
+        xywh[:, :2] -= boxes[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), best.tolist(), class_ids.tolist(), conf, iou, top_k=max_det
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:max_det]
+        xyxy = np.concatenate([xywh[indices, :2], xywh[indices, :2] + boxes[indices, 2:]], axis=1)
+        return np.column_stack([xyxy, best[indices], class_ids[indices]]).astype(np.float32)
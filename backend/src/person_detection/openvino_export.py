@@ -1,33 +1,53 @@
 from __future__ import annotations
 
+import os
 import shutil
 import subprocess
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import Any
+
+import numpy as np
 
 class OpenVINOExportError(RuntimeError):
     pass
 
+def safe_model_name(model_name: str) -> str:
+    safe_name = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in model_name)
+    return safe_name or "model"
+
+
 def export_onnx_to_openvino(
     onnx_bytes: bytes,
     model_name: str,
     output_root: Path,
-) -> dict[str, str]:
-    output_root.mkdir(parents=True, exist_ok=True)
-
-    safe_name = "".join(ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in model_name)
-    if not safe_name:
-        safe_name = "model"
-
+    calibration_frames: list[np.ndarray] | None = None,
+) -> dict[str, Any]:
+    """Convert with ``ovc``; with ``calibration_frames`` also write an NNCF
+    INT8 copy to ``<model>/int8`` and report it against the FP IR."""
+    safe_name = safe_model_name(model_name)
     model_dir = output_root / safe_name
-    model_dir.mkdir(parents=True, exist_ok=True)
 
     with NamedTemporaryFile(delete=False, suffix=".onnx") as temp:
         temp.write(onnx_bytes)
         onnx_path = Path(temp.name)
 
-    out_xml = model_dir / f"{safe_name}.xml"
-    out_bin = model_dir / f"{safe_name}.bin"
+    try:
+        return convert_onnx_file(onnx_path, model_dir, safe_name, calibration_frames)
+    finally:
+        onnx_path.unlink(missing_ok=True)
+
+
+def convert_onnx_file(
+    onnx_path: Path,
+    model_dir: Path,
+    model_name: str,
+    calibration_frames: list[np.ndarray] | None = None,
+) -> dict[str, Any]:
+    """Convert an ONNX file on disk into ``model_dir/<model_name>.xml/.bin``."""
+    model_dir.mkdir(parents=True, exist_ok=True)
+    out_xml = model_dir / f"{model_name}.xml"
+    out_bin = model_dir / f"{model_name}.bin"
 
     try:
         cmd = _build_openvino_command(onnx_path, out_xml)
@@ -39,17 +59,64 @@ def export_onnx_to_openvino(
     except subprocess.CalledProcessError as exc:
         message = (exc.stderr or exc.stdout or "OpenVINO export failed").strip()
         raise OpenVINOExportError(message) from exc
-    finally:
-        onnx_path.unlink(missing_ok=True)
 
     if not out_xml.exists() or not out_bin.exists():
         raise OpenVINOExportError("OpenVINO export did not produce .xml/.bin outputs")
 
-    return {
-        "model_name": safe_name,
+    result: dict[str, Any] = {
+        "model_name": model_name,
         "xml_path": str(out_xml),
         "bin_path": str(out_bin),
     }
+    if calibration_frames:
+        result.update(_quantize(out_xml, calibration_frames))
+    return result
+
+
+def _init_export_worker(nice: int, threads: int) -> None:
+    """Initializer for ``export_jobs``' spawned conversion processes."""
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    # ovc and NNCF inherit the lower priority, so realtime inference in the
+    # server process keeps the CPU when both compete.
+    if nice > 0 and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def _convert_in_worker(
+    onnx_path: str,
+    model_dir: str,
+    model_name: str,
+    calibration_paths: list[str],
+) -> dict[str, Any]:
+    frames = None
+    if calibration_paths:
+        from .quantization import load_calibration_frames
+
+        frames = load_calibration_frames(
+            [Path(path) for path in calibration_paths],
+            limit=len(calibration_paths),
+        )
+    return convert_onnx_file(Path(onnx_path), Path(model_dir), model_name, frames)
+
+
+def _quantize(xml_path: Path, frames: list[np.ndarray]) -> dict[str, Any]:
+    from .quantization import QuantizationError, compare_precisions, quantize_openvino_model
+
+    int8_dir = xml_path.parent / "int8"
+    try:
+        int8_xml = quantize_openvino_model(xml_path, frames, int8_dir)
+        report = compare_precisions(xml_path.parent, int8_dir, frames)
+    except QuantizationError as exc:
+        raise OpenVINOExportError(str(exc)) from exc
+
+    return {
+        "int8_xml_path": str(int8_xml),
+        "int8_bin_path": str(int8_xml.with_suffix(".bin")),
+        "quantization_report": report,
+    }
 
 def _build_openvino_command(onnx_path: Path, out_xml: Path) -> list[str]:
     ovc = shutil.which("ovc")
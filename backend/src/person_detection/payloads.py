@@ -0,0 +1,115 @@
+"""Wire formats for detection payloads.
+
+In memory a payload keeps its boxes and track ids as NumPy arrays; they are
+turned into JSON only at the edges that need it, or packed into the compact
+binary frame below for the WebRTC data channel and WebSocket push clients.
+
+Binary frame (little endian)::
+
+    magic "PD" | version u8 | flags u8 | seq u32 | person_count u16
+    | face_count u16 | n u16 | source_len u8 | source utf-8
+    | boxes int16[n, 4] (x1, y1, x2, y2) | ids int32[n] (if FLAG_TRACK_IDS)
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+import numpy as np
+
+BINARY_MAGIC = b"PD"
+BINARY_VERSION = 1
+FLAG_TRACK_IDS = 0x01
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+ENCODINGS = {ENCODING_JSON, ENCODING_BINARY}
+
+_HEADER = struct.Struct("<2sBBIHHHB")
+_INT16 = np.iinfo(np.int16)
+_UINT16_MAX = np.iinfo(np.uint16).max
+
+
+def payload_boxes(payload: dict[str, Any]) -> np.ndarray:
+    boxes = payload.get("boxes")
+    if boxes is None:
+        return np.zeros((0, 4), dtype=np.int32)
+    return boxes
+
+
+def detections_to_json(boxes: np.ndarray, track_ids: np.ndarray | None) -> list[dict[str, Any]]:
+    """``[{"id", "bbox"}]`` list; untracked boxes are numbered from 1."""
+    if track_ids is None:
+        track_ids = np.arange(1, len(boxes) + 1)
+    return [
+        {"id": track_id, "bbox": bbox}
+        for track_id, bbox in zip(track_ids.tolist(), boxes.tolist())
+    ]
+
+
+def payload_to_json(payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "count": int(payload.get("count", 0)),
+        "face_count": int(payload.get("face_count", 0)),
+        "person_count": int(payload.get("person_count", 0)),
+        "detections": detections_to_json(payload_boxes(payload), payload.get("ids")),
+    }
+
+
+def encode_binary(
+    payload: dict[str, Any],
+    seq: int = 0,
+    source: str | None = None,
+) -> bytes:
+    boxes = payload_boxes(payload)
+    track_ids = payload.get("ids")
+    source_bytes = (source or "").encode("utf-8")[:255]
+    count = min(len(boxes), _UINT16_MAX)
+    flags = FLAG_TRACK_IDS if track_ids is not None else 0
+
+    header = _HEADER.pack(
+        BINARY_MAGIC,
+        BINARY_VERSION,
+        flags,
+        seq & 0xFFFFFFFF,
+        min(int(payload.get("person_count", 0)), _UINT16_MAX),
+        min(int(payload.get("face_count", 0)), _UINT16_MAX),
+        count,
+        len(source_bytes),
+    )
+    parts = [
+        header,
+        source_bytes,
+        np.clip(boxes[:count], _INT16.min, _INT16.max).astype("<i2").tobytes(),
+    ]
+    if track_ids is not None:
+        parts.append(np.asarray(track_ids[:count]).astype("<i4").tobytes())
+    return b"".join(parts)
+
+
+def decode_binary(data: bytes) -> dict[str, Any]:
+    """Inverse of ``encode_binary``; returns the JSON-style payload plus
+    ``seq`` and ``source``."""
+    magic, version, flags, seq, person_count, face_count, count, source_len = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a detection payload frame")
+
+    offset = _HEADER.size
+    source = data[offset : offset + source_len].decode("utf-8") or None
+    offset += source_len
+
+    boxes = np.frombuffer(data, dtype="<i2", count=count * 4, offset=offset).reshape(count, 4)
+    offset += boxes.nbytes
+    track_ids = None
+    if flags & FLAG_TRACK_IDS:
+        track_ids = np.frombuffer(data, dtype="<i4", count=count, offset=offset)
+
+    return {
+        "seq": seq,
+        "source": source,
+        "count": person_count,
+        "face_count": face_count,
+        "person_count": person_count,
+        "detections": detections_to_json(boxes, track_ids),
+    }
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from .config import PROFILER_INTERVAL_MS, PROFILER_MAX_DEPTH
+
+Stack = tuple[str, ...]
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler that is safe to switch on in production.
+
+    A daemon thread snapshots every thread's Python stack each ``interval``
+    seconds and counts identical stacks; the profiled code is not hooked,
+    so the cost is bounded by the sampling rate and zero while stopped.
+    Idle threads show up in their wait call. ``collapsed`` returns the
+    folded-stack text read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(
+        self,
+        interval: float = PROFILER_INTERVAL_MS / 1000.0,
+        max_depth: int = PROFILER_MAX_DEPTH,
+    ) -> None:
+        self.interval = max(0.001, interval)
+        self.max_depth = max(1, max_depth)
+        self._stacks: Counter[Stack] = Counter()
+        self._samples = 0
+        self._started_at: float | None = None
+        self._sampled_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float | None = None) -> bool:
+        """Start sampling; returns False if it was already running."""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            if interval is not None:
+                self.interval = max(0.001, interval)
+            self._stop.clear()
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None:
+            thread.join(timeout=2.0)
+        with self._lock:
+            if self._started_at is not None:
+                self._sampled_seconds += time.monotonic() - self._started_at
+                self._started_at = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+            self._sampled_seconds = 0.0
+            if self._started_at is not None:
+                self._started_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            seconds = self._sampled_seconds
+            if self._started_at is not None:
+                seconds += time.monotonic() - self._started_at
+            return {
+                "running": self._thread is not None,
+                "interval_ms": round(self.interval * 1000.0, 3),
+                "samples": self._samples,
+                "distinct_stacks": len(self._stacks),
+                "sampled_seconds": round(seconds, 3),
+            }
+
+    def collapsed(self, limit: int | None = None) -> str:
+        with self._lock:
+            stacks = self._stacks.most_common(limit)
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks)
+
+    def _sample(self, own_ident: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        sampled: list[Stack] = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            calls: list[str] = []
+            while frame is not None and len(calls) < self.max_depth:
+                code = frame.f_code
+                calls.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            calls.append(names.get(ident, f"thread-{ident}"))
+            sampled.append(tuple(reversed(calls)))
+
+        with self._lock:
+            self._stacks.update(sampled)
+            self._samples += 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_ident)
+
+
+sampling_profiler = SamplingProfiler()
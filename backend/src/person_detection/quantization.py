@@ -0,0 +1,263 @@
+"""INT8 post-training quantization of the OpenVINO IR with NNCF.
+
+Usage (from backend/src)::
+
+    python -m person_detection.quantization calibration/ clip.mp4 \\
+        --model-dir person_detection/models/yolo26n_openvino_model \\
+        --output-dir person_detection/models/yolo26n_int8_openvino_model
+
+Calibration inputs may be image files, videos (sampled every ``--video-step``
+frames) or directories of either. After quantizing, both models run on the
+same frames and the report compares them. There are no labels, so the FP
+model's detections serve as the reference for mAP and count agreement.
+Select the result at startup with ``MODEL_PRECISION=int8``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+import yaml
+
+from .config import (
+    CONF_THRESHOLD,
+    MODEL_OPENVINO_DIR,
+    MODEL_OPENVINO_INT8_DIR,
+    QUANTIZATION_SUBSET_SIZE,
+)
+from .openvino_backend import OPENVINO_AVAILABLE, OpenVINODetector, _InputBuffer
+from .video_workers import _box_iou
+
+try:
+    import nncf
+
+    NNCF_AVAILABLE = True
+except ImportError:
+    nncf = None
+    NNCF_AVAILABLE = False
+
+if OPENVINO_AVAILABLE:
+    import openvino as ov
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+PERSON_CLASSES = [0]
+
+
+class QuantizationError(RuntimeError):
+    pass
+
+
+def load_calibration_frames(
+    paths: list[Path],
+    limit: int = QUANTIZATION_SUBSET_SIZE,
+    video_step: int = 15,
+) -> list[np.ndarray]:
+    files: list[Path] = []
+    for path in paths:
+        files.extend(sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path])
+
+    frames: list[np.ndarray] = []
+    for path in files:
+        if len(frames) >= limit:
+            break
+        suffix = path.suffix.lower()
+        if suffix in IMAGE_SUFFIXES:
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is not None:
+                frames.append(frame)
+        elif suffix in VIDEO_SUFFIXES:
+            frames.extend(_sample_video(path, limit - len(frames), max(1, video_step)))
+    return frames
+
+
+def _sample_video(path: Path, limit: int, step: int) -> list[np.ndarray]:
+    capture = cv2.VideoCapture(str(path))
+    frames: list[np.ndarray] = []
+    index = 0
+    try:
+        while len(frames) < limit:
+            ok = capture.grab()
+            if not ok:
+                break
+            if index % step == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    frames.append(frame)
+            index += 1
+    finally:
+        capture.release()
+    return frames
+
+
+def _input_size(model_dir: Path) -> tuple[int, int]:
+    metadata_path = model_dir / "metadata.yaml"
+    metadata = yaml.safe_load(metadata_path.read_text()) if metadata_path.exists() else {}
+    imgsz = metadata.get("imgsz") or [640, 640]
+    return int(imgsz[0]), int(imgsz[1])
+
+
+def quantize_openvino_model(
+    xml_path: Path,
+    frames: list[np.ndarray],
+    output_dir: Path,
+    subset_size: int = QUANTIZATION_SUBSET_SIZE,
+) -> Path:
+    """Write an INT8 copy of ``xml_path`` (plus its metadata) to
+    ``output_dir`` and return the new ``.xml`` path."""
+    if not OPENVINO_AVAILABLE:
+        raise QuantizationError("OpenVINO is not installed")
+    if not NNCF_AVAILABLE:
+        raise QuantizationError("NNCF is not installed. Install nncf to quantize models.")
+    if not frames:
+        raise QuantizationError("Calibration set is empty")
+
+    height, width = _input_size(xml_path.parent)
+    buffer = _InputBuffer(height, width)
+
+    def transform(frame: np.ndarray) -> np.ndarray:
+        # Same letterbox as inference, then the raw IR's RGB NCHW [0, 1] input.
+        buffer.load(frame)
+        return buffer.array[..., ::-1].transpose(0, 3, 1, 2).astype(np.float32) / 255.0
+
+    core = ov.Core()
+    try:
+        quantized = nncf.quantize(
+            core.read_model(xml_path),
+            nncf.Dataset(frames, transform),
+            preset=nncf.QuantizationPreset.MIXED,
+            subset_size=min(subset_size, len(frames)),
+            # Box decoding after the sigmoid is sensitive to INT8 error.
+            ignored_scope=nncf.IgnoredScope(types=["Sigmoid"], validate=False),
+        )
+    except Exception as exc:
+        raise QuantizationError(f"INT8 quantization failed: {exc}") from exc
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    out_xml = output_dir / xml_path.name
+    ov.save_model(quantized, str(out_xml), compress_to_fp16=False)
+
+    metadata_path = xml_path.parent / "metadata.yaml"
+    if metadata_path.exists():
+        metadata = yaml.safe_load(metadata_path.read_text()) or {}
+        metadata.setdefault("args", {})["int8"] = True
+        (output_dir / "metadata.yaml").write_text(yaml.safe_dump(metadata, sort_keys=False))
+    return out_xml
+
+
+def _run_model(model_dir: Path, frames: list[np.ndarray]) -> tuple[list[np.ndarray], np.ndarray]:
+    detector = OpenVINODetector(model_dir, performance_hint="LATENCY", infer_requests=1)
+    detector.predict(frames[0], conf=CONF_THRESHOLD, classes=PERSON_CLASSES)
+
+    detections, latencies = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        result = detector.predict(frame, conf=CONF_THRESHOLD, classes=PERSON_CLASSES)[0]
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        detections.append(result.boxes.data.cpu().numpy())
+    return detections, np.array(latencies)
+
+
+def _average_precision(
+    reference: list[np.ndarray],
+    candidate: list[np.ndarray],
+    threshold: float,
+) -> float:
+    """COCO-style 101-point AP of ``candidate`` against ``reference`` boxes."""
+    total = sum(len(boxes) for boxes in reference)
+    if total == 0:
+        return 1.0 if all(len(boxes) == 0 for boxes in candidate) else 0.0
+
+    scores, hits = [], []
+    for ref, pred in zip(reference, candidate):
+        pred = pred[np.argsort(-pred[:, 4])]
+        iou = _box_iou(pred[:, :4], ref[:, :4]) if len(ref) and len(pred) else None
+        matched = np.zeros(len(ref), dtype=bool)
+        for i in range(len(pred)):
+            hit = False
+            if iou is not None:
+                overlaps = np.where(matched, -1.0, iou[i])
+                best = int(overlaps.argmax())
+                if overlaps[best] >= threshold:
+                    matched[best] = True
+                    hit = True
+            scores.append(pred[i, 4])
+            hits.append(hit)
+
+    if not scores:
+        return 0.0
+    order = np.argsort(-np.array(scores))
+    tp = np.cumsum(np.array(hits)[order])
+    precision = tp / np.arange(1, len(tp) + 1)
+    recall = tp / total
+    # Precision envelope, sampled at recall 0, 0.01, ..., 1.
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    points = np.searchsorted(recall, np.linspace(0, 1, 101), side="left")
+    return float(np.mean([envelope[p] if p < len(envelope) else 0.0 for p in points]))
+
+
+def _latency_summary(values: np.ndarray) -> dict[str, float]:
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+    }
+
+
+def compare_precisions(fp_dir: Path, int8_dir: Path, frames: list[np.ndarray]) -> dict[str, Any]:
+    if not frames:
+        raise QuantizationError("No frames to compare on")
+    fp_dets, fp_ms = _run_model(fp_dir, frames)
+    int8_dets, int8_ms = _run_model(int8_dir, frames)
+
+    errors = np.array([abs(len(a) - len(b)) for a, b in zip(fp_dets, int8_dets)])
+    thresholds = np.arange(0.5, 0.96, 0.05)
+    return {
+        "frames": len(frames),
+        "reference": "fp",
+        "map50": round(_average_precision(fp_dets, int8_dets, 0.5), 4),
+        "map50_95": round(
+            float(np.mean([_average_precision(fp_dets, int8_dets, t) for t in thresholds])), 4
+        ),
+        "count_agreement": round(float(np.mean(errors == 0)), 4),
+        "count_mae": round(float(errors.mean()), 4),
+        "persons": {"fp": int(sum(map(len, fp_dets))), "int8": int(sum(map(len, int8_dets)))},
+        "latency_ms": {"fp": _latency_summary(fp_ms), "int8": _latency_summary(int8_ms)},
+        "speedup": round(float(fp_ms.mean() / int8_ms.mean()), 2) if int8_ms.mean() > 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("calibration", type=Path, nargs="+")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_OPENVINO_DIR)
+    parser.add_argument("--output-dir", type=Path, default=MODEL_OPENVINO_INT8_DIR)
+    parser.add_argument("--subset-size", type=int, default=QUANTIZATION_SUBSET_SIZE)
+    parser.add_argument("--video-step", type=int, default=15)
+    parser.add_argument("--report-frames", type=int, default=100)
+    args = parser.parse_args()
+
+    xml_path = next(args.model_dir.glob("*.xml"), None)
+    if xml_path is None:
+        parser.error(f"No OpenVINO IR in {args.model_dir}")
+
+    frames = load_calibration_frames(args.calibration, args.subset_size, args.video_step)
+    started = time.perf_counter()
+    out_xml = quantize_openvino_model(xml_path, frames, args.output_dir, args.subset_size)
+    report = {
+        "model": str(out_xml),
+        "calibration_frames": len(frames),
+        "quantize_seconds": round(time.perf_counter() - started, 1),
+        **compare_precisions(args.model_dir, args.output_dir, frames[: args.report_frames]),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import cv2
+import numpy as np
+
+from .config import FRAME_SIZE
+
+if TYPE_CHECKING:
+    from .cameras import CameraConfig
+
+Rect = tuple[int, int, int, int]
+Polygon = list[list[float]]
+
+# Intersection-over-smaller threshold used when merging tile detections, so a
+# person cut in half by a tile edge is folded into the full box.
+TILE_MERGE_IOS = 0.6
+
+
+@dataclass
+class InferenceCrop:
+    image: np.ndarray
+    rect: Rect
+
+
+# Crops are letterboxed to the model's square input, so only shrink the ones
+# that are larger than that.
+_CROP_MAX_SIZE = (max(FRAME_SIZE), max(FRAME_SIZE))
+
+
+def _fit_within(image: np.ndarray, size: tuple[int, int] = _CROP_MAX_SIZE) -> np.ndarray:
+    height, width = image.shape[:2]
+    scale = min(size[0] / width, size[1] / height, 1.0)
+    if scale >= 1.0:
+        return np.ascontiguousarray(image)
+    target = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(image, target, interpolation=cv2.INTER_AREA)
+
+
+def plan_tiles(area: Rect, grid: tuple[int, int], overlap: float) -> list[Rect]:
+    x1, y1, x2, y2 = area
+    cols, rows = grid
+    tile_w = (x2 - x1) / (cols - (cols - 1) * overlap)
+    tile_h = (y2 - y1) / (rows - (rows - 1) * overlap)
+    step_x = tile_w * (1 - overlap)
+    step_y = tile_h * (1 - overlap)
+
+    tiles: list[Rect] = []
+    for row in range(rows):
+        for col in range(cols):
+            tx1 = int(round(x1 + col * step_x))
+            ty1 = int(round(y1 + row * step_y))
+            tiles.append((tx1, ty1, min(x2, int(round(tx1 + tile_w))), min(y2, int(round(ty1 + tile_h)))))
+    return tiles
+
+
+def merge_detections(
+    detections: np.ndarray,
+    tiles: np.ndarray | None = None,
+    threshold: float = TILE_MERGE_IOS,
+) -> np.ndarray:
+    """Greedy class-agnostic NMS on intersection-over-smaller, keeping the
+    highest-scoring box of every overlapping group. ``tiles`` gives the crop
+    each detection came from; boxes from the same crop were already NMS'd by
+    the model, so only boxes from different crops suppress each other."""
+    if len(detections) < 2:
+        return detections
+    if tiles is None:
+        tiles = np.arange(len(detections))
+
+    order = np.argsort(-detections[:, 4])
+    boxes = detections[order, :4]
+    sources = tiles[order]
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep: list[int] = []
+
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(order[i])
+        rest = slice(i + 1, None)
+        iw = np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0])
+        ih = np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1])
+        inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+        smaller = np.maximum(np.minimum(areas[i], areas[rest]), 1e-6)
+        suppressed[rest] |= (inter / smaller >= threshold) & (sources[rest] != sources[i])
+
+    return detections[np.sort(np.array(keep))]
+
+
+class RegionPlanner:
+    """Turns a camera's ROI polygons and tiling settings into the crops sent
+    to the detector, and maps their detections back to display coordinates.
+
+    Polygons are given in normalised ``[x, y]`` coordinates (0..1) so they
+    survive resolution changes. A detection is kept when its foot point
+    (bottom centre) falls inside any polygon.
+    """
+
+    def __init__(
+        self,
+        roi: list[Polygon] | None = None,
+        tile_grid: tuple[int, int] | None = None,
+        tile_overlap: float = 0.2,
+    ) -> None:
+        self.roi = [np.asarray(polygon, dtype=np.float32) for polygon in roi or []]
+        self.tile_grid = tile_grid
+        self.tile_overlap = tile_overlap
+        self._mask: np.ndarray | None = None
+
+    @classmethod
+    def from_camera(cls, camera: CameraConfig) -> RegionPlanner:
+        grid = tuple(camera.tile_grid) if camera.tile_grid else None
+        return cls(camera.roi, grid, camera.tile_overlap)
+
+    @property
+    def passthrough(self) -> bool:
+        return not self.roi and self.tile_grid is None
+
+    def plan(self, frame: np.ndarray, display: np.ndarray) -> list[InferenceCrop]:
+        height, width = frame.shape[:2]
+        if self.passthrough:
+            return [InferenceCrop(display, (0, 0, width, height))]
+
+        area = self._roi_rect(width, height)
+        rects = [area]
+        if self.tile_grid is not None:
+            rects += plan_tiles(area, self.tile_grid, self.tile_overlap)
+
+        return [
+            InferenceCrop(_fit_within(frame[y1:y2, x1:x2]), (x1, y1, x2, y2))
+            for x1, y1, x2, y2 in rects
+            if x2 > x1 and y2 > y1
+        ]
+
+    def merge(
+        self,
+        frame_shape: tuple[int, ...],
+        crops: list[InferenceCrop],
+        detections: list[np.ndarray],
+    ) -> np.ndarray:
+        """Map per-crop ``(N, 6)`` detections into one array in display
+        (``FRAME_SIZE``) coordinates."""
+        height, width = frame_shape[:2]
+        to_display = np.array(
+            [FRAME_SIZE[0] / width, FRAME_SIZE[1] / height] * 2,
+            dtype=np.float32,
+        )
+
+        mapped = []
+        tiles = []
+        for index, (crop, dets) in enumerate(zip(crops, detections)):
+            if len(dets) == 0:
+                continue
+            x1, y1, x2, y2 = crop.rect
+            crop_h, crop_w = crop.image.shape[:2]
+            scale = np.array([(x2 - x1) / crop_w, (y2 - y1) / crop_h] * 2, dtype=np.float32)
+            offset = np.array([x1, y1, x1, y1], dtype=np.float32)
+            dets = dets.astype(np.float32, copy=True)
+            dets[:, :4] = (dets[:, :4] * scale + offset) * to_display
+            mapped.append(dets)
+            tiles.append(np.full(len(dets), index))
+
+        if not mapped:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        merged = np.concatenate(mapped)
+        if len(crops) > 1:
+            merged = merge_detections(merged, np.concatenate(tiles))
+        if self.roi:
+            merged = merged[self._inside_roi(merged)]
+        return merged
+
+    def _roi_rect(self, width: int, height: int) -> Rect:
+        if not self.roi:
+            return 0, 0, width, height
+        points = np.concatenate(self.roi) * np.array([width, height], dtype=np.float32)
+        x1, y1 = (int(value) for value in np.floor(points.min(axis=0)))
+        x2, y2 = (int(value) for value in np.ceil(points.max(axis=0)))
+        return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+    def _inside_roi(self, detections: np.ndarray) -> np.ndarray:
+        if self._mask is None:
+            scale = np.array(FRAME_SIZE, dtype=np.float32)
+            self._mask = np.zeros((FRAME_SIZE[1], FRAME_SIZE[0]), dtype=np.uint8)
+            cv2.fillPoly(
+                self._mask,
+                [np.round(polygon * scale).astype(np.int32) for polygon in self.roi],
+                1,
+            )
+
+        foot_x = ((detections[:, 0] + detections[:, 2]) / 2).astype(int)
+        foot_y = detections[:, 3].astype(int)
+        foot_x = np.clip(foot_x, 0, FRAME_SIZE[0] - 1)
+        foot_y = np.clip(foot_y, 0, FRAME_SIZE[1] - 1)
+        return self._mask[foot_y, foot_x].astype(bool)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .config import RENDER_LABEL_CACHE
+
+BOX_COLOR = (0, 255, 0)
+
+
+class FrameRenderer:
+    """Draws tracked boxes and ``ID n`` labels.
+
+    All boxes go through one ``cv2.polylines`` call, and every label is
+    rasterised once into a cached mask that is stamped onto later frames.
+    ``render`` draws in place; callers that must keep the input intact
+    draw on a copy.
+    """
+
+    def __init__(
+        self,
+        font_scale: float = 0.6,
+        thickness: int = 2,
+        label_cache: int = RENDER_LABEL_CACHE,
+    ) -> None:
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.label_cache = label_cache
+        self._labels: OrderedDict[int, tuple[np.ndarray, np.ndarray, int]] = OrderedDict()
+        self._labels_lock = threading.Lock()
+
+    @classmethod
+    def for_scale(cls, scale: float) -> FrameRenderer:
+        """Renderer whose strokes and labels match drawing at ``FRAME_SIZE``
+        and resizing the result by ``scale``."""
+        scale = max(1.0, scale)
+        return cls(font_scale=0.6 * scale, thickness=max(2, int(round(2 * scale))))
+
+    def render(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        track_ids: np.ndarray | None = None,
+        scale: tuple[float, float] | None = None,
+    ) -> np.ndarray:
+        """Draw onto ``frame`` in place and return it. ``scale`` maps boxes
+        from detection coordinates to ``frame`` coordinates."""
+        if len(boxes) == 0:
+            return frame
+
+        if scale is not None:
+            boxes = (boxes * np.array(scale * 2, dtype=np.float32)).astype(np.int32)
+        if track_ids is None:
+            track_ids = np.arange(1, len(boxes) + 1)
+
+        corners = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 1, 2).astype(np.int32)
+        cv2.polylines(frame, list(corners), True, BOX_COLOR, self.thickness)
+
+        height, width = frame.shape[:2]
+        min_baseline = int(20 * self.font_scale / 0.6)
+        baselines = np.maximum(boxes[:, 1] - 10, min_baseline).tolist()
+        labels = self._labels
+        for x, baseline, track_id in zip(boxes[:, 0].tolist(), baselines, track_ids.tolist()):
+            cached = labels.get(track_id) or self._label(track_id)
+            patch, mask, text_height = cached
+            y = baseline - text_height
+            label_h, label_w = mask.shape
+            if x >= 0 and y >= 0 and x + label_w <= width and y + label_h <= height:
+                cv2.copyTo(patch, mask, frame[y : y + label_h, x : x + label_w])
+            else:
+                self._stamp(frame, patch, mask, x, y)
+        return frame
+
+    def _label(self, track_id: int) -> tuple[np.ndarray, np.ndarray, int]:
+        """Rasterise and cache a label; cache hits are read without the lock."""
+        with self._labels_lock:
+            cached = self._labels.get(track_id)
+            if cached is not None:
+                return cached
+
+        text = f"ID {track_id}"
+        (width, height), baseline = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, self.thickness
+        )
+        pad = self.thickness
+        canvas = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        cv2.putText(
+            canvas,
+            text,
+            (pad, height + pad),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            self.font_scale,
+            255,
+            self.thickness,
+        )
+        patch = np.empty(canvas.shape + (3,), dtype=np.uint8)
+        patch[:] = BOX_COLOR
+        cached = (patch, canvas, height + pad)
+
+        with self._labels_lock:
+            self._labels[track_id] = cached
+            while len(self._labels) > self.label_cache:
+                self._labels.popitem(last=False)
+        return cached
+
+    @staticmethod
+    def _stamp(frame: np.ndarray, patch: np.ndarray, mask: np.ndarray, x: int, y: int) -> None:
+        height, width = frame.shape[:2]
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(width, x + mask.shape[1]), min(height, y + mask.shape[0])
+        if x2 <= x1 or y2 <= y1:
+            return
+        crop = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+        cv2.copyTo(patch[crop], mask[crop], frame[y1:y2, x1:x2])
@@ -1,56 +1,293 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
+import json
+import uuid
 from pathlib import Path
-
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from typing import Callable
+
+from fastapi import (
+    APIRouter,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
+from .camera_hub import camera_hub_stats, remove_camera_hub
+from .cameras import CameraConfig, camera_registry
+from .config import DEFAULT_CAMERA_ID, IMAGE_BATCH_MAX_FILES, JPEG_QUALITY
+from .count_events import CountSubscription, TooManySubscribersError, count_broadcaster
 from .detection import (
-    analyze_uploaded_video,
-    detect_faces_from_uploaded_image,
+    annotate_uploaded_image,
+    decode_uploaded_image_file,
     generate_realtime_detection_stream,
     generate_uploaded_video_detection_stream,
 )
-from .shared_state import person_state
+from .export_jobs import export_store
+from .image_batcher import image_batcher
+from .image_results import image_result_store
+from .jobs import JOB_COMPLETED, JobQueueFullError, video_job_store
+from .model_registry import model_registry
+from .payloads import ENCODING_BINARY, ENCODING_JSON, ENCODINGS, encode_binary
+from .profiler import sampling_profiler
+from .shared_state import UPLOAD_SOURCE, detection_state
+from .stride import StrideOptions
+from .streaming import MULTIPART_MEDIA_TYPE, StreamOptions
+from .uploads import spool_upload, upload_suffix
+from .video_workers import analyze_video_file_parallel
 from .webrtc import AIORTC_AVAILABLE, webrtc_manager
 
 router = APIRouter()
 
 
 def _apply_state(payload: dict[str, object]) -> None:
-    person_state["face_count"] = int(payload.get("face_count", 0))
-    person_state["person_count"] = int(payload.get("person_count", 0))
-    person_state["count"] = person_state["person_count"]
-    person_state["detections"] = payload.get("detections", [])
-    person_state["person_detections"] = payload.get("person_detections", [])
+    detection_state.update(payload)
+    count_broadcaster.publish(camera_id, payload)
+
+
+def _stream_options(
+    quality: int | None,
+    width: int | None,
+    height: int | None,
+    max_fps: float | None,
+    metadata_only: bool,
+) -> StreamOptions:
+    try:
+        return StreamOptions(
+            quality=JPEG_QUALITY if quality is None else quality,
+            width=width,
+            height=height,
+            max_fps=max_fps,
+            metadata_only=metadata_only,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _require_camera(camera_id: str) -> CameraConfig:
+    try:
+        return camera_registry.get(camera_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown camera '{camera_id}'") from exc
 
 
 class RTCOffer(BaseModel):
     sdp: str
     type: str
+    camera_id: str = DEFAULT_CAMERA_ID
+    encoding: str = ENCODING_JSON
+
+
+class ModelSelection(BaseModel):
+    model_id: str
+
+
+class CameraIn(BaseModel):
+    camera_id: str
+    rtsp_url: str | None = None
+    webcam_index: int | None = None
+    name: str = ""
+    roi: list[list[list[float]]] | None = None
+    tile_grid: list[int] | None = None
+    tile_overlap: float = 0.2
+
+
+@router.get("/api/cameras")
+def list_cameras() -> dict[str, object]:
+    stats = {entry["camera_id"]: entry for entry in camera_hub_stats()}
+    return {
+        "cameras": [
+            {
+                **camera.to_dict(),
+                "model_id": model_registry.resolve(camera.camera_id),
+                "stream": stats.get(camera.camera_id),
+            }
+            for camera in camera_registry.all()
+        ]
+    }
+
+
+@router.post("/api/cameras")
+def register_camera(camera: CameraIn) -> dict[str, object]:
+    try:
+        config = CameraConfig.from_dict(camera.model_dump())
+        camera_registry.register(config)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return config.to_dict()
+
+
+@router.delete("/api/cameras/{camera_id}")
+def delete_camera(camera_id: str) -> dict[str, str]:
+    _require_camera(camera_id)
+    remove_camera_hub(camera_id)
+    model_registry.pin(camera_id, None)
+    camera_registry.remove(camera_id)
+    detection_state.forget(camera_id)
+    count_broadcaster.forget(camera_id)
+    return {"camera_id": camera_id, "status": "removed"}
+
+
+async def _switch_model(
+    switch: Callable[..., dict[str, object]],
+    *args: object,
+) -> dict[str, object]:
+    """Load, warm up and switch off the event loop; streams keep running on
+    the previous model until the new one is ready."""
+    try:
+        return await asyncio.to_thread(switch, *args)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Model export not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Model failed to load: {exc}") from exc
+
+
+@router.put("/api/cameras/{camera_id}/model")
+async def pin_camera_model(camera_id: str, selection: ModelSelection) -> dict[str, object]:
+    _require_camera(camera_id)
+    return await _switch_model(model_registry.pin, camera_id, selection.model_id)
+
+
+@router.delete("/api/cameras/{camera_id}/model")
+def unpin_camera_model(camera_id: str) -> dict[str, object]:
+    _require_camera(camera_id)
+    return model_registry.pin(camera_id, None)
+
+
+@router.get("/api/models")
+def list_models() -> dict[str, object]:
+    return {**model_registry.status(), "available": model_registry.available()}
+
+
+@router.post("/api/models/active")
+async def activate_model(selection: ModelSelection) -> dict[str, object]:
+    return await _switch_model(model_registry.activate, selection.model_id)
 
 
 @router.get("/api/person-detection/stream")
-def person_detection_stream() -> StreamingResponse:
+def person_detection_stream(
+    camera_id: str = DEFAULT_CAMERA_ID,
+    quality: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    max_fps: float | None = None,
+    metadata_only: bool = False,
+) -> StreamingResponse:
+    """MJPEG stream, or with ``metadata_only`` a multipart stream of JSON
+    payloads for which the hub skips drawing and encoding entirely."""
+    _require_camera(camera_id)
+    options = _stream_options(quality, width, height, max_fps, metadata_only)
     return StreamingResponse(
-        generate_realtime_detection_stream(on_frame=_apply_state),
-        media_type="multipart/x-mixed-replace; boundary=frame",
+        generate_realtime_detection_stream(
+            camera_id=camera_id,
+            options=options,
+        ),
+        media_type=MULTIPART_MEDIA_TYPE,
     )
 
 
 @router.get("/api/people-count/current")
-def current_people_count() -> dict[str, object]:
+def current_people_count(camera_id: str | None = None) -> dict[str, object]:
+    if camera_id is not None:
+        _require_camera(camera_id)
+    return detection_state.latest(camera_id).to_dict()
+
+
+@router.get("/api/people-count/history")
+def people_count_history(
+    camera_id: str = DEFAULT_CAMERA_ID,
+    limit: int | None = Query(default=None, ge=1),
+) -> dict[str, object]:
+    if camera_id != UPLOAD_SOURCE:
+        _require_camera(camera_id)
+    history = detection_state.history(camera_id, limit)
     return {
-        "count": person_state.get("count", 0),
-        "face_count": person_state.get("face_count", 0),
-        "person_count": person_state.get("person_count", 0),
-        "detections": person_state.get("detections", []),
-        "person_detections": person_state.get("person_detections", []),
+        "source": camera_id,
+        "seq": history["seq"].tolist(),
+        "timestamps": history["timestamp"].tolist(),
+        "person_counts": history["person_count"].tolist(),
+        "face_counts": history["face_count"].tolist(),
     }
 
 
+def _subscribe_counts(
+    camera_id: list[str] | None,
+    coalesce_ms: int | None,
+) -> CountSubscription:
+    camera_ids = set(camera_id) if camera_id else None
+    for requested in camera_ids or ():
+        _require_camera(requested)
+    coalesce = None if coalesce_ms is None else max(0, coalesce_ms) / 1000
+    try:
+        return count_broadcaster.subscribe(camera_ids, coalesce)
+    except TooManySubscribersError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+@router.get("/api/people-count/events")
+async def people_count_events(
+    camera_id: list[str] | None = Query(default=None),
+    coalesce_ms: int | None = None,
+) -> StreamingResponse:
+    """Server-Sent Events: one ``count`` event per camera whose counts changed."""
+    subscription = _subscribe_counts(camera_id, coalesce_ms)
+
+    async def events():
+        async for batch in count_broadcaster.updates(subscription):
+            if not batch:
+                yield ": keepalive\n\n"
+                continue
+            for update in batch:
+                yield f"event: count\ndata: {json.dumps(update)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/api/people-count/ws")
+async def people_count_websocket(
+    websocket: WebSocket,
+    camera_id: list[str] | None = Query(default=None),
+    coalesce_ms: int | None = None,
+    encoding: str = ENCODING_JSON,
+) -> None:
+    """JSON batches of count deltas, or with ``encoding=binary`` one packed
+    frame (see ``payloads``) per changed camera including its boxes."""
+    try:
+        if encoding not in ENCODINGS:
+            raise HTTPException(status_code=400, detail=f"Unknown encoding '{encoding}'")
+        subscription = _subscribe_counts(camera_id, coalesce_ms)
+    except HTTPException as exc:
+        await websocket.close(code=1008, reason=str(exc.detail))
+        return
+
+    await websocket.accept()
+    try:
+        async for batch in count_broadcaster.updates(subscription):
+            if encoding != ENCODING_BINARY:
+                await websocket.send_text(json.dumps(batch))
+                continue
+            for update in batch:
+                snapshot = detection_state.latest(update["camera_id"] or UPLOAD_SOURCE)
+                await websocket.send_bytes(
+                    encode_binary(snapshot.to_payload(), snapshot.seq, snapshot.source)
+                )
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/api/people-count/webrtc/offer")
 async def people_count_webrtc_offer(offer: RTCOffer) -> dict[str, str]:
     if not AIORTC_AVAILABLE:
@@ -59,62 +296,268 @@ async def people_count_webrtc_offer(offer: RTCOffer) -> dict[str, str]:
             detail="WebRTC is unavailable because aiortc dependencies are missing",
         )
 
+    _require_camera(offer.camera_id)
+    if offer.encoding not in ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"Unknown encoding '{offer.encoding}'")
+
     try:
         return await webrtc_manager.create_answer(
             offer_sdp=offer.sdp,
             offer_type=offer.type,
-            on_frame=_apply_state,
+            camera_id=offer.camera_id,
+            encoding=offer.encoding,
         )
     except RuntimeError as exc:
         status_code = 503 if "webcam" in str(exc).lower() else 500
         raise HTTPException(status_code=status_code, detail=str(exc)) from exc
 
 
-@router.post("/api/image-detection/upload")
-async def image_upload_detection(file: UploadFile = File(...)) -> dict[str, object]:
+IMAGE_RESPONSE_FORMATS = {"json", "jpeg", "multipart", "url"}
+IMAGE_BATCH_FORMATS = {"json", "url"}
+
+
+async def _detect_uploaded_image(
+    file: UploadFile,
+    reduced: bool,
+    quality: int,
+) -> dict[str, object]:
+    """Decode and annotate in worker threads; inference goes through the
+    shared micro-batcher so concurrent uploads share predict calls."""
+    image_path = await spool_upload(file, upload_suffix(file, ".jpg"))
     try:
-        file_bytes = await file.read()
-        result = detect_faces_from_uploaded_image(file_bytes)
+        frame, source_size = await asyncio.to_thread(
+            decode_uploaded_image_file, image_path, reduced
+        )
+    finally:
+        image_path.unlink(missing_ok=True)
+
+    boxes = await asyncio.wrap_future(image_batcher.submit(frame))
+    return await asyncio.to_thread(annotate_uploaded_image, frame, boxes, quality, source_size)
+
+
+def _image_result_body(result: dict[str, object], jpeg: bytes, response_format: str) -> dict[str, object]:
+    if response_format == "url":
+        result_id = image_result_store.put(jpeg)
+        result["annotated_id"] = result_id
+        result["annotated_url"] = f"/api/image-detection/results/{result_id}"
+    else:
+        result["annotated_jpeg_base64"] = base64.b64encode(jpeg).decode("ascii")
+    return result
+
+
+def _multipart_image_response(result: dict[str, object], jpeg: bytes) -> Response:
+    boundary = uuid.uuid4().hex
+    body = b"".join(
+        [
+            f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+            json.dumps(result).encode("utf-8"),
+            f"\r\n--{boundary}\r\nContent-Type: image/jpeg\r\n\r\n".encode(),
+            jpeg,
+            f"\r\n--{boundary}--\r\n".encode(),
+        ]
+    )
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
+
+@router.post("/api/image-detection/upload", response_model=None)
+async def image_upload_detection(
+    file: UploadFile = File(...),
+    response_format: str = Query(default="json", alias="format"),
+    reduced: bool = False,
+    quality: int = Query(default=JPEG_QUALITY, ge=1, le=100),
+) -> dict[str, object] | Response:
+    """``format`` selects how the annotated image comes back: base64 inside
+    JSON (``json``), the raw JPEG with counts in headers (``jpeg``), a
+    ``multipart/mixed`` JSON + JPEG body (``multipart``) or JSON with a short
+    lived ``annotated_url`` (``url``). ``reduced`` decodes JPEGs at the
+    smallest DCT scale that still covers the model input."""
+    if response_format not in IMAGE_RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{response_format}'")
+
+    try:
+        result = await _detect_uploaded_image(file, reduced, quality)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    encoded = base64.b64encode(result["annotated_jpeg"]).decode("ascii")
-    result["annotated_jpeg_base64"] = encoded
-    result.pop("annotated_jpeg", None)
-    return result
+    jpeg = result.pop("annotated_jpeg")
+    if response_format == "jpeg":
+        return Response(
+            content=jpeg,
+            media_type="image/jpeg",
+            headers={
+                "X-Person-Count": str(result["person_count"]),
+                "X-Face-Count": str(result["face_count"]),
+            },
+        )
+    if response_format == "multipart":
+        return _multipart_image_response(result, jpeg)
+    return _image_result_body(result, jpeg, response_format)
+
+
+@router.post("/api/image-detection/batch")
+async def image_batch_detection(
+    files: list[UploadFile] = File(...),
+    response_format: str = Query(default="url", alias="format"),
+    reduced: bool = False,
+    quality: int = Query(default=JPEG_QUALITY, ge=1, le=100),
+) -> dict[str, object]:
+    """Detect people in several images at once. Results keep the upload
+    order; a file that fails to decode gets an ``error`` entry instead of
+    failing the whole request."""
+    if response_format not in IMAGE_BATCH_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{response_format}'")
+    if len(files) > IMAGE_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {IMAGE_BATCH_MAX_FILES} files per request",
+        )
+
+    outcomes = await asyncio.gather(
+        *(_detect_uploaded_image(file, reduced, quality) for file in files),
+        return_exceptions=True,
+    )
 
+    results: list[dict[str, object]] = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, (ValueError, RuntimeError)):
+            results.append({"filename": file.filename, "error": str(outcome)})
+            continue
+        if isinstance(outcome, BaseException):
+            raise outcome
+        jpeg = outcome.pop("annotated_jpeg")
+        results.append({"filename": file.filename, **_image_result_body(outcome, jpeg, response_format)})
 
-@router.post("/api/model/export/openvino")
-async def export_openvino_model(file: UploadFile = File(...)) -> dict[str, str]:
-    from .openvino_export import OpenVINOExportError, export_onnx_to_openvino
+    return {
+        "images": len(results),
+        "person_count": sum(int(item.get("person_count", 0)) for item in results),
+        "results": results,
+    }
+
+
+@router.get("/api/image-detection/batcher")
+def image_batcher_stats() -> dict[str, object]:
+    return image_batcher.stats
 
+
+@router.get("/api/image-detection/results/{result_id}")
+def image_detection_result(result_id: str) -> Response:
+    try:
+        jpeg = image_result_store.get(result_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Result expired or not found") from exc
+    return Response(content=jpeg, media_type="image/jpeg")
+
+
+@router.post("/api/model/export/openvino", status_code=202)
+async def export_openvino_model(
+    response: Response,
+    file: UploadFile = File(...),
+    calibration: list[UploadFile] | None = File(default=None),
+) -> dict[str, object]:
+    """Queue an ONNX to OpenVINO conversion. Images in ``calibration`` add
+    NNCF INT8 quantization with an FP vs INT8 report. An upload identical to
+    an earlier one (same ONNX and calibration bytes) reuses that export and
+    answers 200 once it has finished."""
     filename = file.filename or "model.onnx"
     suffix = Path(filename).suffix.lower()
     if suffix != ".onnx":
         raise HTTPException(status_code=400, detail="Only ONNX (.onnx) files are supported")
 
+    digest = hashlib.sha256()
+    onnx_path = await spool_upload(file, ".onnx", directory=export_store.incoming, digest=digest)
+    calibration_paths = []
+    for image in calibration or []:
+        image_digest = hashlib.sha256()
+        calibration_paths.append(
+            await spool_upload(
+                image,
+                upload_suffix(image, ".jpg"),
+                directory=export_store.incoming,
+                digest=image_digest,
+            )
+        )
+        digest.update(image_digest.digest())
+
     try:
-        file_bytes = await file.read()
-        return export_onnx_to_openvino(
-            onnx_bytes=file_bytes,
-            model_name=Path(filename).stem or "model",
-            output_root=Path("exports/openvino"),
+        job, cached = await asyncio.to_thread(
+            export_store.submit,
+            onnx_path,
+            digest.hexdigest(),
+            Path(filename).stem or "model",
+            calibration_paths,
         )
-    except OpenVINOExportError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    if job.status == JOB_COMPLETED:
+        response.status_code = 200
+    return {
+        **job.to_status(),
+        "cached": cached,
+        "status_url": f"/api/model/exports/{job.export_id}",
+    }
+
+
+def _require_export(export_id: str):
+    try:
+        return export_store.get(export_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Model export not found") from exc
+
+
+@router.get("/api/model/exports")
+def list_model_exports() -> dict[str, object]:
+    return {"exports": [job.to_status() for job in export_store.exports()]}
+
+
+@router.get("/api/model/exports/{export_id}")
+def model_export_status(export_id: str) -> dict[str, object]:
+    return _require_export(export_id).to_status()
+
+
+@router.delete("/api/model/exports/{export_id}")
+def delete_model_export(export_id: str) -> dict[str, str]:
+    if model_registry.in_use(f"export:{export_id}"):
+        raise HTTPException(status_code=409, detail="Export is serving a model")
+    try:
+        export_store.delete(export_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Model export not found") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"export_id": export_id, "status": "removed"}
+
+
+def _stride_options(stride_mode: str | None, stride: int | None) -> StrideOptions:
+    try:
+        return StrideOptions.from_query(stride_mode, stride)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/api/video-detection/upload")
-async def video_upload_detection(file: UploadFile = File(...)) -> dict[str, object]:
-    suffix = Path(file.filename or "upload.mp4").suffix or ".mp4"
+async def video_upload_detection(
+    file: UploadFile = File(...),
+    stride_mode: str | None = None,
+    stride: int | None = None,
+) -> dict[str, object]:
+    options = _stride_options(stride_mode, stride)
+    input_path = await spool_upload(file, upload_suffix(file))
+    output_path = input_path.with_name("processed_" + input_path.name)
 
     try:
-        file_bytes = await file.read()
-        result = analyze_uploaded_video(file_bytes, suffix=suffix)
+        result = await asyncio.to_thread(
+            analyze_video_file_parallel,
+            input_path,
+            output_path,
+            None,
+            options,
+        )
         return {
             "frames_processed": result["frames_processed"],
+            "frames_inferred": result["frames_inferred"],
             "unique_person_count": result["unique_persons"],
             "frame_detections": result["frame_wise_counts"],
             "video_path": result["output_video_path"],
@@ -123,6 +566,72 @@ async def video_upload_detection(file: UploadFile = File(...)) -> dict[str, obje
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        input_path.unlink(missing_ok=True)
+
+
+def _require_job(job_id: str):
+    try:
+        return video_job_store.get(job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Video job not found") from exc
+
+
+@router.post("/api/video-detection/jobs", status_code=202)
+async def submit_video_detection_job(
+    file: UploadFile = File(...),
+    stride_mode: str | None = None,
+    stride: int | None = None,
+) -> dict[str, object]:
+    options = _stride_options(stride_mode, stride)
+    suffix = upload_suffix(file)
+    upload_path = await spool_upload(file, suffix, directory=video_job_store.root)
+
+    try:
+        job = await asyncio.to_thread(video_job_store.submit, upload_path, suffix, options)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    return {
+        **job.to_status(),
+        "status_url": f"/api/video-detection/jobs/{job.job_id}",
+        "result_url": f"/api/video-detection/jobs/{job.job_id}/result",
+    }
+
+
+@router.get("/api/video-detection/jobs/{job_id}")
+def video_detection_job_status(job_id: str) -> dict[str, object]:
+    return _require_job(job_id).to_status()
+
+
+@router.get("/api/video-detection/jobs/{job_id}/result")
+def video_detection_job_result(job_id: str) -> dict[str, object]:
+    job = _require_job(job_id)
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=job.error or f"Video job is {job.status}",
+        )
+
+    return {
+        **video_job_store.result(job),
+        "video_url": f"/api/video-detection/jobs/{job_id}/video",
+    }
+
+
+@router.get("/api/video-detection/jobs/{job_id}/video")
+def video_detection_job_video(job_id: str) -> FileResponse:
+    job = _require_job(job_id)
+    if job.status != JOB_COMPLETED or not job.output_path.exists():
+        raise HTTPException(status_code=409, detail=f"Video job is {job.status}")
+
+    return FileResponse(
+        str(job.output_path),
+        media_type="video/mp4",
+        filename=f"processed_{job_id}.mp4",
+    )
 
 
 @router.get("/api/video-detection/upload/download")
@@ -146,20 +655,55 @@ async def video_upload_detection_download(video_path: str) -> FileResponse:
 
 
 @router.post("/api/video-detection/upload/stream")
-async def video_upload_detection_stream(file: UploadFile = File(...)) -> StreamingResponse:
-    suffix = Path(file.filename or "upload.mp4").suffix or ".mp4"
+async def video_upload_detection_stream(
+    file: UploadFile = File(...),
+    quality: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    max_fps: float | None = None,
+    metadata_only: bool = False,
+) -> StreamingResponse:
+    options = _stream_options(quality, width, height, max_fps, metadata_only)
+    video_path = await spool_upload(file, upload_suffix(file))
 
     try:
-        file_bytes = await file.read()
         return StreamingResponse(
             generate_uploaded_video_detection_stream(
-                file_bytes,
-                suffix=suffix,
+                video_path,
                 on_frame=_apply_state,
+                options=options,
             ),
-            media_type="multipart/x-mixed-replace; boundary=frame",
+            media_type=MULTIPART_MEDIA_TYPE,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@router.get("/api/debug/profiler")
+def profiler_status() -> dict[str, object]:
+    return sampling_profiler.stats()
+
+
+@router.post("/api/debug/profiler/start")
+def profiler_start(
+    interval_ms: float | None = Query(default=None, ge=1, le=1000),
+    reset: bool = True,
+) -> dict[str, object]:
+    if reset:
+        sampling_profiler.reset()
+    sampling_profiler.start(interval_ms / 1000.0 if interval_ms is not None else None)
+    return sampling_profiler.stats()
+
+
+@router.post("/api/debug/profiler/stop")
+def profiler_stop() -> dict[str, object]:
+    sampling_profiler.stop()
+    return sampling_profiler.stats()
+
+
+@router.get("/api/debug/profiler/stacks")
+def profiler_stacks(limit: int | None = Query(default=None, ge=1)) -> Response:
+    """Folded stacks (``thread;outer;...;inner count``) for flame graphs."""
+    return Response(content=sampling_profiler.collapsed(limit), media_type="text/plain")
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .config import FRAME_SIZE, MAX_INFERENCE_BATCH
+from .detection import predict_batch
+from .metrics import Counter, Gauge, Histogram, stage_timer
+from .model_registry import model_registry
+
+if TYPE_CHECKING:
+    from .camera_hub import CameraHub
+    from .regions import InferenceCrop
+
+BatchEntry = tuple["CameraHub", np.ndarray, np.ndarray, list["InferenceCrop"]]
+
+BATCH_IMAGES = Histogram(
+    "person_detection_inference_batch_images",
+    "Images (frames or crops) per batched inference call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+
+class InferenceScheduler:
+    """Collects the newest frame from every active camera and runs them through
+    the model as one batch, then tracks each result with its camera's own
+    ByteTrack session.
+
+    Cameras with an ROI or tile grid contribute several crops to the batch;
+    their detections are merged back into one frame before tracking. Cameras
+    pinned to another model are batched separately.
+    """
+
+    def __init__(self, max_batch: int = MAX_INFERENCE_BATCH) -> None:
+        self.max_batch = max(1, max_batch)
+        self._hubs: list[CameraHub] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._cursor = 0
+        self.batches_run = 0
+        self.frames_inferred = 0
+
+    def attach(self, hub: CameraHub) -> None:
+        with self._lock:
+            if hub not in self._hubs:
+                self._hubs.append(hub)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="inference-scheduler",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def detach(self, hub: CameraHub) -> None:
+        with self._lock:
+            if hub in self._hubs:
+                self._hubs.remove(hub)
+        self._wakeup.set()
+
+    @property
+    def hub_count(self) -> int:
+        with self._lock:
+            return len(self._hubs)
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _collect(self) -> list[BatchEntry]:
+        with self._lock:
+            hubs = list(self._hubs)
+            if not hubs:
+                return []
+            # Rotate the starting camera so no camera starves when N > max_batch.
+            start = self._cursor % len(hubs)
+            self._cursor += 1
+
+        batch: list[BatchEntry] = []
+        images = 0
+        for hub in hubs[start:] + hubs[:start]:
+            if batch and images >= self.max_batch:
+                break
+            grabbed = hub.poll_frame()
+            if grabbed is None:
+                continue
+
+            source = grabbed[1]
+            display = hub.display_frame(source, FRAME_SIZE)
+            if not hub.motion_gate.should_infer(display):
+                hub.publish_gated(display)
+                continue
+            crops = hub.regions.plan(source, display)
+            batch.append((hub, source, display, crops))
+            images += len(crops)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._hubs:
+                    self._thread = None
+                    return
+
+            self._wakeup.wait(timeout=0.25)
+            self._wakeup.clear()
+
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # Cameras pinned to different models cannot share a predict call.
+            groups: dict[str, list[BatchEntry]] = {}
+            for entry in batch:
+                groups.setdefault(model_registry.resolve(entry[0].camera_id), []).append(entry)
+            for entries in groups.values():
+                self._infer(entries)
+
+    def _infer(self, batch: list[BatchEntry]) -> None:
+        images = [crop.image for _, _, _, crops in batch for crop in crops]
+        try:
+            results = predict_batch(images, camera_id=batch[0][0].camera_id)
+        except Exception as exc:
+            print("Batched inference failed:", exc)
+            return
+
+        self.batches_run += 1
+        self.frames_inferred += len(batch)
+        BATCH_IMAGES.observe(len(images))
+
+        offset = 0
+        for hub, source, display, crops in batch:
+            hub_results = results[offset : offset + len(crops)]
+            offset += len(crops)
+            tracker = hub.tracker
+            if tracker is None:
+                continue
+
+            with stage_timer("track"):
+                if hub.regions.passthrough:
+                    boxes, track_ids = tracker.update(hub_results[0])
+                else:
+                    detections = hub.regions.merge(
+                        source.shape,
+                        crops,
+                        [result.boxes.data.cpu().numpy() for result in hub_results],
+                    )
+                    boxes, track_ids = tracker.update_detections(detections, display)
+            hub.publish_tracked(display, boxes, track_ids)
+
+
+inference_scheduler = InferenceScheduler()
+
+Counter(
+    "person_detection_inference_batches_total",
+    "Batched inference calls run by the scheduler.",
+    collect=lambda: {(): float(inference_scheduler.batches_run)},
+)
+Gauge(
+    "person_detection_inference_cameras",
+    "Cameras attached to the inference scheduler.",
+    collect=lambda: {(): float(inference_scheduler.hub_count)},
+)
@@ -1,11 +1,181 @@
 from __future__ import annotations
 
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Any
 
-person_state: dict[str, Any] = {
-    "count": 0,
-    "face_count": 0,
-    "person_count": 0,
-    "detections": [],
-    "person_detections": [],
-}
+import numpy as np
+
+from .config import COUNT_HISTORY_SIZE
+from .payloads import detections_to_json, payload_boxes
+
+# Source name for the uploaded-video stream, which has no camera id.
+UPLOAD_SOURCE = "upload"
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("seq", np.int64),
+        ("timestamp", np.float64),
+        ("person_count", np.int32),
+        ("face_count", np.int32),
+    ]
+)
+
+
+@dataclass(frozen=True)
+class DetectionSnapshot:
+    """Immutable state of one processed frame. Readers grab the current
+    instance and never see fields from two different frames."""
+
+    seq: int = 0
+    timestamp: float = 0.0
+    source: str | None = None
+    face_count: int = 0
+    person_count: int = 0
+    boxes: np.ndarray = field(default_factory=lambda: np.zeros((0, 4), dtype=np.int32))
+    track_ids: np.ndarray | None = None
+
+    @property
+    def count(self) -> int:
+        return self.person_count
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "face_count": self.face_count,
+            "person_count": self.person_count,
+            "boxes": self.boxes,
+            "ids": self.track_ids,
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "count": self.count,
+            "face_count": self.face_count,
+            "person_count": self.person_count,
+            "detections": detections_to_json(self.boxes, self.track_ids),
+        }
+
+
+class CountHistory:
+    """Fixed-size ring of recent counts for one source.
+
+    Every record is written twice, ``capacity`` slots apart, so the newest
+    ``n`` records are always one contiguous slice and ``view`` returns a
+    numpy view instead of copying or concatenating. Appends come from one
+    writer at a time; ``copy`` gives readers a consistent snapshot.
+    """
+
+    def __init__(self, capacity: int = COUNT_HISTORY_SIZE) -> None:
+        self.capacity = max(1, capacity)
+        self._buffer = np.zeros(self.capacity * 2, dtype=HISTORY_DTYPE)
+        self._written = 0
+        # Seqlock counter: odd while an append is writing.
+        self._version = 0
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    def append(self, snapshot: DetectionSnapshot) -> None:
+        record = (snapshot.seq, snapshot.timestamp, snapshot.person_count, snapshot.face_count)
+        slot = self._written % self.capacity
+        self._version += 1
+        self._buffer[slot] = record
+        self._buffer[slot + self.capacity] = record
+        self._written += 1
+        self._version += 1
+
+    def view(self, limit: int | None = None) -> np.ndarray:
+        """Live view of the newest records; a concurrent ``append`` can
+        overwrite its oldest one while it is read."""
+        written = self._written
+        size = min(written, self.capacity)
+        if limit is not None:
+            size = min(size, max(0, limit))
+        end = written % self.capacity + self.capacity
+        return self._buffer[end - size : end]
+
+    def copy(self, limit: int | None = None) -> np.ndarray:
+        """Copy of ``view`` taken while no ``append`` ran, retried otherwise."""
+        while True:
+            version = self._version
+            if version % 2 == 0:
+                records = self.view(limit).copy()
+                if self._version == version:
+                    return records
+            time.sleep(0)
+
+
+class DetectionState:
+    """Latest snapshot overall and per source, plus per-source count history.
+
+    Writers serialise on a lock to assign sequence numbers; readers only
+    dereference the current snapshot, which is swapped in as a whole.
+    """
+
+    def __init__(self, history_size: int = COUNT_HISTORY_SIZE) -> None:
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest = DetectionSnapshot()
+        self._sources: dict[str, DetectionSnapshot] = {}
+        self._history: dict[str, CountHistory] = {}
+        self._last_payload: dict[str, dict[str, Any]] = {}
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def update(self, payload: dict[str, Any], source: str | None = None) -> DetectionSnapshot:
+        source = source or UPLOAD_SOURCE
+        with self._lock:
+            # Motion-gated frames republish the previous payload object.
+            if self._last_payload.get(source) is payload and source in self._sources:
+                return self._sources[source]
+
+            self._seq += 1
+            snapshot = DetectionSnapshot(
+                seq=self._seq,
+                timestamp=time.time(),
+                source=source,
+                face_count=int(payload.get("face_count", 0)),
+                person_count=int(payload.get("person_count", 0)),
+                boxes=payload_boxes(payload),
+                track_ids=payload.get("ids"),
+            )
+            history = self._history.get(source)
+            if history is None:
+                history = self._history[source] = CountHistory(self.history_size)
+            history.append(snapshot)
+            self._last_payload[source] = payload
+            self._sources[source] = snapshot
+            self._latest = snapshot
+        return snapshot
+
+    def latest(self, source: str | None = None) -> DetectionSnapshot:
+        if source is None:
+            return self._latest
+        return self._sources.get(source) or DetectionSnapshot(source=source)
+
+    def history(self, source: str, limit: int | None = None) -> np.ndarray:
+        history = self._history.get(source)
+        if history is None:
+            return np.zeros(0, dtype=HISTORY_DTYPE)
+        return history.copy(limit)
+
+    def sources(self) -> list[str]:
+        with self._lock:
+            return list(self._sources)
+
+    def forget(self, source: str) -> None:
+        with self._lock:
+            self._sources.pop(source, None)
+            self._history.pop(source, None)
+            self._last_payload.pop(source, None)
+
+
+detection_state = DetectionState()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import cv2
+import numpy as np
+
+from .config import JPEG_QUALITY, STREAM_MAX_DIMENSION
+from .jpeg_codec import get_codec
+from .metrics import stage_timer
+from .payloads import payload_to_json
+
+MULTIPART_MEDIA_TYPE = "multipart/x-mixed-replace; boundary=frame"
+
+
+@dataclass(frozen=True)
+class StreamOptions:
+    """Per-client output settings for MJPEG streams.
+
+    ``width``/``height`` scale the annotated frame before encoding (one of
+    them alone keeps the aspect ratio), ``max_fps`` drops frames on the way
+    out, and ``metadata_only`` streams JSON payloads with no drawing or
+    encoding at all.
+    """
+
+    quality: int = JPEG_QUALITY
+    width: int | None = None
+    height: int | None = None
+    max_fps: float | None = None
+    metadata_only: bool = False
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.quality <= 100:
+            raise ValueError("quality must be between 1 and 100")
+        for name in ("width", "height"):
+            value = getattr(self, name)
+            if value is not None and not 16 <= value <= STREAM_MAX_DIMENSION:
+                raise ValueError(f"{name} must be between 16 and {STREAM_MAX_DIMENSION}")
+        if self.max_fps is not None and self.max_fps <= 0:
+            raise ValueError("max_fps must be positive")
+
+    @property
+    def encode_key(self) -> tuple[int, int | None, int | None]:
+        """Settings that change the encoded bytes; equal keys share one encode."""
+        return self.quality, self.width, self.height
+
+    def output_size(self, shape: tuple[int, ...]) -> tuple[int, int] | None:
+        height, width = shape[:2]
+        if self.width is None and self.height is None:
+            return None
+        if self.width is not None and self.height is not None:
+            size = (self.width, self.height)
+        elif self.width is not None:
+            size = (self.width, max(1, round(height * self.width / width)))
+        else:
+            size = (max(1, round(width * self.height / height)), self.height)
+        return None if size == (width, height) else size
+
+
+class FrameRateLimiter:
+    def __init__(self, max_fps: float | None) -> None:
+        self._interval = 1.0 / max_fps if max_fps else 0.0
+        self._next = 0.0
+
+    def allow(self) -> bool:
+        if not self._interval:
+            return True
+        now = time.monotonic()
+        if now < self._next:
+            return False
+        # Stay on the schedule so the average rate holds, unless we fell a
+        # whole interval behind (stalled source), in which case restart it.
+        if now - self._next > self._interval:
+            self._next = now
+        self._next += self._interval
+        return True
+
+
+def encode_jpeg(frame: np.ndarray, options: StreamOptions) -> bytes:
+    with stage_timer("encode"):
+        size = options.output_size(frame.shape)
+        if size is not None:
+            interpolation = cv2.INTER_AREA if size[0] < frame.shape[1] else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, size, interpolation=interpolation)
+
+        return get_codec().encode(frame, options.quality)
+
+
+def multipart_jpeg(jpeg: bytes) -> bytes:
+    return b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n"
+
+
+def multipart_json(payload: dict[str, Any]) -> bytes:
+    return (
+        b"--frame\r\nContent-Type: application/json\r\n\r\n"
+        + json.dumps(payload_to_json(payload)).encode("utf-8")
+        + b"\r\n"
+    )
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+
+from .config import (
+    STRIDE_MOTION_THRESHOLD,
+    VIDEO_FRAME_STRIDE,
+    VIDEO_MAX_STRIDE,
+    VIDEO_STRIDE_MODE,
+)
+from .motion import motion_score, motion_thumbnail
+
+if TYPE_CHECKING:
+    from .tracking import TrackerSession, Tracks
+
+STRIDE_OFF = "off"
+STRIDE_FIXED = "fixed"
+STRIDE_ADAPTIVE = "adaptive"
+STRIDE_MODES = {STRIDE_OFF, STRIDE_FIXED, STRIDE_ADAPTIVE}
+
+# Relative box displacement between keyframes that resets the adaptive stride.
+_ADAPTIVE_MAX_SHIFT = 0.1
+
+
+@dataclass(frozen=True)
+class StrideOptions:
+    mode: str = VIDEO_STRIDE_MODE
+    stride: int = VIDEO_FRAME_STRIDE
+    max_stride: int = VIDEO_MAX_STRIDE
+    motion_threshold: float = STRIDE_MOTION_THRESHOLD
+
+    def __post_init__(self) -> None:
+        if self.mode not in STRIDE_MODES:
+            raise ValueError(f"Unknown stride mode '{self.mode}'")
+        if self.stride < 1 or self.max_stride < 1:
+            raise ValueError("Stride must be at least 1")
+
+    @classmethod
+    def from_query(cls, mode: str | None = None, stride: int | None = None) -> StrideOptions:
+        defaults = cls()
+        return cls(
+            mode=mode or defaults.mode,
+            stride=defaults.stride if stride is None else stride,
+            max_stride=max(defaults.max_stride, stride or 1),
+        )
+
+    def tracker_frame_rate(self, fps: float) -> float:
+        # ByteTrack's lost-track buffer is counted in updates, not source frames.
+        step = self.stride if self.mode == STRIDE_FIXED else 1
+        return max(1.0, fps / step)
+
+
+class StridedTracker:
+    """Runs detection + tracking only on keyframes and extrapolates every
+    track along its last observed velocity on the frames in between."""
+
+    def __init__(
+        self,
+        detect: Callable[[np.ndarray], Any],
+        tracker: TrackerSession,
+        options: StrideOptions | None = None,
+    ) -> None:
+        self._detect = detect
+        self._tracker = tracker
+        self.options = options or StrideOptions()
+        self._stride = self.options.stride if self.options.mode == STRIDE_FIXED else 1
+        self._frame_index = -1
+        self._key_index: int | None = None
+        self._key_thumb: np.ndarray | None = None
+        self._key_boxes = np.zeros((0, 4), dtype=np.int32)
+        self._key_ids: np.ndarray | None = None
+        self._velocities = np.zeros((0, 4), dtype=np.float32)
+        self.frames_inferred = 0
+
+    def process(self, frame: np.ndarray) -> Tracks:
+        self._frame_index += 1
+        if self._needs_inference(frame):
+            boxes, track_ids = self._tracker.update(self._detect(frame))
+            self._observe(frame, boxes, track_ids)
+            return boxes, track_ids
+        return self._extrapolate(frame.shape)
+
+    def _needs_inference(self, frame: np.ndarray) -> bool:
+        if self.options.mode == STRIDE_OFF or self._key_index is None:
+            return True
+        if self._frame_index - self._key_index >= self._stride:
+            return True
+        if self.options.mode == STRIDE_ADAPTIVE and self._key_thumb is not None:
+            return motion_score(self._key_thumb, motion_thumbnail(frame)) > self.options.motion_threshold
+        return False
+
+    def _observe(
+        self,
+        frame: np.ndarray,
+        boxes: np.ndarray,
+        track_ids: np.ndarray | None,
+    ) -> None:
+        gap = self._frame_index - self._key_index if self._key_index is not None else 0
+        current = boxes.astype(np.float32)
+        velocities = np.zeros_like(current)
+        max_shift = 0.0
+
+        previous = self._previous_index(track_ids)
+        if previous is not None and gap > 0:
+            known = previous >= 0
+            shift = current[known] - self._key_boxes[previous[known]]
+            velocities[known] = shift / gap
+            if len(shift):
+                heights = np.maximum(1.0, current[known, 3] - current[known, 1])
+                max_shift = float((np.abs(shift).max(axis=1) / heights).max())
+
+        if self.options.mode == STRIDE_ADAPTIVE:
+            same_tracks = (
+                track_ids is not None
+                and self._key_ids is not None
+                and np.array_equal(np.sort(track_ids), np.sort(self._key_ids))
+            )
+            if same_tracks and max_shift <= _ADAPTIVE_MAX_SHIFT:
+                self._stride = min(self._stride + 1, self.options.max_stride)
+            else:
+                self._stride = 1
+            self._key_thumb = motion_thumbnail(frame)
+
+        self._velocities = velocities
+        self._key_boxes = boxes
+        self._key_ids = track_ids
+        self._key_index = self._frame_index
+        self.frames_inferred += 1
+
+    def _previous_index(self, track_ids: np.ndarray | None) -> np.ndarray | None:
+        """Row of each id in the previous keyframe, or -1 for new tracks."""
+        if track_ids is None or self._key_ids is None or len(self._key_ids) == 0:
+            return None
+        order = np.argsort(self._key_ids)
+        sorted_ids = self._key_ids[order]
+        slots = np.minimum(np.searchsorted(sorted_ids, track_ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[slots] == track_ids, order[slots], -1)
+
+    def _extrapolate(self, shape: tuple[int, ...]) -> Tracks:
+        if self._key_ids is None:
+            return self._key_boxes, None
+
+        height, width = shape[:2]
+        limits = np.array([width - 1, height - 1, width - 1, height - 1], dtype=np.float32)
+        elapsed = self._frame_index - (self._key_index or 0)
+        moved = np.clip(self._key_boxes + self._velocities * elapsed, 0, limits)
+        return moved.astype(np.int32), self._key_ids
@@ -0,0 +1,116 @@
+"""Compare strided video analysis against full-rate processing.
+
+Usage (from backend/src)::
+
+    python -m person_detection.stride_report clip.mp4 --mode fixed --stride 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+from .config import FRAME_SIZE
+from .detection import detect_frame_boxes
+from .stride import STRIDE_MODES, STRIDE_OFF, StridedTracker, StrideOptions
+from .tracking import TrackerSession
+from .video_workers import FrameTracks, _box_iou
+
+
+def _run(video_path: Path, options: StrideOptions) -> tuple[list[FrameTracks], int, float]:
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        raise ValueError("Invalid video upload")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25
+    strided = StridedTracker(
+        detect_frame_boxes,
+        TrackerSession(frame_rate=options.tracker_frame_rate(fps)),
+        options,
+    )
+    frames: list[FrameTracks] = []
+    started = time.perf_counter()
+
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(strided.process(cv2.resize(frame, FRAME_SIZE)))
+    finally:
+        capture.release()
+
+    return frames, strided.frames_inferred, time.perf_counter() - started
+
+
+def _count(frame: FrameTracks) -> int:
+    boxes, track_ids = frame
+    return len(np.unique(track_ids)) if track_ids is not None else len(boxes)
+
+
+def _box_recall(reference: np.ndarray, candidate: np.ndarray, threshold: float = 0.5) -> tuple[int, int]:
+    if len(reference) == 0 or len(candidate) == 0:
+        return 0, len(reference)
+
+    iou = _box_iou(reference, candidate)
+    matched = 0
+    for row in iou:
+        best = int(row.argmax())
+        if row[best] >= threshold:
+            matched += 1
+            iou[:, best] = -1.0
+    return matched, len(reference)
+
+
+def compare_stride_accuracy(video_path: Path, options: StrideOptions) -> dict[str, Any]:
+    full, full_inferred, full_seconds = _run(video_path, StrideOptions(mode=STRIDE_OFF))
+    strided, strided_inferred, strided_seconds = _run(video_path, options)
+
+    frames = min(len(full), len(strided))
+    errors = [abs(_count(full[i]) - _count(strided[i])) for i in range(frames)]
+    matched = total = 0
+    for i in range(frames):
+        hit, count = _box_recall(full[i][0], strided[i][0])
+        matched += hit
+        total += count
+
+    def unique(tracks: list[FrameTracks]) -> int:
+        return len({track_id for _, ids in tracks if ids is not None for track_id in ids.tolist()})
+
+    return {
+        "video": str(video_path),
+        "mode": options.mode,
+        "stride": options.stride,
+        "max_stride": options.max_stride,
+        "frames": frames,
+        "frames_inferred": {"full": full_inferred, "strided": strided_inferred},
+        "seconds": {"full": round(full_seconds, 3), "strided": round(strided_seconds, 3)},
+        "speedup": round(full_seconds / strided_seconds, 2) if strided_seconds > 0 else None,
+        "count_mae": round(sum(errors) / frames, 4) if frames else 0.0,
+        "count_max_error": max(errors, default=0),
+        "count_agreement": round(errors.count(0) / frames, 4) if frames else 1.0,
+        "box_recall_iou50": round(matched / total, 4) if total else 1.0,
+        "unique_persons": {"full": unique(full), "strided": unique(strided)},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", type=Path)
+    parser.add_argument("--mode", choices=sorted(STRIDE_MODES - {STRIDE_OFF}), default="fixed")
+    parser.add_argument("--stride", type=int, default=3)
+    parser.add_argument("--max-stride", type=int, default=5)
+    args = parser.parse_args()
+
+    options = StrideOptions(mode=args.mode, stride=args.stride, max_stride=args.max_stride)
+    print(json.dumps(compare_stride_accuracy(args.video, options), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .config import TRACKER_CONFIG
+
+# ultralytics (and with it torch) is imported by the first tracker session,
+# not when the package is imported.
+
+BBox = tuple[int, int, int, int]
+# ``(N, 4)`` int32 xyxy boxes and ``(N,)`` int32 track ids (``None`` when untracked).
+Tracks = tuple[np.ndarray, np.ndarray | None]
+
+
+# ``track_buffer`` in the tracker config is in frames at this rate.
+TRACK_BUFFER_FPS = 30
+
+
+class TrackerSession:
+    """Independent ByteTrack state for a single stream. Each tracker hands
+    out its own ids, so sessions never share a counter.
+
+    ``frame_rate`` is how often ``update`` is called per second of video;
+    the lost-track buffer is scaled by it so a lost track survives the same
+    time whatever the source rate or stride.
+    """
+
+    def __init__(self, tracker_config: str = TRACKER_CONFIG, frame_rate: float = TRACK_BUFFER_FPS):
+        from ultralytics.trackers.byte_tracker import BYTETracker
+        from ultralytics.utils import YAML, IterableSimpleNamespace
+
+        args = IterableSimpleNamespace(**YAML.load(tracker_config))
+        # ultralytics 8.4 dropped BYTETracker's frame_rate; scale the buffer here.
+        args.track_buffer = max(1, int(round(frame_rate / TRACK_BUFFER_FPS * args.track_buffer)))
+        self._tracker = BYTETracker(args=args)
+
+    def update(self, result: Any) -> Tracks:
+        return self._update(result.boxes.cpu().numpy(), result.orig_img)
+
+    def update_detections(
+        self,
+        detections: np.ndarray,
+        frame: np.ndarray,
+    ) -> Tracks:
+        """``detections`` is an ``(N, 6)`` array of x1, y1, x2, y2, conf, cls
+        in ``frame`` coordinates."""
+        from ultralytics.engine.results import Boxes
+
+        return self._update(Boxes(detections, frame.shape[:2]), frame)
+
+    def _update(self, det: Any, frame: np.ndarray) -> Tracks:
+        # Called on empty frames too, so lost tracks age out on schedule.
+        tracks = self._tracker.update(det, frame)
+        if len(tracks) == 0:
+            return np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+        return tracks[:, :4].astype(np.int32), tracks[:, 4].astype(np.int32)
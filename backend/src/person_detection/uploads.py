@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any
+
+from fastapi import UploadFile
+
+from .config import UPLOAD_CHUNK_SIZE
+
+
+def upload_suffix(file: UploadFile, default: str = ".mp4") -> str:
+    return Path(file.filename or f"upload{default}").suffix or default
+
+
+async def spool_upload(
+    file: UploadFile,
+    suffix: str,
+    directory: Path | None = None,
+    digest: Any = None,
+) -> Path:
+    """Copy an upload to a named file chunk by chunk, so peak memory stays at
+    one chunk regardless of upload size. Chunks are written (and hashed) in
+    a worker thread to keep disk I/O off the event loop. The caller owns the
+    returned file. A ``hashlib`` object passed as ``digest`` is fed every
+    chunk."""
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    with NamedTemporaryFile(delete=False, suffix=suffix, dir=directory) as temp:
+        path = Path(temp.name)
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(_write_chunk, temp, chunk, digest)
+        except BaseException:
+            temp.close()
+            path.unlink(missing_ok=True)
+            raise
+
+    await file.close()
+    return path
+
+
+def _write_chunk(temp: Any, chunk: bytes, digest: Any) -> None:
+    temp.write(chunk)
+    if digest is not None:
+        digest.update(chunk)
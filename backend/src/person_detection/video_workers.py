@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import os
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from .config import (
+    FRAME_SIZE,
+    SEGMENT_OVERLAP_FRAMES,
+    STITCH_IOU_THRESHOLD,
+    VIDEO_MIN_SEGMENT_FRAMES,
+    VIDEO_WORKER_THREADS,
+    VIDEO_WORKERS,
+)
+from .stride import StrideOptions
+
+# Kept free of model imports at module level: worker processes import this
+# module first and load and warm up their own model in ``_init_worker``.
+FrameTracks = tuple[np.ndarray, np.ndarray | None]
+Segment = tuple[int, int | None]
+
+PROGRESS_EVERY_FRAMES = 25
+
+
+# ==============================
+# WORKER PROCESS SIDE
+# ==============================
+
+_worker_progress: Any = None
+
+
+def _init_worker(threads: int, progress_queue: Any, model_id: str) -> None:
+    global _worker_progress
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    _worker_progress = progress_queue
+    _use_model(model_id)
+
+
+def _use_model(model_id: str) -> None:
+    """Serve this worker's detections from ``model_id``. Each worker has its
+    own registry; the server resolves the id, and a model not seen before is
+    loaded and warmed here on first use (the previous one is freed)."""
+    from .model_registry import model_registry
+
+    model_registry.activate(model_id, warmup_runs=1)
+
+
+def _report_progress(token: str | None, frames: int) -> None:
+    if token is not None and frames > 0 and _worker_progress is not None:
+        _worker_progress.put((token, frames))
+
+
+def _track_segment(
+    video_path: str,
+    start: int,
+    end: int | None,
+    model_id: str,
+    overlap: int = 0,
+    token: str | None = None,
+    stride: StrideOptions | None = None,
+) -> tuple[list[FrameTracks], int]:
+    from .detection import detect_frame_boxes
+    from .stride import StridedTracker
+    from .tracking import TrackerSession
+
+    _use_model(model_id)
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError("Invalid video upload")
+    if start:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25
+
+    stride = stride or StrideOptions()
+    strided = StridedTracker(
+        detect_frame_boxes,
+        TrackerSession(frame_rate=stride.tracker_frame_rate(fps)),
+        stride,
+    )
+    frames: list[FrameTracks] = []
+    unreported = 0
+
+    try:
+        index = start
+        while end is None or index < end:
+            ok, frame = capture.read()
+            if not ok:
+                break
+
+            frame = cv2.resize(frame, FRAME_SIZE)
+            frames.append(strided.process(frame))
+            index += 1
+
+            # Overlap frames are owned by the previous segment's progress.
+            if len(frames) > overlap:
+                unreported += 1
+            if unreported >= PROGRESS_EVERY_FRAMES:
+                _report_progress(token, unreported)
+                unreported = 0
+    finally:
+        capture.release()
+        _report_progress(token, unreported)
+
+    return frames, strided.frames_inferred
+
+
+def _render_video(
+    video_path: str,
+    output_path: str,
+    tracks: list[FrameTracks],
+    fps: float,
+) -> None:
+    from .renderer import FrameRenderer
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError("Invalid video upload")
+
+    width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    writer = cv2.VideoWriter(
+        output_path,
+        cv2.VideoWriter_fourcc(*"mp4v"),
+        fps,
+        (width, height),
+    )
+    box_scale = (width / FRAME_SIZE[0], height / FRAME_SIZE[1])
+    renderer = FrameRenderer.for_scale(min(box_scale))
+
+    try:
+        for boxes, track_ids in tracks:
+            ok, frame = capture.read()
+            if not ok:
+                break
+
+            writer.write(renderer.render(frame, boxes, track_ids, box_scale))
+    finally:
+        capture.release()
+        writer.release()
+
+
+# ==============================
+# SEGMENT PLANNING / STITCHING
+# ==============================
+
+def _plan_segments(total_frames: int, workers: int) -> list[Segment]:
+    if total_frames <= 0:
+        return [(0, None)]
+
+    count = max(1, min(workers, total_frames // max(1, VIDEO_MIN_SEGMENT_FRAMES)))
+    size = math.ceil(total_frames / count)
+    segments: list[Segment] = [(i * size, (i + 1) * size) for i in range(count)]
+    # Frame counts from container headers can be off; let the last segment run to EOF.
+    segments[-1] = (segments[-1][0], None)
+    return segments
+
+
+def _box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU matrix between ``(N, 4)`` and ``(M, 4)`` xyxy boxes."""
+    a = a.astype(np.float32)[:, None, :]
+    b = b.astype(np.float32)[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def _match_overlap(
+    tail: list[FrameTracks],
+    head: list[FrameTracks],
+) -> dict[int, int]:
+    """Map a segment's local track ids onto the global ids of the previous
+    segment by voting on box IoU over the frames both segments processed."""
+    votes: Counter[tuple[int, int]] = Counter()
+    for (prev_boxes, prev_ids), (boxes, track_ids) in zip(tail, head):
+        if prev_ids is None or track_ids is None or len(prev_ids) == 0:
+            continue
+        iou = _box_iou(boxes, prev_boxes)
+        best = iou.argmax(axis=1)
+        matched = iou[np.arange(len(best)), best] >= STITCH_IOU_THRESHOLD
+        for track_id, prev_id in zip(track_ids[matched].tolist(), prev_ids[best[matched]].tolist()):
+            votes[(track_id, prev_id)] += 1
+
+    id_map: dict[int, int] = {}
+    taken: set[int] = set()
+    for (track_id, global_id), _ in votes.most_common():
+        if track_id in id_map or global_id in taken:
+            continue
+        id_map[track_id] = global_id
+        taken.add(global_id)
+    return id_map
+
+
+def _stitch_segments(segments: list[tuple[int, list[FrameTracks]]]) -> list[FrameTracks]:
+    """``segments`` holds ``(overlap, frames)`` per segment, where the first
+    ``overlap`` frames repeat the tail of the previous segment."""
+    stitched: list[FrameTracks] = []
+    next_global_id = 1
+
+    for overlap, frames in segments:
+        overlap = min(overlap, len(stitched), len(frames))
+        id_map = _match_overlap(stitched[len(stitched) - overlap:], frames[:overlap]) if overlap else {}
+
+        for boxes, track_ids in frames[overlap:]:
+            if track_ids is None:
+                stitched.append((boxes, None))
+                continue
+
+            global_ids = []
+            for track_id in track_ids.tolist():
+                if track_id not in id_map:
+                    id_map[track_id] = next_global_id
+                    next_global_id += 1
+                global_ids.append(id_map[track_id])
+            stitched.append((boxes, np.array(global_ids, dtype=np.int32)))
+
+    return stitched
+
+
+# ==============================
+# POOL
+# ==============================
+
+_pool: ProcessPoolExecutor | None = None
+_progress_queue: Any = None
+_pool_lock = threading.Lock()
+_progress_listeners: dict[str, Callable[[int], None]] = {}
+
+
+def get_video_worker_pool() -> ProcessPoolExecutor:
+    from .model_registry import model_registry
+
+    global _pool, _progress_queue
+    with _pool_lock:
+        if _pool is None:
+            context = mp.get_context("spawn")
+            _progress_queue = context.Queue()
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, VIDEO_WORKERS),
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(VIDEO_WORKER_THREADS, _progress_queue, model_registry.resolve()),
+            )
+            threading.Thread(
+                target=_drain_progress,
+                args=(_progress_queue,),
+                name="video-progress",
+                daemon=True,
+            ).start()
+        return _pool
+
+
+def _drain_progress(progress_queue: Any) -> None:
+    while True:
+        item = progress_queue.get()
+        if item is None:
+            return
+        token, frames = item
+        listener = _progress_listeners.get(token)
+        if listener is not None:
+            listener(frames)
+
+
+def shutdown_video_workers() -> None:
+    """Stop the pool and its progress thread; the next analysis starts both
+    afresh."""
+    global _pool, _progress_queue
+    with _pool_lock:
+        pool, _pool = _pool, None
+        progress_queue, _progress_queue = _progress_queue, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if progress_queue is not None:
+        # Ends _drain_progress; the queue is dropped once it has read this.
+        progress_queue.put(None)
+
+
+# ==============================
+# VIDEO UPLOAD SUMMARY (PARALLEL)
+# ==============================
+
+def analyze_video_file_parallel(
+    input_path: Path,
+    output_path: Path,
+    progress: Callable[[int], None] | None = None,
+    stride: StrideOptions | None = None,
+) -> dict[str, Any]:
+    """Same result as ``detection.analyze_video_file``, but segments are
+    tracked in parallel worker processes and their ids stitched together."""
+    if VIDEO_WORKERS <= 0:
+        from .detection import analyze_video_file
+
+        return analyze_video_file(input_path, output_path, progress=progress, stride=stride)
+
+    from .model_registry import model_registry
+
+    capture = cv2.VideoCapture(str(input_path))
+    if not capture.isOpened():
+        raise ValueError("Invalid video upload")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25
+    total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+
+    # Workers load models themselves; tell them which one serves right now.
+    model_id = model_registry.resolve()
+    pool = get_video_worker_pool()
+    token = uuid.uuid4().hex if progress else None
+    if token is not None:
+        _progress_listeners[token] = progress
+
+    try:
+        futures = []
+        for start, end in _plan_segments(total_frames, VIDEO_WORKERS):
+            overlap = min(start, SEGMENT_OVERLAP_FRAMES)
+            future = pool.submit(
+                _track_segment,
+                str(input_path),
+                start - overlap,
+                end,
+                model_id,
+                overlap,
+                token,
+                stride,
+            )
+            futures.append((overlap, future))
+
+        segments = [(overlap, future.result()) for overlap, future in futures]
+        tracks = _stitch_segments([(overlap, frames) for overlap, (frames, _) in segments])
+        frames_inferred = sum(inferred for _, (_, inferred) in segments)
+    finally:
+        if token is not None:
+            _progress_listeners.pop(token, None)
+
+    pool.submit(_render_video, str(input_path), str(output_path), tracks, fps).result()
+
+    unique_ids: set[int] = set()
+    frame_counts: list[dict[str, int]] = []
+    for frame_number, (boxes, track_ids) in enumerate(tracks, start=1):
+        if track_ids is not None:
+            unique_ids.update(track_ids.tolist())
+        count = len(np.unique(track_ids)) if track_ids is not None else len(boxes)
+        frame_counts.append({"frame": frame_number, "count": count})
+
+    return {
+        "frames_processed": len(tracks),
+        "frames_inferred": frames_inferred,
+        "unique_persons": len(unique_ids),
+        "frame_wise_counts": frame_counts,
+        "output_video_path": str(output_path),
+    }
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-import cv2
+from concurrent.futures import ThreadPoolExecutor
 from fractions import Fraction
+from functools import partial
 from typing import Any, Callable
 import asyncio
 import json
+import time
+
+import cv2
+import numpy as np
 
-from .detection import detect_frame_track
-from .config import FRAME_SIZE
-from .detection import open_realtime_capture
+from .camera_hub import HubFrame, get_camera_hub
+from .config import (
+    DEFAULT_CAMERA_ID,
+    WEBRTC_FPS,
+    WEBRTC_MIN_FPS,
+    WEBRTC_MIN_SCALE,
+    WEBRTC_WORKERS,
+)
+from .metrics import STAGE_SECONDS, Counter, Gauge, stage_timer
+from .payloads import ENCODING_BINARY, ENCODING_JSON, encode_binary, payload_to_json
 
 try:
     from aiortc import RTCPeerConnection, RTCSessionDescription
@@ -24,6 +36,120 @@ except Exception:
     VideoFrame = Any 
     AIORTC_AVAILABLE = False
 
+WEBRTC_FRAMES = Counter(
+    "person_detection_webrtc_frames_total",
+    "Video frames handed to WebRTC peers.",
+)
+
+VIDEO_CLOCK_RATE = 90000
+VIDEO_TIME_BASE = Fraction(1, VIDEO_CLOCK_RATE)
+# End the track if the hub publishes nothing for this long.
+FRAME_TIMEOUT_SECONDS = 5.0
+
+# Frame conversion is CPU work; keep it off the loop and out of the default
+# executor that request handlers use for asyncio.to_thread. Waiting for hub
+# frames happens on the loop and holds no thread.
+_track_executor = ThreadPoolExecutor(
+    max_workers=max(1, WEBRTC_WORKERS),
+    thread_name_prefix="webrtc-track",
+)
+
+
+class FramePacer:
+    """Clock-based pacing for one outgoing track that sheds load when the
+    pipeline cannot keep up.
+
+    Frames are due on a fixed schedule, so the time spent producing a frame
+    comes out of the wait rather than adding to it. The rate never exceeds
+    what the camera hub actually publishes. When converting and encoding a
+    frame takes most of the frame interval, the resolution steps down first
+    and then the frame rate. Both recover once there is headroom again.
+    Decisions are made every ``ADAPT_EVERY`` frames to avoid flapping.
+    """
+
+    ADAPT_EVERY = 12
+    OVERLOADED = 0.8
+    UNDERLOADED = 0.4
+    SCALE_STEP = 0.75
+    FPS_STEP = 0.75
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        target_fps: float,
+        min_fps: float = WEBRTC_MIN_FPS,
+        min_scale: float = WEBRTC_MIN_SCALE,
+    ) -> None:
+        self.target_fps = max(1.0, float(target_fps))
+        self.min_fps = min(self.target_fps, max(1.0, float(min_fps)))
+        self.min_scale = min(1.0, max(0.1, min_scale))
+        self.fps = self.target_fps
+        self.scale = 1.0
+        self.load = 0.0
+        self._source_fps = 0.0
+        self._next: float | None = None
+        self._frames = 0
+
+    @property
+    def interval(self) -> float:
+        fps = self.fps
+        if self._source_fps > 0:
+            fps = min(fps, max(self.min_fps, self._source_fps))
+        return 1.0 / fps
+
+    def delay(self, now: float) -> float:
+        """Seconds to wait before producing the next frame."""
+        if self._next is None:
+            self._next = now
+        return max(0.0, self._next - now)
+
+    def frame_done(self, now: float, work: float, source_fps: float = 0.0) -> None:
+        """Schedule the next frame after one that took ``work`` seconds of
+        conversion and encoding; ``source_fps`` is the hub's publish rate."""
+        self._source_fps = source_fps
+        interval = self.interval
+        self.load += self.SMOOTHING * (work / interval - self.load)
+
+        self._next = (self._next or now) + interval
+        # Fell a whole interval behind (slow source or stall): restart the
+        # schedule instead of bursting frames to catch up.
+        if now - self._next > interval:
+            self._next = now
+
+        self._frames += 1
+        if self._frames % self.ADAPT_EVERY == 0:
+            self._adapt()
+
+    def _adapt(self) -> None:
+        if self.load > self.OVERLOADED:
+            if self.scale > self.min_scale:
+                self.scale = max(self.min_scale, self.scale * self.SCALE_STEP)
+            elif self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps * self.FPS_STEP)
+        elif self.load < self.UNDERLOADED:
+            if self.fps < self.target_fps:
+                self.fps = min(self.target_fps, self.fps / self.FPS_STEP)
+            elif self.scale < 1.0:
+                self.scale = min(1.0, self.scale / self.SCALE_STEP)
+
+
+def _scaled(frame: np.ndarray, scale: float) -> np.ndarray:
+    if scale >= 1.0:
+        return frame
+    height, width = frame.shape[:2]
+    # Even dimensions for the encoder's 4:2:0 chroma subsampling.
+    size = (max(2, int(width * scale) & ~1), max(2, int(height * scale) & ~1))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def _wake(loop: asyncio.AbstractEventLoop, event: asyncio.Event) -> None:
+    """Set ``event`` from a hub's publishing thread."""
+    try:
+        loop.call_soon_threadsafe(event.set)
+    except RuntimeError:
+        # The loop closed before the track was stopped; nobody is waiting.
+        pass
+
 
 class DetectionVideoTrack(MediaStreamTrack):
     kind = "video"
@@ -31,38 +157,100 @@ class DetectionVideoTrack(MediaStreamTrack):
     def __init__(
         self,
         on_frame: Callable[[dict[str, Any]], None],
-        camera_index: int = 0,
-        fps: int = 24,
+        camera_id: str = DEFAULT_CAMERA_ID,
+        fps: int = WEBRTC_FPS,
     ) -> None:
+        """Blocks while the camera opens; construct it off the event loop."""
         super().__init__()
         self._on_frame = on_frame
-        self._fps = max(1, fps)
-        self._pts = 0
-        self._capture = open_realtime_capture()
+        self._pacer = FramePacer(fps)
+        self._started: float | None = None
+        self._returned_at: float | None = None
+        self._seq = 0
+        self._frame_event = asyncio.Event()
+        self._listener: Callable[[], None] | None = None
+        self._hub = get_camera_hub(camera_id)
+        self._hub.subscribe()
 
-        if self._capture is None:
+        if not self._hub.available:
+            self._hub.unsubscribe()
+            self._hub = None
             raise RuntimeError("Could not open webcam")
 
     async def recv(self) -> VideoFrame:
-        ok, frame = self._capture.read()
-        if not ok:
+        hub = self._hub
+        if hub is None:
+            raise MediaStreamError
+
+        now = time.monotonic()
+        # Between two recv calls aiortc encodes and sends the previous frame.
+        send_seconds = 0.0
+        if self._returned_at is not None:
+            send_seconds = now - self._returned_at
+            STAGE_SECONDS.observe(send_seconds, "webrtc_send")
+        await asyncio.sleep(self._pacer.delay(now))
+
+        loop = asyncio.get_running_loop()
+        if self._listener is None:
+            self._listener = partial(_wake, loop, self._frame_event)
+            hub.add_listener(self._listener)
+        with stage_timer("webrtc_wait"):
+            hub_frame = await self._next_hub_frame(hub)
+        if hub_frame is None:
             raise MediaStreamError
 
-        frame = cv2.resize(frame, FRAME_SIZE)
-        payload, annotated = detect_frame_track(frame)
+        self._seq, payload, frame = hub_frame
+        video_frame, convert_seconds = await loop.run_in_executor(
+            _track_executor, self._convert, frame, self._pacer.scale
+        )
         self._on_frame(payload)
 
-        video_frame = VideoFrame.from_ndarray(annotated, format="bgr24")
-        video_frame.pts = self._pts
-        video_frame.time_base = Fraction(1, self._fps)
-        self._pts += 1
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        video_frame.pts = int((now - self._started) * VIDEO_CLOCK_RATE)
+        video_frame.time_base = VIDEO_TIME_BASE
+        WEBRTC_FRAMES.inc()
 
-        await asyncio.sleep(1 / self._fps)
+        self._pacer.frame_done(now, convert_seconds + send_seconds, hub.fps)
+        self._returned_at = time.monotonic()
         return video_frame
 
+    async def _next_hub_frame(self, hub: Any) -> HubFrame | None:
+        """Wait for a frame newer than the last one sent; the hub's listener
+        sets ``_frame_event`` from its publishing thread."""
+        deadline = time.monotonic() + FRAME_TIMEOUT_SECONDS
+        while True:
+            self._frame_event.clear()
+            hub_frame = hub.latest_frame(self._seq)
+            if hub_frame is not None:
+                return hub_frame
+            remaining = deadline - time.monotonic()
+            if hub.stopped or remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._frame_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    @staticmethod
+    def _convert(frame: np.ndarray, scale: float) -> tuple[VideoFrame, float]:
+        started = time.perf_counter()
+        with stage_timer("webrtc_frame"):
+            video_frame = VideoFrame.from_ndarray(_scaled(frame, scale), format="bgr24")
+        return video_frame, time.perf_counter() - started
+
     def stop(self) -> None:
-        if self._capture is not None and self._capture.isOpened():
-            self._capture.release()
+        hub, self._hub = self._hub, None
+        if hub is not None:
+            if self._listener is not None:
+                hub.remove_listener(self._listener)
+            # Releasing the last subscriber joins the grabber thread. During
+            # server shutdown the executor is already gone; release inline.
+            try:
+                _track_executor.submit(hub.unsubscribe)
+            except RuntimeError:
+                hub.unsubscribe()
         super().stop()
 
 
@@ -74,7 +262,8 @@ class WebRTCSessionManager:
         self,
         offer_sdp: str,
         offer_type: str,
-        on_frame: Callable[[dict[str, Any]], None],
+        camera_id: str = DEFAULT_CAMERA_ID,
+        encoding: str = ENCODING_JSON,
     ) -> dict[str, str]:
         if not AIORTC_AVAILABLE:
             raise RuntimeError("aiortc is not installed")
@@ -88,21 +277,26 @@ class WebRTCSessionManager:
             nonlocal data_channel
             data_channel = channel
 
+        sent = 0
+
         def push_payload(payload: dict[str, Any]) -> None:
-            on_frame(payload)
-            if data_channel is not None and data_channel.readyState == "open":
-                data_channel.send(
-                    json.dumps(
-                        {
-                            "person_count": int(payload.get("person_count", 0)),
-                            "face_count": int(payload.get("face_count", 0)),
-                            "detections": payload.get("detections", []),
-                            "person_detections": payload.get("person_detections", []),
-                        }
-                    )
-                )
-
-        track = DetectionVideoTrack(on_frame=push_payload)
+            nonlocal sent
+            if data_channel is None or data_channel.readyState != "open":
+                return
+            sent += 1
+            if encoding == ENCODING_BINARY:
+                data_channel.send(encode_binary(payload, seq=sent, source=camera_id))
+            else:
+                data_channel.send(json.dumps(payload_to_json(payload)))
+
+        try:
+            track = await asyncio.to_thread(
+                DetectionVideoTrack, on_frame=push_payload, camera_id=camera_id
+            )
+        except Exception:
+            self._pcs.discard(pc)
+            await pc.close()
+            raise
         pc.addTrack(track)
 
         @pc.on("connectionstatechange")
@@ -128,6 +322,13 @@ class WebRTCSessionManager:
         for pc in pcs:
             await pc.close()
             self._pcs.discard(pc)
+        _track_executor.shutdown(wait=False, cancel_futures=True)
 
 
 webrtc_manager = WebRTCSessionManager()
+
+Gauge(
+    "person_detection_webrtc_peers",
+    "Open WebRTC peer connections.",
+    collect=lambda: {(): float(len(webrtc_manager._pcs))},
+)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app is run from backend/src (``uvicorn main:app``); import it the same way.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,63 @@
+import pytest
+
+from person_detection.export_jobs import ExportJob, ExportStore
+from person_detection.jobs import JOB_COMPLETED
+from person_detection.model_registry import model_registry
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ExportStore(root=tmp_path / "exports", max_entries=2, ttl=3600)
+    # Keep conversions out of the test; jobs just stay queued.
+    monkeypatch.setattr(store, "_run", lambda job: None)
+    yield store
+    store.shutdown()
+
+
+def _spool(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"onnx")
+    return path
+
+
+def _finished(store, export_id, last_used_at):
+    job = ExportJob(
+        export_id=export_id,
+        export_dir=store.root / export_id,
+        model_name="model",
+        status=JOB_COMPLETED,
+        finished_at=last_used_at,
+        last_used_at=last_used_at,
+    )
+    job.export_dir.mkdir(parents=True)
+    store._jobs[export_id] = job
+    return job
+
+
+def test_identical_upload_reuses_the_export(store, tmp_path):
+    job, reused = store.submit(_spool(tmp_path, "a.onnx"), "hash", "model")
+    again, reused_again = store.submit(_spool(tmp_path, "b.onnx"), "hash", "model")
+
+    assert not reused
+    assert reused_again
+    assert again is job
+    assert not (tmp_path / "b.onnx").exists()
+
+
+def test_evicts_least_recently_used_beyond_max_entries(store):
+    for index, export_id in enumerate(["old", "mid", "new"]):
+        _finished(store, export_id, last_used_at=1e10 + index)
+
+    assert store.evict() == 1
+    assert sorted(job.export_id for job in store.exports()) == ["mid", "new"]
+    assert not (store.root / "old").exists()
+
+
+def test_eviction_skips_exports_the_registry_serves(store, monkeypatch):
+    for index, export_id in enumerate(["pinned", "mid", "new"]):
+        _finished(store, export_id, last_used_at=1e10 + index)
+    monkeypatch.setitem(model_registry._pins, "camera", "export:pinned")
+
+    store.evict()
+
+    assert sorted(job.export_id for job in store.exports()) == ["new", "pinned"]
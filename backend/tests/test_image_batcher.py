@@ -0,0 +1,40 @@
+import threading
+
+import numpy as np
+
+from person_detection.image_batcher import ImageBatcher
+
+
+def test_batcher_groups_concurrent_images_into_one_predict_call():
+    calls = []
+    release = threading.Event()
+
+    def predict(frames):
+        calls.append(len(frames))
+        release.wait(1)
+        return [np.full((1, 4), frame[0, 0, 0], dtype=np.int32) for frame in frames]
+
+    batcher = ImageBatcher(max_batch=4, max_wait=0.5, predict=predict)
+    try:
+        futures = [batcher.submit(np.full((2, 2, 3), value, dtype=np.uint8)) for value in range(4)]
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.shutdown()
+
+    assert calls == [4]
+    assert [int(boxes[0, 0]) for boxes in results] == [0, 1, 2, 3]
+
+
+def test_batcher_fails_every_image_of_a_failed_batch():
+    def predict(frames):
+        raise RuntimeError("model unavailable")
+
+    batcher = ImageBatcher(max_batch=2, max_wait=0.0, predict=predict)
+    try:
+        future = batcher.submit(np.zeros((2, 2, 3), dtype=np.uint8))
+        error = future.exception(timeout=5)
+    finally:
+        batcher.shutdown()
+
+    assert isinstance(error, RuntimeError)
@@ -0,0 +1,39 @@
+import json
+
+from person_detection.jobs import JOB_FAILED, JOB_RUNNING, VideoJob, VideoJobStore
+
+
+def _leave_running(root, job_id):
+    job_dir = root / job_id
+    job_dir.mkdir(parents=True)
+    meta = {"job_id": job_id, "job_dir": str(job_dir), "status": JOB_RUNNING}
+    (job_dir / "job.json").write_text(json.dumps(meta))
+
+
+def _status_on_disk(root, job_id):
+    return VideoJob(**json.loads((root / job_id / "job.json").read_text())).status
+
+
+def test_constructing_a_store_leaves_jobs_alone(tmp_path):
+    _leave_running(tmp_path, "job")
+
+    store = VideoJobStore(root=tmp_path)
+    store.shutdown()
+
+    assert _status_on_disk(tmp_path, "job") == JOB_RUNNING
+
+
+def test_only_the_lock_owner_fails_interrupted_jobs(tmp_path):
+    _leave_running(tmp_path, "job")
+    owner = VideoJobStore(root=tmp_path)
+    other = VideoJobStore(root=tmp_path)
+    try:
+        assert owner._owner.acquire()
+        other.start()
+        assert other.get("job").status == JOB_RUNNING
+
+        owner.start()
+        assert owner.get("job").status == JOB_FAILED
+    finally:
+        owner.shutdown()
+        other.shutdown()
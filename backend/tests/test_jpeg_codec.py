@@ -0,0 +1,52 @@
+import struct
+
+import cv2
+import numpy as np
+
+from person_detection.jpeg_codec import OpenCVCodec, TurboJPEGCodec, jpeg_orientation
+
+
+def _oriented_jpeg(orientation, width=40, height=20):
+    ok, buffer = cv2.imencode(".jpg", np.zeros((height, width, 3), dtype=np.uint8))
+    assert ok
+    tiff = b"II*\x00" + struct.pack("<IH", 8, 1)
+    tiff += struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack("<I", 0)
+    exif = b"Exif\x00\x00" + tiff
+    app1 = b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+    data = buffer.tobytes()
+    return data[:2] + app1 + data[2:]
+
+
+class _UnrotatingDecoder:
+    """Stands in for libjpeg-turbo, which decodes pixels as stored."""
+
+    scaling_factors = ((1, 1),)
+
+    def decode(self, data, pixel_format, scaling_factor=None):
+        flags = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+
+
+def _turbojpeg_codec():
+    codec = TurboJPEGCodec.__new__(TurboJPEGCodec)
+    codec._jpeg = _UnrotatingDecoder()
+    codec._fallback = OpenCVCodec()
+    codec._factors = {1: (1, 1)}
+    return codec
+
+
+def test_reads_exif_orientation():
+    assert jpeg_orientation(_oriented_jpeg(6)) == 6
+    assert jpeg_orientation(_oriented_jpeg(1)) == 1
+    assert jpeg_orientation(b"not a jpeg") == 1
+
+
+def test_codecs_agree_on_oriented_jpegs():
+    for orientation in (1, 3, 6, 8):
+        data = _oriented_jpeg(orientation)
+
+        opencv = OpenCVCodec().decode(data)
+        turbo = _turbojpeg_codec().decode(data)
+
+        assert turbo.shape == opencv.shape
+    assert OpenCVCodec().decode(_oriented_jpeg(6)).shape[:2] == (40, 20)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from person_detection.payloads import decode_binary, encode_binary
+
+
+def test_binary_round_trip_with_track_ids():
+    payload = {
+        "count": 2,
+        "face_count": 2,
+        "person_count": 2,
+        "boxes": np.array([[1, 2, 30, 40], [-5, 0, 700, 400]], dtype=np.int32),
+        "ids": np.array([7, 12], dtype=np.int32),
+    }
+
+    decoded = decode_binary(encode_binary(payload, seq=42, source="lobby"))
+
+    assert decoded["seq"] == 42
+    assert decoded["source"] == "lobby"
+    assert decoded["person_count"] == 2
+    assert decoded["detections"] == [
+        {"id": 7, "bbox": [1, 2, 30, 40]},
+        {"id": 12, "bbox": [-5, 0, 700, 400]},
+    ]
+
+
+def test_binary_round_trip_without_track_ids_numbers_boxes():
+    payload = {"person_count": 1, "boxes": np.array([[10, 10, 20, 20]]), "ids": None}
+
+    decoded = decode_binary(encode_binary(payload))
+
+    assert decoded["source"] is None
+    assert decoded["detections"] == [{"id": 1, "bbox": [10, 10, 20, 20]}]
+
+
+def test_binary_clips_coordinates_to_int16():
+    payload = {"boxes": np.array([[0, 0, 40000, -40000]]), "ids": None}
+
+    decoded = decode_binary(encode_binary(payload))
+
+    assert decoded["detections"][0]["bbox"] == [0, 0, 32767, -32768]
@@ -0,0 +1,30 @@
+import numpy as np
+
+from person_detection.regions import merge_detections
+
+
+def _dets(*rows):
+    return np.array(rows, dtype=np.float32)
+
+
+def test_merge_folds_a_box_cut_by_a_tile_edge_into_the_full_box():
+    detections = _dets([0, 0, 100, 200, 0.9, 0], [0, 0, 100, 120, 0.7, 0])
+
+    merged = merge_detections(detections, np.array([0, 1]))
+
+    assert merged.tolist() == detections[:1].tolist()
+
+
+def test_merge_keeps_overlapping_boxes_from_the_same_tile():
+    # An occluded person standing in front of another, already NMS'd by the model.
+    detections = _dets([0, 0, 100, 200, 0.9, 0], [20, 10, 90, 190, 0.8, 0])
+
+    merged = merge_detections(detections, np.array([0, 0]))
+
+    assert len(merged) == 2
+
+
+def test_merge_keeps_separate_people():
+    detections = _dets([0, 0, 50, 100, 0.9, 0], [200, 0, 250, 100, 0.8, 0])
+
+    assert len(merge_detections(detections, np.array([0, 1]))) == 2
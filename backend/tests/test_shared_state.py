@@ -0,0 +1,35 @@
+from person_detection.shared_state import CountHistory, DetectionSnapshot
+
+
+def _fill(history, count):
+    for seq in range(1, count + 1):
+        history.append(DetectionSnapshot(seq=seq, timestamp=float(seq), person_count=seq))
+
+
+def test_history_keeps_newest_records_in_order_after_wrapping():
+    history = CountHistory(capacity=4)
+    _fill(history, 10)
+
+    records = history.copy()
+
+    assert len(history) == 4
+    assert records["seq"].tolist() == [7, 8, 9, 10]
+    assert records["person_count"].tolist() == [7, 8, 9, 10]
+
+
+def test_history_limit_returns_newest_records():
+    history = CountHistory(capacity=4)
+    _fill(history, 6)
+
+    assert history.copy(limit=2)["seq"].tolist() == [5, 6]
+    assert history.copy(limit=0)["seq"].tolist() == []
+
+
+def test_history_copy_is_detached_from_later_appends():
+    history = CountHistory(capacity=2)
+    _fill(history, 2)
+
+    records = history.copy()
+    history.append(DetectionSnapshot(seq=3))
+
+    assert records["seq"].tolist() == [1, 2]
@@ -0,0 +1,43 @@
+import numpy as np
+
+from person_detection.stride import STRIDE_FIXED, StrideOptions
+from person_detection.tracking import TrackerSession
+
+FRAME = np.zeros((360, 640, 3), dtype=np.uint8)
+PERSON = np.array([[100, 50, 160, 250, 0.9, 0]], dtype=np.float32)
+NOTHING = np.zeros((0, 6), dtype=np.float32)
+
+
+def test_sessions_number_tracks_independently():
+    first, second = TrackerSession(), TrackerSession()
+    for _ in range(3):
+        first.update_detections(PERSON, FRAME)
+        _, ids = second.update_detections(PERSON, FRAME)
+
+    assert ids.tolist() == [1]
+
+
+def test_lost_tracks_expire_on_empty_frames():
+    tracker = TrackerSession()
+    for _ in range(3):
+        tracker.update_detections(PERSON, FRAME)
+
+    boxes, ids = tracker.update_detections(NOTHING, FRAME)
+    assert boxes.shape == (0, 4)
+    assert ids.tolist() == []
+
+    for _ in range(200):
+        tracker.update_detections(NOTHING, FRAME)
+    for _ in range(3):
+        _, ids = tracker.update_detections(PERSON, FRAME)
+
+    assert ids.tolist() == [2]
+
+
+def test_lost_track_buffer_follows_the_update_rate():
+    stride = StrideOptions(mode=STRIDE_FIXED, stride=3)
+
+    strided = TrackerSession(frame_rate=stride.tracker_frame_rate(30))
+
+    # A third of the updates cover the same second of video.
+    assert strided._tracker.max_frames_lost == TrackerSession()._tracker.max_frames_lost // 3
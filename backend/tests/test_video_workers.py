@@ -0,0 +1,81 @@
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+import person_detection.model_registry as model_registry_module
+from person_detection import video_workers
+from person_detection.model_registry import ModelRegistry
+from person_detection.video_workers import _stitch_segments
+
+
+def _frame(boxes, ids):
+    return np.array(boxes, dtype=np.int32).reshape(-1, 4), np.array(ids, dtype=np.int32)
+
+
+def test_stitch_maps_overlapping_tracks_onto_earlier_ids():
+    person = [10, 10, 50, 120]
+    other = [200, 10, 240, 120]
+    first = [_frame([person], [1]) for _ in range(4)]
+    # The second segment re-tracks the last two frames with its own local ids.
+    second = [_frame([person], [1]) for _ in range(2)] + [_frame([person, other], [1, 2])]
+
+    stitched = _stitch_segments([(0, first), (2, second)])
+
+    assert len(stitched) == 5
+    assert stitched[3][1].tolist() == [1]
+    assert stitched[4][1].tolist() == [1, 2]
+
+
+def test_stitch_gives_unmatched_tracks_new_ids():
+    first = [_frame([[10, 10, 50, 120]], [1])]
+    second = [_frame([[300, 10, 340, 120]], [1])]
+
+    stitched = _stitch_segments([(0, first), (0, second)])
+
+    assert [ids.tolist() for _, ids in stitched] == [[1], [2]]
+
+
+def test_stitch_keeps_untracked_frames():
+    boxes = np.zeros((0, 4), dtype=np.int32)
+
+    stitched = _stitch_segments([(0, [(boxes, None)])])
+
+    assert stitched[0][1] is None
+
+
+class _RecordingPool:
+    def __init__(self):
+        self.segment_calls = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        if fn is video_workers._track_segment:
+            self.segment_calls.append(args)
+            overlap = args[4]
+            boxes = np.zeros((0, 4), dtype=np.int32)
+            future.set_result(([(boxes, None)] * (overlap + 1), 0))
+        else:
+            future.set_result(None)
+        return future
+
+
+def test_segments_run_on_the_model_active_at_submission(tmp_path, monkeypatch):
+    video_path = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for _ in range(8):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    registry = ModelRegistry(active_id="builtin:fp", warmup_runs=0)
+    monkeypatch.setattr(registry, "_loader_for", lambda model_id: object)
+    monkeypatch.setattr(model_registry_module, "model_registry", registry)
+    pool = _RecordingPool()
+    monkeypatch.setattr(video_workers, "VIDEO_WORKERS", 2)
+    monkeypatch.setattr(video_workers, "get_video_worker_pool", lambda: pool)
+
+    registry.activate("builtin:int8", warmup_runs=0)
+    video_workers.analyze_video_file_parallel(video_path, tmp_path / "out.mp4")
+
+    assert pool.segment_calls
+    assert {args[3] for args in pool.segment_calls} == {"builtin:int8"}
@@ -0,0 +1,38 @@
+from person_detection.webrtc import FramePacer
+
+
+def _run(pacer, frames, work, source_fps=0.0):
+    now = 0.0
+    for _ in range(frames):
+        now += pacer.delay(now)
+        pacer.frame_done(now, work, source_fps)
+        now += work
+    return now
+
+
+def test_pacer_schedules_frames_on_the_clock():
+    pacer = FramePacer(target_fps=25)
+
+    elapsed = _run(pacer, 50, work=0.01)
+
+    # Work is taken out of the wait, so 50 frames take 49 intervals plus one frame's work.
+    assert abs(elapsed - (49 / 25 + 0.01)) < 1e-6
+
+
+def test_pacer_never_outruns_the_source():
+    pacer = FramePacer(target_fps=30, min_fps=5)
+    pacer.frame_done(0.0, 0.0, source_fps=10)
+
+    assert pacer.interval == 1 / 10
+
+
+def test_pacer_sheds_resolution_before_frame_rate_and_recovers():
+    pacer = FramePacer(target_fps=20, min_fps=5, min_scale=0.5)
+
+    _run(pacer, 200, work=0.06)
+    assert pacer.scale == 0.5
+    assert pacer.fps < 20
+
+    _run(pacer, 400, work=0.0)
+    assert pacer.fps == 20
+    assert pacer.scale == 1.0
@@ -37,7 +37,7 @@ function UploadSection({ type }) {
 
     const endpoint = isVideo
       ? API_ENDPOINTS.videoUploadDetection
-      : API_ENDPOINTS.imageUploadDetection;
+      : `${API_ENDPOINTS.imageUploadDetection}?format=url&reduced=true`;
 
     try {
       const response = await fetch(endpoint, {
@@ -72,8 +72,8 @@ function UploadSection({ type }) {
     ? (result?.person_count ?? 0)
     : (latestFrame?.count ?? 0);
   const annotatedImageSrc =
-    isImage && result?.annotated_jpeg_base64
-      ? `data:image/jpeg;base64,${result.annotated_jpeg_base64}`
+    isImage && result?.annotated_id
+      ? `${API_ENDPOINTS.imageDetectionResults}/${result.annotated_id}`
       : "";
   const processedVideoSrc =
     isVideo && result?.video_path
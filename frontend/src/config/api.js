@@ -1,13 +1,20 @@
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000";
 
+// Camera shown in the realtime view; its stream and counts are requested by id.
+export const CAMERA_ID = import.meta.env.VITE_CAMERA_ID || "default";
+const CAMERA_QUERY = `camera_id=${encodeURIComponent(CAMERA_ID)}`;
+
 export const API_ENDPOINTS = {
   health: `${API_BASE}/health`,
-  personDetectionStream: `${API_BASE}/api/person-detection/stream`,
+  ready: `${API_BASE}/health/ready`,
+  personDetectionStream: `${API_BASE}/api/person-detection/stream?${CAMERA_QUERY}`,
   peopleCountWebRtcOffer: `${API_BASE}/api/people-count/webrtc/offer`,
   peopleCountCurrent: `${API_BASE}/api/people-count/current`,
+  peopleCountEvents: `${API_BASE}/api/people-count/events?${CAMERA_QUERY}`,
   videoUploadDetection: `${API_BASE}/api/video-detection/upload`,
   videoUploadDetectionDownload: `${API_BASE}/api/video-detection/upload/download`,
   videoUploadDetectionStream: `${API_BASE}/api/video-detection/upload/stream`,
   imageUploadDetection: `${API_BASE}/api/image-detection/upload`,
+  imageDetectionResults: `${API_BASE}/api/image-detection/results`,
   openvinoExport: `${API_BASE}/api/model/export/openvino`,
 };
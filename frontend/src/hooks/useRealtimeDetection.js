@@ -1,5 +1,5 @@
 import { useEffect, useRef, useState } from "react";
-import { API_ENDPOINTS } from "../config/api";
+import { API_ENDPOINTS, CAMERA_ID } from "../config/api";
 
 export function useRealtimeDetection() {
   const [personCount, setPersonCount] = useState(0);
@@ -15,7 +15,7 @@ export function useRealtimeDetection() {
       if (cancelled) return;
 
       try {
-        const response = await fetch(API_ENDPOINTS.health);
+        const response = await fetch(API_ENDPOINTS.ready);
         if (response.ok) {
           if (!cancelled) {
             setBackendReady(true);
@@ -23,7 +23,7 @@ export function useRealtimeDetection() {
           return;
         }
       } catch {
-        // Retry until backend is available.
+        // Retry until the backend has loaded and warmed up the model.
       }
 
       retryTimeout = setTimeout(checkBackend, 1000);
@@ -44,36 +44,33 @@ export function useRealtimeDetection() {
 
     let cancelled = false;
     let peerConnection = null;
-    let pollInterval = null;
-    let pollingStarted = false;
+    let eventSource = null;
 
     const applyPayload = (data) => {
       if (cancelled) return;
-      setPersonCount(data.person_count ?? 0);
+      if (data.person_count !== undefined) {
+        setPersonCount(data.person_count);
+      }
     };
 
-    const startPolling = () => {
-      if (pollingStarted) return;
-      pollingStarted = true;
+    const startCountEvents = () => {
+      if (eventSource || typeof EventSource === "undefined") return;
 
-      const poll = async () => {
+      // The server pushes only changed counts for this camera; EventSource
+      // reconnects on its own.
+      eventSource = new EventSource(API_ENDPOINTS.peopleCountEvents);
+      eventSource.addEventListener("count", (event) => {
         try {
-          const response = await fetch(API_ENDPOINTS.peopleCountCurrent);
-          if (!response.ok) return;
-          const data = await response.json();
-          applyPayload(data);
+          applyPayload(JSON.parse(event.data));
         } catch {
-          // Keep retrying in the existing interval.
+          // Ignore malformed payloads.
         }
-      };
-
-      poll();
-      pollInterval = setInterval(poll, 500);
+      });
     };
 
     const connectWebRtc = async () => {
       if (typeof RTCPeerConnection === "undefined") {
-        startPolling();
+        startCountEvents();
         return;
       }
 
@@ -101,7 +98,7 @@ export function useRealtimeDetection() {
 
         channel.onclose = () => {
           setUseWebRtc(false);
-          startPolling();
+          startCountEvents();
         };
 
         const offer = await peerConnection.createOffer();
@@ -113,6 +110,7 @@ export function useRealtimeDetection() {
           body: JSON.stringify({
             sdp: offer.sdp,
             type: offer.type,
+            camera_id: CAMERA_ID,
           }),
         });
 
@@ -124,7 +122,7 @@ export function useRealtimeDetection() {
         await peerConnection.setRemoteDescription(answer);
       } catch {
         setUseWebRtc(false);
-        startPolling();
+        startCountEvents();
       }
     };
 
@@ -132,8 +130,8 @@ export function useRealtimeDetection() {
 
     return () => {
       cancelled = true;
-      if (pollInterval) {
-        clearInterval(pollInterval);
+      if (eventSource) {
+        eventSource.close();
       }
       if (peerConnection) {
         peerConnection.close();